@@ -23,6 +23,32 @@ score_to_play_to=11
 # Change this to log all stats to database on localhost
 log_to_db = True
 
+# Change this to use integer cards inside the engine (faster for long simulations)
+int_cards = False
+
+# Change this to a number to make the deals reproducible (None deals randomly)
+seed = None
+
+# Change this to play all games at once with the batch engine (all players use JustGreedyEnough and BetterBidding)
+batch = False
+
+# Change this to print how long each phase of a hand (dealing, bidding, playing tricks, scoring...) took
+time_phases = False
+
+# Change this to cache the expected points of up to this many bids (0 disables the cache), and
+# optionally a file to keep the cache in between runs
+bid_cache_size = 0
+bid_cache_file = None
+
+# Change this to a table built with "python pysmear/bid_table.py build" to look bids up instead of calculating them
+bid_table_file = None
+
+# Change this to a table built with "python pysmear/endgame_tablebase.py build" for players using PimcPlaying to look up the last two tricks
+endgame_tablebase_file = None
+
+# Change this to stop each hand once the cards left can't change the scores (same scores, but game points aren't all counted)
+end_decided_hands = False
+
 def main():
     if one_test:
         num_runs = 1
@@ -31,10 +57,14 @@ def main():
         num_runs = 100
         debug=False
     print "Setting up..."
-    sim = smear_simulator.SmearSimulator(debug=debug, num_teams=num_teams, num_players=num_players, score_to_play_to=score_to_play_to, log_to_db=log_to_db)
+    sim = smear_simulator.SmearSimulator(debug=debug, num_teams=num_teams, num_players=num_players, score_to_play_to=score_to_play_to, log_to_db=log_to_db, int_cards=int_cards, seed=seed, batch=batch, time_phases=time_phases, bid_cache_size=bid_cache_size, bid_cache_file=bid_cache_file, bid_table_file=bid_table_file, endgame_tablebase_file=endgame_tablebase_file, end_decided_hands=end_decided_hands)
     if len(sys.argv) > 1:
         num_runs = int(sys.argv[1])
-    sim.run(num_runs)
+    # Optionally, the number of worker processes to run the games in
+    workers = 1
+    if len(sys.argv) > 2:
+        workers = int(sys.argv[2])
+    sim.run(num_runs, workers=workers)
     print "Generating stats..."
     print sim.stats()
 
@@ -0,0 +1,330 @@
+# Simulator for the card game smear
+
+import numpy as np
+from card_encoding import NUM_CARDS, CARD_SUIT, CARD_RANK, CARD_POKER_RANK, CARD_GAME_POINTS, RANK_TEN, RANK_JACK, VALUE_INDEX, JACK_OF, JICK_OF, TRUMP_STRENGTH, TRICK_STRENGTH, LEAD_TRUMP
+from bidding_logic import chance_no_one_else_has
+from dealing import shuffled_decks
+
+
+# Plays many independent hands of smear in lockstep, with the state of every
+# hand held in NumPy arrays (one row per hand) instead of Player, Stack and
+# Trick objects. Hands are dealt with dealing.shuffled_decks, so a hand
+# played here is dealt the same cards as the same hand of the same game
+# played by SmearGameManager with a BatchDealer using the same seed.
+#
+# Every player uses BatchJustGreedyEnough and BatchBetterBidding, which make
+# the same choices as JustGreedyEnough and BetterBidding
+
+# The card tables from card_encoding, as arrays that can be indexed with arrays of cards
+SUIT_OF = np.array(CARD_SUIT)
+POKER_RANK_OF = np.array(CARD_POKER_RANK)
+GAME_POINTS_OF = np.array(CARD_GAME_POINTS)
+IS_TEN = np.array([ CARD_RANK[c] == RANK_TEN for c in range(NUM_CARDS) ])
+IS_ACE_OR_KING = np.array([ CARD_RANK[c] >= VALUE_INDEX["King"] for c in range(NUM_CARDS) ])
+IS_QUEEN_OR_JACK = np.array([ CARD_RANK[c] in (RANK_JACK, VALUE_INDEX["Queen"]) for c in range(NUM_CARDS) ])
+# Indexed by [trump][card]
+TRUMP_STRENGTH_OF = np.array(TRUMP_STRENGTH)
+# Indexed by [trump][lead][card]
+TRICK_STRENGTH_OF = np.array(TRICK_STRENGTH)
+JACK_OF_TRUMP = np.array(JACK_OF)
+JICK_OF_TRUMP = np.array(JICK_OF)
+
+# Larger than any value used for choosing cards
+NOT_A_CANDIDATE = 1 << 20
+# Strength of the highest trump, the ace
+HIGHEST_TRUMP_STRENGTH = 14
+NO_PLAYER = -1
+NO_CARD = -1
+
+
+def argmax_where(mask, values):
+    return np.where(mask, values, -NOT_A_CANDIDATE).argmax(axis=1)
+
+
+def argmin_where(mask, values):
+    return np.where(mask, values, NOT_A_CANDIDATE).argmin(axis=1)
+
+
+# Array version of BetterBidding, that bids on every hand in a batch at once
+class BatchBetterBidding(object):
+    def __init__(self, num_players, cards_to_deal=6):
+        self.num_players = num_players
+        self.cards_to_deal = cards_to_deal
+        # Expected points from high and low, indexed by the trump strength
+        # of my highest or lowest trump (0 if I have no trump)
+        self.high_points = np.zeros(HIGHEST_TRUMP_STRENGTH + 1)
+        self.low_points = np.zeros(HIGHEST_TRUMP_STRENGTH + 1)
+        for strength in range(1, HIGHEST_TRUMP_STRENGTH + 1):
+            self.high_points[strength] = self.better_points(chance_no_one_else_has(num_players, cards_to_deal, HIGHEST_TRUMP_STRENGTH - strength))
+            self.low_points[strength] = self.better_points(chance_no_one_else_has(num_players, cards_to_deal, strength - 1))
+        # Indexed by the number of non-jack trump
+        self.jack_multipliers = np.array([ 0.0, 0.5, 0.75 ] + [ 1.0 ] * cards_to_deal)
+
+    def better_points(self, exp_points):
+        if exp_points < 0.3:
+            exp_points = 0
+        return exp_points
+
+    # hands is (num_hands, num_players, cards_to_deal), in the order the cards
+    # were dealt. Returns the bid each player would make if they didn't have
+    # to beat anyone (before being forced to two), and their choice of trump
+    def calculate_bids(self, hands):
+        best_bid = np.zeros(hands.shape[:2])
+        best_trump = np.full(hands.shape[:2], NO_PLAYER, dtype=int)
+        for trump in range(0, 4):
+            strength = TRUMP_STRENGTH_OF[trump][hands]
+            is_trump = strength > 0
+            num_trump = is_trump.sum(axis=2)
+            high = self.high_points[strength.max(axis=2)]
+            low = self.low_points[np.where(is_trump, strength, HIGHEST_TRUMP_STRENGTH + 1).min(axis=2) % (HIGHEST_TRUMP_STRENGTH + 1)]
+            # Added up in hundredths, like BetterBidding does
+            game = np.zeros(hands.shape[:2], dtype=int)
+            ten_points = np.where(num_trump > 2, 60, 30)
+            for i in range(0, self.cards_to_deal):
+                card = hands[:, :, i]
+                face_points = np.where(IS_ACE_OR_KING[card], 20, np.where(IS_QUEEN_OR_JACK[card], 15, 0))
+                game = game + np.where(is_trump[:, :, i], np.where(IS_TEN[card], ten_points, 20), face_points)
+            game = np.minimum(game, 100) / 100.0
+            jacks_and_jicks = ((hands == JACK_OF[trump]) | (hands == JICK_OF[trump])).sum(axis=2)
+            jack = jacks_and_jicks * self.jack_multipliers[num_trump - jacks_and_jicks]
+            tmp_bid = 0 + high
+            tmp_bid += low
+            tmp_bid += game
+            tmp_bid += jack
+            better = tmp_bid > best_bid
+            best_bid = np.where(better, tmp_bid, best_bid)
+            best_trump = np.where(better, trump, best_trump)
+        return best_bid, best_trump
+
+    # The bid a player makes out of their best bid, as in BetterBidding.calculate_bid
+    def declare_bids(self, best_bid, current_bid, force_two):
+        bid = np.where(best_bid < 2, np.where((current_bid < 2) & force_two & (best_bid > 1), 2, 0), best_bid).astype(int)
+        return np.where(bid <= current_bid, 0, bid)
+
+
+# Array version of JustGreedyEnough, that chooses a card for one seat of
+# every hand in a batch at once
+class BatchJustGreedyEnough(object):
+    # cards and in_hand are (num_hands, cards_to_deal), with the cards in the
+    # order they were dealt. JustGreedyEnough goes through a hand by rank,
+    # with cards of the same rank in the order they were dealt. Returns the
+    # index of the card to play for each hand
+    def choose_cards(self, cards, in_hand, trump, lead, winning_card):
+        rows = np.arange(len(cards))
+        strength = TRUMP_STRENGTH_OF[trump[:, np.newaxis], cards]
+        trump_in_hand = in_hand & (strength > 0)
+        has_trump = trump_in_hand.any(axis=1)
+        # The order of my hand by rank
+        sorted_order = POKER_RANK_OF[cards] * 8 + np.arange(cards.shape[1])
+        highest_trump = argmax_where(trump_in_hand, strength)
+        if lead is None:
+            # I'm the first player. Choose my strongest card
+            return np.where(has_trump, highest_trump, argmax_where(in_hand, sorted_order))
+
+        # Otherwise choose the card to beat the current highest card
+        winning_strength = TRUMP_STRENGTH_OF[trump, winning_card]
+        lead_suit_in_hand = in_hand & (SUIT_OF[cards] == lead[:, np.newaxis])
+        highest_of_lead_suit = argmax_where(lead_suit_in_hand, sorted_order)
+        beats_with_trump = has_trump & (strength[rows, highest_trump] > winning_strength)
+        beats_with_lead_suit = lead_suit_in_hand.any(axis=1) & (POKER_RANK_OF[cards[rows, highest_of_lead_suit]] > POKER_RANK_OF[winning_card])
+        beating_idx = np.where(winning_strength > 0,
+                np.where(beats_with_trump, highest_trump, NO_CARD),
+                np.where(has_trump, argmin_where(trump_in_hand, strength), np.where(beats_with_lead_suit, highest_of_lead_suit, NO_CARD)))
+
+        # If we can't beat it, then just play the lowest card, following suit as needed.
+        # The cards to choose from are my trump from highest to lowest if trump
+        # was lead, else the lead suit, else my whole hand
+        lowest_idx = np.where((lead == LEAD_TRUMP) & has_trump, self.first_choice(trump_in_hand, -strength, strength),
+                np.where(lead_suit_in_hand.any(axis=1), self.first_choice(lead_suit_in_hand, sorted_order, strength),
+                    self.first_choice(in_hand, sorted_order, strength)))
+
+        return np.where(beating_idx != NO_CARD, beating_idx, lowest_idx)
+
+    # JustGreedyEnough.find_lowest_card_index goes through the cards in
+    # order: it takes the first card unless it is trump, in which case it
+    # takes the second card (trump or not), if there is one
+    def first_choice(self, candidates, order, strength):
+        rows = np.arange(len(candidates))
+        first = argmin_where(candidates, order)
+        others = candidates.copy()
+        others[rows, first] = False
+        second = argmin_where(others, order)
+        take_second = (strength[rows, first] > 0) & others.any(axis=1)
+        return np.where(take_second, second, first)
+
+
+# The results of a batch of hands, one entry per hand. Players that didn't
+# win a point are NO_PLAYER
+class BatchHandResults(object):
+    __slots__ = ("scores", "bidder", "bid", "trump", "forced_two_set", "bidder_set", "high_winner", "low_winner",
+            "jack_winner", "jick_winner", "game_winner")
+
+
+class SmearBatchEngine(object):
+    def __init__(self, num_players=4, num_teams=0, score_to_play_to=11, cards_to_deal=6, seed=0, games_per_batch=10000):
+        if num_players * cards_to_deal > NUM_CARDS:
+            raise ValueError("num_players ({}) times cards_to_deal ({}) is larger than the size of the deck ({})".format(num_players, cards_to_deal, NUM_CARDS))
+        self.num_players = num_players
+        self.num_teams = num_teams
+        self.score_to_play_to = score_to_play_to
+        self.cards_to_deal = cards_to_deal
+        self.seed = seed
+        self.games_per_batch = games_per_batch
+        # Total number of hands played by play_games
+        self.hands_played = 0
+        # team_of[i] is player i's team. Without teams, everyone is on their own team
+        if num_teams:
+            self.team_of = np.arange(num_players) % num_teams
+        else:
+            self.team_of = np.arange(num_players)
+        self.bidding_logic = BatchBetterBidding(num_players, cards_to_deal)
+        self.playing_logic = BatchJustGreedyEnough()
+
+    # Returns (num_hands, num_players, cards_to_deal) hands for hand_index of each game
+    def deal(self, game_indices, hand_index):
+        decks = shuffled_decks(self.seed, game_indices, [ hand_index ] * len(game_indices))
+        return decks[:, :self.num_players*self.cards_to_deal].reshape(len(game_indices), self.num_players, self.cards_to_deal).astype(int)
+
+    # Adds a point for each player in player_ids (and their team) to scores
+    def add_to_score(self, scores, player_ids):
+        won = player_ids != NO_PLAYER
+        scores += won[:, np.newaxis] & (self.team_of == self.team_of[player_ids][:, np.newaxis])
+
+    def set_score_of(self, scores, player_ids, points, mask):
+        team = mask[:, np.newaxis] & (self.team_of == self.team_of[player_ids][:, np.newaxis])
+        scores[team] = np.broadcast_to(points[:, np.newaxis], scores.shape)[team]
+
+    def get_bids(self, hands, dealer):
+        num_hands = len(hands)
+        rows = np.arange(num_hands)
+        best_bid, best_trump = self.bidding_logic.calculate_bids(hands)
+        bid = np.zeros(num_hands, dtype=int)
+        bidder = np.zeros(num_hands, dtype=int)
+        # Dealer bids last
+        for i in range(1, self.num_players + 1):
+            current_bidder = (dealer + i) % self.num_players
+            new_bid = self.bidding_logic.declare_bids(best_bid[rows, current_bidder], bid, current_bidder == dealer)
+            new_bid = np.minimum(new_bid, 5)
+            higher = new_bid > bid
+            bid = np.where(higher, new_bid, bid)
+            bidder = np.where(higher, current_bidder, bidder)
+        trump = best_trump[rows, bidder]
+        return bid, bidder, trump
+
+    def calculate_game_winner(self, game_points):
+        rows = np.arange(len(game_points))
+        team_points = np.zeros((len(game_points), self.team_of.max() + 1), dtype=int)
+        for player_id in range(0, self.num_players):
+            team_points[:, self.team_of[player_id]] += game_points[:, player_id]
+        most_points = team_points.max(axis=1)
+        winning_team = team_points.argmax(axis=1)
+        no_tie = (team_points == most_points[:, np.newaxis]).sum(axis=1) == 1
+        # The player on the winning team with the most game points wins game
+        on_winning_team = self.team_of == winning_team[:, np.newaxis]
+        game_winner = argmax_where(on_winning_team, game_points)
+        game_winner = np.where(game_points[rows, game_winner] > 0, game_winner, 0)
+        return np.where(no_tie, game_winner, NO_PLAYER)
+
+    # Plays hand_index of each of game_indices, with the dealer that
+    # SmearGameManager would use for that hand
+    def play_hands(self, game_indices, hand_index):
+        game_indices = np.asarray(game_indices)
+        num_hands = len(game_indices)
+        rows = np.arange(num_hands)
+        dealer = (hand_index + 1) % self.num_players
+        hands = self.deal(game_indices, hand_index)
+        bid, bidder, trump = self.get_bids(hands, dealer)
+        forced_two_set = bid == 0
+        trump = np.where(forced_two_set, 0, trump)
+
+        in_hand = np.ones(hands.shape, dtype=bool)
+        game_points = np.zeros((num_hands, self.num_players), dtype=int)
+        highest_trump_won = np.zeros((num_hands, self.num_players), dtype=int)
+        jack_winner = np.full(num_hands, NO_PLAYER, dtype=int)
+        jick_winner = np.full(num_hands, NO_PLAYER, dtype=int)
+        lowest_trump_played = np.full(num_hands, HIGHEST_TRUMP_STRENGTH + 1, dtype=int)
+        low_winner = np.zeros(num_hands, dtype=int)
+        jack = JACK_OF_TRUMP[trump]
+        jick = JICK_OF_TRUMP[trump]
+        first_player = bidder
+        for _ in range(0, self.cards_to_deal):
+            lead = None
+            winning_card = None
+            trick_game_points = np.zeros(num_hands, dtype=int)
+            trick_highest_trump = np.zeros(num_hands, dtype=int)
+            jack_played = np.zeros(num_hands, dtype=bool)
+            jick_played = np.zeros(num_hands, dtype=bool)
+            for i in range(0, self.num_players):
+                player_id = (first_player + i) % self.num_players
+                idx = self.playing_logic.choose_cards(hands[rows, player_id], in_hand[rows, player_id], trump, lead, winning_card)
+                in_hand[rows, player_id, idx] = False
+                card = hands[rows, player_id, idx]
+                strength = TRUMP_STRENGTH_OF[trump, card]
+                if lead is None:
+                    lead = np.where(strength > 0, LEAD_TRUMP, SUIT_OF[card])
+                    winning_card = card
+                    winner = player_id
+                else:
+                    higher = TRICK_STRENGTH_OF[trump, lead, card] > TRICK_STRENGTH_OF[trump, lead, winning_card]
+                    winning_card = np.where(higher, card, winning_card)
+                    winner = np.where(higher, player_id, winner)
+                # Because you don't need to take low home to get the point
+                lower = (strength > 0) & (strength < lowest_trump_played)
+                lowest_trump_played = np.where(lower, strength, lowest_trump_played)
+                low_winner = np.where(lower, player_id, low_winner)
+                trick_game_points += GAME_POINTS_OF[card]
+                trick_highest_trump = np.maximum(trick_highest_trump, strength)
+                jack_played |= card == jack
+                jick_played |= card == jick
+            # Give all cards to winner
+            game_points[rows, winner] += trick_game_points
+            highest_trump_won[rows, winner] = np.maximum(highest_trump_won[rows, winner], trick_highest_trump)
+            jack_winner = np.where(jack_played, winner, jack_winner)
+            jick_winner = np.where(jick_played, winner, jick_winner)
+            first_player = winner
+
+        results = BatchHandResults()
+        results.bidder = bidder
+        results.bid = bid
+        results.trump = np.where(forced_two_set, NO_PLAYER, trump)
+        results.forced_two_set = forced_two_set
+        results.high_winner = highest_trump_won.argmax(axis=1)
+        results.low_winner = low_winner
+        results.jack_winner = jack_winner
+        results.jick_winner = jick_winner
+        results.game_winner = self.calculate_game_winner(game_points)
+        scores = np.zeros((num_hands, self.num_players), dtype=int)
+        for winners in [ results.high_winner, results.low_winner, results.jack_winner, results.jick_winner, results.game_winner ]:
+            self.add_to_score(scores, winners)
+        # Check to see if bidder was set
+        results.bidder_set = ~forced_two_set & (scores[rows, bidder] < bid)
+        self.set_score_of(scores, bidder, -bid, results.bidder_set)
+        # No one bid, the dealer takes a two set
+        scores[forced_two_set] = 0
+        self.set_score_of(scores, np.full(num_hands, dealer, dtype=int), np.full(num_hands, -2, dtype=int), forced_two_set)
+        results.scores = scores
+        return results
+
+    # Plays num_games games, starting at game first_game_index, and returns
+    # how many games each player won
+    def play_games(self, num_games, first_game_index=0):
+        games_won = np.zeros(self.num_players, dtype=int)
+        for start in range(first_game_index, first_game_index + num_games, self.games_per_batch):
+            game_indices = np.arange(start, min(start + self.games_per_batch, first_game_index + num_games))
+            scores = np.zeros((len(game_indices), self.num_players), dtype=int)
+            hand_index = 0
+            while len(game_indices):
+                results = self.play_hands(game_indices, hand_index)
+                self.hands_played += len(game_indices)
+                scores += results.scores
+                rows = np.arange(len(game_indices))
+                highest_score = scores.max(axis=1)
+                bidder_score = scores[rows, results.bidder]
+                game_over = highest_score >= self.score_to_play_to
+                # Bidder always goes out, regardless of who had the higher score
+                winning_score = np.where(bidder_score >= self.score_to_play_to, bidder_score, highest_score)
+                games_won += ((scores == winning_score[:, np.newaxis]) & game_over[:, np.newaxis]).sum(axis=0)
+                game_indices = game_indices[~game_over]
+                scores = scores[~game_over]
+                hand_index += 1
+        return games_won
@@ -0,0 +1,164 @@
+# Simulator for the card game smear
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from smear_simulator import SmearSimulator
+from playing_logic import JustGreedyEnough, CautiousTaker
+from bidding_logic import BasicBidding, BetterBidding
+
+
+# Measures how fast SmearSimulator plays games, for a matrix of game
+# configurations, and compares the results against a saved baseline.
+#
+#   python pysmear/benchmark.py run              # print games/sec and hands/sec
+#   python pysmear/benchmark.py save             # save a baseline for this machine
+#   python pysmear/benchmark.py compare          # flag regressions against it
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+PLAYING_LOGICS = [ JustGreedyEnough, CautiousTaker ]
+BIDDING_LOGICS = [ BasicBidding, BetterBidding ]
+SCORES_TO_PLAY_TO = [ 11, 15, 21 ]
+BENCHMARK_SEED = 2016
+
+
+# Returns the list of configurations to benchmark, as dicts of SmearSimulator
+# arguments. Teams are only played with an even number of players (two teams)
+def benchmark_configs(int_cards=False):
+    configs = []
+    for num_players in range(2, 9):
+        for num_teams in [ 0, 2 ]:
+            if num_teams and (num_players < 4 or num_players % num_teams != 0):
+                continue
+            for score_to_play_to in SCORES_TO_PLAY_TO:
+                for playing_logic in PLAYING_LOGICS:
+                    for bidding_logic in BIDDING_LOGICS:
+                        configs.append({ "num_players": num_players, "num_teams": num_teams, "score_to_play_to": score_to_play_to,
+                            "playing_logic": playing_logic, "bidding_logic": bidding_logic, "int_cards": int_cards })
+    return configs
+
+
+def config_name(config):
+    return "{}p_{}t_to{}_{}_{}{}".format(config["num_players"], config["num_teams"], config["score_to_play_to"],
+            config["playing_logic"].__name__, config["bidding_logic"].__name__, "_int" if config["int_cards"] else "")
+
+
+def machine_info(tag=None):
+    return { "tag": tag or "{}-{}-py{}".format(platform.node() or "unknown", platform.machine(), platform.python_version()),
+            "node": platform.node(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "system": platform.system(),
+            "python": platform.python_version() }
+
+
+def default_baseline_path(tag=None):
+    return os.path.join(BASELINE_DIR, "baseline_{}.json".format(machine_info(tag)["tag"]))
+
+
+# Plays num_games games with the config (after warmup_games that aren't timed)
+# repeats times, and returns games/sec and hands/sec of the fastest repeat
+def benchmark_config(config, num_games=10, warmup_games=2, repeats=3):
+    best = None
+    for _ in range(0, repeats):
+        sim = SmearSimulator(seed=BENCHMARK_SEED, **config)
+        sim.play_games(0, warmup_games, show_progress=False)
+        sim.num_hands = 0
+        start = time.time()
+        sim.play_games(warmup_games, warmup_games + num_games, show_progress=False)
+        elapsed = time.time() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, sim.num_hands)
+    elapsed, num_hands = best
+    return { "games_per_sec": num_games / elapsed, "hands_per_sec": num_hands / elapsed, "games": num_games, "hands": num_hands }
+
+
+def run_benchmarks(configs, num_games=10, warmup_games=2, repeats=3, verbose=True, tag=None):
+    results = {}
+    for config in configs:
+        name = config_name(config)
+        results[name] = benchmark_config(config, num_games, warmup_games, repeats)
+        if verbose:
+            print "{:<55} {:>9.1f} games/sec {:>10.1f} hands/sec".format(name, results[name]["games_per_sec"], results[name]["hands_per_sec"])
+    return { "machine": machine_info(tag), "seed": BENCHMARK_SEED, "num_games": num_games, "warmup_games": warmup_games,
+            "repeats": repeats, "results": results }
+
+
+def save_results(results, path):
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Returns a list of (name, baseline games/sec, current games/sec, change) for
+# every configuration whose games/sec dropped by more than threshold (a fraction)
+def find_regressions(baseline, current, threshold=0.15):
+    regressions = []
+    for name, result in sorted(current["results"].items()):
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["games_per_sec"]
+        after = result["games_per_sec"]
+        change = (after - before) / before
+        if change < -threshold:
+            regressions.append((name, before, after, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SmearSimulator")
+    parser.add_argument("command", choices=[ "run", "save", "compare" ])
+    parser.add_argument("--games", type=int, default=10, help="games to time per configuration")
+    parser.add_argument("--warmup", type=int, default=2, help="games to play before timing")
+    parser.add_argument("--repeats", type=int, default=3, help="times to repeat each measurement, keeping the fastest")
+    parser.add_argument("--int-cards", action="store_true", help="use integer cards")
+    parser.add_argument("--filter", default="", help="only run configurations whose name contains this")
+    parser.add_argument("--baseline", default=None, help="baseline file (defaults to the one for this machine)")
+    parser.add_argument("--output", default=None, help="also save the results of this run to a file")
+    parser.add_argument("--tag", default=None, help="name for this machine (defaults to hostname, architecture and python version)")
+    parser.add_argument("--threshold", type=float, default=0.15, help="slowdown (as a fraction) that counts as a regression")
+    args = parser.parse_args(argv)
+
+    configs = [ x for x in benchmark_configs(args.int_cards) if args.filter in config_name(x) ]
+    baseline = None
+    if args.command == "compare":
+        baseline_path = args.baseline or default_baseline_path(args.tag)
+        if not os.path.exists(baseline_path):
+            print "No baseline found at {}, run 'save' first".format(baseline_path)
+            return 2
+        baseline = load_results(baseline_path)
+        if baseline["machine"]["tag"] != machine_info(args.tag)["tag"]:
+            print "Warning, comparing against a baseline from {}".format(baseline["machine"]["tag"])
+        configs = [ x for x in configs if config_name(x) in baseline["results"] ]
+
+    results = run_benchmarks(configs, args.games, args.warmup, args.repeats, tag=args.tag)
+    if args.output:
+        save_results(results, args.output)
+    if args.command == "save":
+        baseline_path = args.baseline or default_baseline_path(args.tag)
+        save_results(results, baseline_path)
+        print "Saved baseline to {}".format(baseline_path)
+    elif args.command == "compare":
+        regressions = find_regressions(baseline, results, args.threshold)
+        for name, before, after, change in regressions:
+            print "REGRESSION: {} went from {:.1f} to {:.1f} games/sec ({:+.1f}%)".format(name, before, after, 100 * change)
+        if regressions:
+            return 1
+        print "No regressions beyond {:.0f}%".format(100 * args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# Simulator for the card game smear
+
+import os
+import json
+from collections import OrderedDict
+from card_encoding import SmearStack, SUIT_INDEX, VALUE_INDEX, RANK_JACK, CARD_BIT, JICK_OF, TRUMP_MASK, encode, card_to_int, cards_to_mask
+
+
+# Off-suit cards only count towards game (as BetterBidding values them) by
+# their rank, so they're just counted: aces and kings, and queens and jacks
+ACES_AND_KINGS_MASK = sum(CARD_BIT[encode(s, r)] for s in range(0, 4) for r in (VALUE_INDEX["Ace"], VALUE_INDEX["King"]))
+QUEENS_AND_JACKS_MASK = sum(CARD_BIT[encode(s, r)] for s in range(0, 4) for r in (VALUE_INDEX["Queen"], RANK_JACK))
+SUIT_BITS = (1 << 13) - 1
+
+
+def hand_mask(hand):
+    if hand.__class__ is SmearStack:
+        return hand.mask
+    return cards_to_mask(card_to_int(card) for card in hand)
+
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+
+# Describes a hand from the point of view of one suit being trump, the same
+# way for every suit: the ranks of the trump held (with the jick as a
+# fourteenth rank), and how many off-suit aces and kings, and queens and
+# jacks, are held
+def trump_relative_hand(mask, trump):
+    trump_ranks = (mask >> (13 * trump)) & SUIT_BITS
+    if mask & CARD_BIT[JICK_OF[trump]]:
+        trump_ranks |= 1 << 13
+    off_suit = mask & ~TRUMP_MASK[trump]
+    return trump_ranks, popcount(off_suit & ACES_AND_KINGS_MASK), popcount(off_suit & QUEENS_AND_JACKS_MASK)
+
+
+# A bounded least recently used cache of the points a bidding logic expects
+# to win with each suit as trump. Entries are keyed by the hand as seen with
+# that suit as trump (see trump_relative_hand), so a hand with the same
+# trump and face cards shares an entry no matter which suit is trump or what
+# the other low cards are.
+#
+# Only the expected points are cached, not the bid: choosing the best suit
+# and rounding the bid is cheap, and depends on the current bid and
+# force_two, so it's always done by the bidding logic itself. A bidding
+# logic can only use the cache if its expected points depend on nothing
+# else, as is the case for BasicBidding and BetterBidding.
+#
+# If path is given, entries are loaded from it (if it exists), and save()
+# writes them back
+class BidCache(object):
+    def __init__(self, max_size=100000, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def expected_points_by_suit(self, bidding_logic, num_players, my_hand):
+        name = type(bidding_logic).__name__
+        mask = hand_mask(my_hand)
+        hand_size = len(my_hand)
+        points = []
+        for suit in bidding_logic.suits:
+            key = (name, num_players, hand_size) + trump_relative_hand(mask, SUIT_INDEX[suit])
+            suit_points = self.entries.pop(key, None)
+            if suit_points is None:
+                self.misses += 1
+                suit_points = bidding_logic.calculate_expected_points(num_players, my_hand, suit)
+                if len(self.entries) >= self.max_size:
+                    self.entries.popitem(last=False)
+            else:
+                self.hits += 1
+            # (Re)insert it as the most recently used
+            self.entries[key] = suit_points
+            points.append(suit_points)
+        return points
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / float(lookups) if lookups else 0.0
+
+    def stats(self):
+        return "Bid cache: {} hits, {} misses ({:.1f}% hit rate), {} entries\n".format(self.hits, self.misses, 100 * self.hit_rate(), len(self.entries))
+
+    def clear(self):
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path=None):
+        path = path or self.path
+        with open(path, "w") as f:
+            # Least recently used first, so loading keeps the order
+            json.dump({ "entries": [ list(key) + [ points ] for key, points in self.entries.items() ] }, f)
+
+    def load(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        for entry in data["entries"]:
+            self.entries[(str(entry[0]),) + tuple(entry[1:-1])] = entry[-1]
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
@@ -0,0 +1,168 @@
+# Simulator for the card game smear
+
+import sys
+import argparse
+import numpy as np
+from card_encoding import SUIT_INDEX, VALUE_INDEX, RANK_JACK, JICK_OF, CARDS, SmearStack, encode
+from bid_cache import hand_mask, popcount, trump_relative_hand
+import bidding_logic
+from bidding_logic import SmearBiddingLogic, binomial
+
+
+# A precomputed table of the points BasicBidding and BetterBidding expect
+# to win with each suit as trump, for every 6 card hand and every number of
+# players, built offline with:
+#
+#   python pysmear/bid_table.py build --output bid_table.npy
+#
+# The expected points for a suit only depend on the hand as seen with that
+# suit as trump (see bid_cache.trump_relative_hand): which trump ranks are
+# held, and how many off-suit aces and kings, and queens and jacks. So
+# instead of one entry per hand, there is one entry per trump relative hand,
+# and a bid is four lookups. Entries are indexed by the colex rank of the
+# trump ranks held, among the sets of the same size, and then by the counts
+# of off-suit face cards.
+#
+# The file is a .npy array, opened with mmap, so processes using the same
+# file share its pages.
+
+HAND_SIZE = 6
+MAX_PLAYERS = 8
+# The jick is the fourteenth trump rank
+NUM_TRUMP_RANKS = 14
+LOGICS = [ "BasicBidding", "BetterBidding" ]
+
+
+# Number of (aces and kings, queens and jacks) counts that fit in the
+# remaining cards of the hand, and the index of each pair
+def pairs_that_fit(remaining):
+    return (remaining + 1) * (remaining + 2) // 2
+
+
+def pair_index(aces_and_kings, queens_and_jacks, remaining):
+    return aces_and_kings * (remaining + 1) - aces_and_kings * (aces_and_kings - 1) // 2 + queens_and_jacks
+
+
+# SUBSET_RANK[trump_ranks] is the colex rank of the set of trump ranks
+# among the sets with as many ranks: the sum of binomial(rank, i) for the
+# i-th lowest rank held (counting from 1)
+def subset_rank(trump_ranks):
+    rank = 0
+    i = 0
+    for bit in range(0, NUM_TRUMP_RANKS):
+        if trump_ranks & (1 << bit):
+            i += 1
+            rank += binomial(bit, i)
+    return rank
+
+SUBSET_RANK = tuple(subset_rank(m) if popcount(m) <= HAND_SIZE else -1 for m in range(0, 1 << NUM_TRUMP_RANKS))
+
+# Where the entries with k trump start
+BLOCK_OFFSET = []
+NUM_ENTRIES = 0
+for _num_trump in range(0, HAND_SIZE + 1):
+    BLOCK_OFFSET.append(NUM_ENTRIES)
+    NUM_ENTRIES += binomial(NUM_TRUMP_RANKS, _num_trump) * pairs_that_fit(HAND_SIZE - _num_trump)
+BLOCK_OFFSET = tuple(BLOCK_OFFSET)
+
+
+# Returns the index of a trump relative hand of HAND_SIZE cards, or None if
+# it doesn't fit in the hand
+def entry_index(trump_ranks, aces_and_kings, queens_and_jacks):
+    num_trump = popcount(trump_ranks)
+    remaining = HAND_SIZE - num_trump
+    if remaining < 0 or aces_and_kings + queens_and_jacks > remaining:
+        return None
+    return BLOCK_OFFSET[num_trump] + SUBSET_RANK[trump_ranks] * pairs_that_fit(remaining) + pair_index(aces_and_kings, queens_and_jacks, remaining)
+
+
+# The off-suit cards used to make up a hand, with Spades as trump
+OFF_SUIT_ACES_AND_KINGS = [ encode(SUIT_INDEX[suit], VALUE_INDEX[value]) for suit in [ "Hearts", "Diamonds", "Clubs" ] for value in [ "Ace", "King" ] ]
+OFF_SUIT_QUEENS_AND_JACKS = [ encode(SUIT_INDEX["Hearts"], VALUE_INDEX["Queen"]), encode(SUIT_INDEX["Hearts"], RANK_JACK),
+        encode(SUIT_INDEX["Diamonds"], VALUE_INDEX["Queen"]), encode(SUIT_INDEX["Diamonds"], RANK_JACK), encode(SUIT_INDEX["Clubs"], VALUE_INDEX["Queen"]) ]
+OFF_SUIT_LOW_CARDS = [ encode(SUIT_INDEX[suit], VALUE_INDEX[value]) for suit in [ "Hearts", "Diamonds" ] for value in [ "2", "3", "4" ] ]
+
+
+# Returns a hand (with Spades as trump) for a trump relative hand, or None
+# if there aren't enough off-suit queens and jacks to make one
+def example_hand(trump_ranks, aces_and_kings, queens_and_jacks):
+    if queens_and_jacks > len(OFF_SUIT_QUEENS_AND_JACKS):
+        return None
+    spades = SUIT_INDEX["Spades"]
+    cards = [ encode(spades, rank) for rank in range(0, 13) if trump_ranks & (1 << rank) ]
+    if trump_ranks & (1 << 13):
+        cards.append(JICK_OF[spades])
+    cards += OFF_SUIT_ACES_AND_KINGS[:aces_and_kings] + OFF_SUIT_QUEENS_AND_JACKS[:queens_and_jacks]
+    cards += OFF_SUIT_LOW_CARDS[:HAND_SIZE - len(cards)]
+    return SmearStack(CARDS[c] for c in cards)
+
+
+# Returns an array of expected points indexed by [logic, num_players, entry].
+# Entries that no hand can have (or for player counts not built) are NaN
+def build_table(player_counts=range(2, MAX_PLAYERS + 1), verbose=False):
+    table = np.full((len(LOGICS), MAX_PLAYERS + 1, NUM_ENTRIES), np.nan)
+    entries = []
+    for trump_ranks in range(0, 1 << NUM_TRUMP_RANKS):
+        remaining = HAND_SIZE - popcount(trump_ranks)
+        if remaining < 0:
+            continue
+        for aces_and_kings in range(0, remaining + 1):
+            for queens_and_jacks in range(0, remaining - aces_and_kings + 1):
+                hand = example_hand(trump_ranks, aces_and_kings, queens_and_jacks)
+                if hand is not None:
+                    entries.append((entry_index(trump_ranks, aces_and_kings, queens_and_jacks), hand))
+    for logic_index, name in enumerate(LOGICS):
+        logic = getattr(bidding_logic, name)()
+        for num_players in player_counts:
+            if verbose:
+                sys.stdout.write("Building {} for {} players\n".format(name, num_players))
+            for index, hand in entries:
+                table[logic_index, num_players, index] = logic.calculate_expected_points(num_players, hand, "Spades")
+    return table
+
+
+class BidTable(object):
+    def __init__(self, path):
+        self.path = path
+        self.table = None
+
+    # Opened the first time it's used
+    def get_table(self):
+        if self.table is None:
+            self.table = np.load(self.path, mmap_mode="r")
+        return self.table
+
+    # Returns the points the bidding logic expects with each of its suits as
+    # trump, or None if the table doesn't cover it
+    def expected_points_by_suit(self, logic, num_players, my_hand):
+        name = type(logic).__name__
+        if name not in LOGICS or len(my_hand) != HAND_SIZE or not 2 <= num_players <= MAX_PLAYERS:
+            return None
+        row = self.get_table()[LOGICS.index(name), num_players]
+        mask = hand_mask(my_hand)
+        return [ float(row[entry_index(*trump_relative_hand(mask, SUIT_INDEX[suit]))]) for suit in logic.suits ]
+
+
+# Makes every BasicBidding and BetterBidding in this process look up
+# expected points in the table at path (None stops using a table)
+def use_bid_table(path):
+    if path is None:
+        SmearBiddingLogic.bid_table = None
+    elif SmearBiddingLogic.bid_table is None or SmearBiddingLogic.bid_table.path != path:
+        SmearBiddingLogic.bid_table = BidTable(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the table of expected bid points")
+    parser.add_argument("command", choices=[ "build" ])
+    parser.add_argument("--output", default="bid_table.npy", help="file to write the table to")
+    args = parser.parse_args(argv)
+
+    table = build_table(verbose=True)
+    np.save(args.output, table)
+    print "Saved {} entries for {} to {}".format(NUM_ENTRIES, ", ".join(LOGICS), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,28 +4,94 @@ import pydealer
 import math
 from pydealer.const import POKER_RANKS
 from smear_utils import SmearUtils as utils
+from card_encoding import SUITS, SmearCard, SUIT_INDEX, TRUMP_STRENGTH
+
+
+def binomial(n, k):
+    """
+    A fast way to calculate binomial coefficients by Andrew Dalke (contrib).
+    """
+    if 0 <= k <= n:
+        ntok = 1
+        ktok = 1
+        for t in xrange(1, min(k, n - k) + 1):
+            ntok *= n
+            ktok *= t
+            n -= 1
+        return ntok // ktok
+    else:
+        return 0
+
+
+# The highest trump rank (the Ace), with the jick ranked 10 between the 10 and the jack
+HIGHEST_TRUMP_RANK = 14
+
+# Tables of the chance that none of the other players were dealt any of
+# num_cards particular cards (that I don't have), indexed by num_cards and
+# keyed by (num_players, hand_size). Built the first time they are needed
+chance_tables = {}
+
+
+def build_chance_table(num_players, hand_size):
+    table = []
+    for num_cards in range(0, HIGHEST_TRUMP_RANK):
+        remaining_cards_in_deck = 52 - hand_size
+        percent = 1.0
+        for i in range(0, num_players-1):
+            if (remaining_cards_in_deck - num_cards) < hand_size:
+                percent = 0
+                break
+            percent *= binomial(remaining_cards_in_deck - num_cards, hand_size)/float(binomial(remaining_cards_in_deck, hand_size))
+            remaining_cards_in_deck -= hand_size
+        table.append(percent)
+    return tuple(table)
+
+
+def chance_no_one_else_has(num_players, hand_size, num_cards):
+    table = chance_tables.get((num_players, hand_size))
+    if table is None:
+        table = chance_tables[(num_players, hand_size)] = build_chance_table(num_players, hand_size)
+    return table[num_cards]
+
+
+# Rank of a trump card from 1 (the 2) to 14 (the Ace)
+def trump_rank(card, suit):
+    if card.__class__ is SmearCard:
+        return TRUMP_STRENGTH[SUIT_INDEX[suit]][card]
+    if card.suit != suit:
+        # jick
+        return 10
+    rank = POKER_RANKS["values"][card.value]
+    if rank > 9:
+        # Add one to account for jick
+        rank += 1
+    return rank
+
 
 class SmearBiddingLogic(object):
+    # Optional BidTable shared by every bidding logic, see bid_table.use_bid_table
+    bid_table = None
+    # The player's HandViews, set by Player
+    hand_views = None
+    # Shared by every bidding logic, so it doesn't take room in each one
+    suits = SUITS
+
     def __init__(self, debug=False):
         self.debug = debug
-        self.suits = ["Spades", "Clubs", "Diamonds", "Hearts"]
+        # Optional BidCache of expected points, usually shared by every player
+        self.bid_cache = None
 
 
     def choose(self, n, k):
-        """
-        A fast way to calculate binomial coefficients by Andrew Dalke (contrib).
-        """
-        if 0 <= k <= n:
-            ntok = 1
-            ktok = 1
-            for t in xrange(1, min(k, n - k) + 1):
-                ntok *= n
-                ktok *= t
-                n -= 1
-            return ntok // ktok
-        else:
-            return 0
+        return binomial(n, k)
+
 
+    # Indices of my_hand's trump when suit is trump, lowest to highest
+    def trump_indices(self, suit, my_hand):
+        hand_views = self.hand_views
+        if hand_views is not None and hand_views.hand is my_hand:
+            return hand_views.trump_indices(suit)
+        return utils.get_trump_indices(suit, my_hand)
 
     def calculate_bid(self, current_hand, my_hand, force_two=False):
         pass
@@ -36,6 +102,11 @@ class SmearBiddingLogic(object):
     def declare_trump(self):
         pass
 
+    # Called when no more bids will be asked for, to let go of anything the
+    # logic holds on to
+    def close(self):
+        pass
+
 
 # TODO: write more and better versions of these
 class BasicBidding(SmearBiddingLogic):
@@ -46,28 +117,12 @@ class BasicBidding(SmearBiddingLogic):
 
     def expected_points_from_high(self, num_players, my_hand, suit):
         exp_points = 0
-        my_trump = utils.get_trump_indices(suit, my_hand)
+        my_trump = self.trump_indices(suit, my_hand)
         if len(my_trump) == 0:
             return 0
-        high_trump = my_hand[my_trump[-1]]
-        high_rank = 0
-        if high_trump.suit == suit:
-            high_rank = POKER_RANKS["values"][high_trump.value]
-            if high_rank > 9:
-                # Add one to account for jick
-                high_rank += 1
-        else:
-            # jick
-            high_rank = 10
-        other_possible_highs = 14 - high_rank
-        remaining_cards_in_deck = 52 - len(my_hand)
-        percent_that_no_one_else_has_high = 1.0
-        for i in range(0, num_players-1):
-            if (remaining_cards_in_deck - other_possible_highs) < len(my_hand):
-                percent_that_no_one_else_has_high = 0
-                break
-            percent_that_no_one_else_has_high *= self.choose(remaining_cards_in_deck - other_possible_highs, len(my_hand))/float(self.choose(remaining_cards_in_deck, len(my_hand)))
-            remaining_cards_in_deck -= len(my_hand)
+        high_rank = trump_rank(my_hand[my_trump[-1]], suit)
+        other_possible_highs = HIGHEST_TRUMP_RANK - high_rank
+        percent_that_no_one_else_has_high = chance_no_one_else_has(num_players, len(my_hand), other_possible_highs)
         exp_points = 1 * percent_that_no_one_else_has_high
         if self.debug:
             print "{} exp points high: {}".format(suit, exp_points)
@@ -77,28 +132,12 @@ class BasicBidding(SmearBiddingLogic):
 
     def expected_points_from_low(self, num_players, my_hand, suit):
         exp_points = 0
-        my_trump = utils.get_trump_indices(suit, my_hand)
+        my_trump = self.trump_indices(suit, my_hand)
         if len(my_trump) == 0:
             return 0
-        low_trump = my_hand[my_trump[0]]
-        low_rank = 0
-        if low_trump.suit == suit:
-            low_rank = POKER_RANKS["values"][low_trump.value]
-            if low_rank > 9:
-                # Add one to account for jick
-                low_rank += 1
-        else:
-            # jick
-            low_rank = 10
+        low_rank = trump_rank(my_hand[my_trump[0]], suit)
         other_possible_lows = low_rank - 1
-        remaining_cards_in_deck = 52 - len(my_hand)
-        percent_that_no_one_else_has_low = 1.0
-        for i in range(0, num_players-1):
-            if (remaining_cards_in_deck - other_possible_lows) < len(my_hand):
-                percent_that_no_one_else_has_low = 0
-                break
-            percent_that_no_one_else_has_low *= self.choose(remaining_cards_in_deck - other_possible_lows, len(my_hand))/float(self.choose(remaining_cards_in_deck, len(my_hand)))
-            remaining_cards_in_deck -= len(my_hand)
+        percent_that_no_one_else_has_low = chance_no_one_else_has(num_players, len(my_hand), other_possible_lows)
         exp_points = 1 * percent_that_no_one_else_has_low
         if self.debug:
             print "{} exp points low: {}".format(suit, exp_points)
@@ -109,7 +148,7 @@ class BasicBidding(SmearBiddingLogic):
     # TODO - improve
     def expected_points_from_game(self, num_players, my_hand, suit):
         exp_points = 0
-        my_trump = utils.get_trump_indices(suit, my_hand)
+        my_trump = self.trump_indices(suit, my_hand)
         if len(my_trump) == 0:
             return 0
         exp_points = 0.2 * len(my_trump)
@@ -122,7 +161,7 @@ class BasicBidding(SmearBiddingLogic):
     def expected_points_from_jack_and_jick(self, num_players, my_hand, suit):
         exp_points = 0
         jacks_and_jicks = 0
-        my_trump = utils.get_trump_indices(suit, my_hand)
+        my_trump = self.trump_indices(suit, my_hand)
         if len(my_trump) == 0:
             return 0
         for idx in my_trump:
@@ -133,22 +172,41 @@ class BasicBidding(SmearBiddingLogic):
             print "{} exp points jack jick: {}".format(suit, exp_points)
         return exp_points
 
+    # Returns the points expected with each suit (in self.suits order) as trump
+    def expected_points_by_suit(self, num_players, my_hand):
+        if self.debug:
+            return self.calculate_expected_points_by_suit(num_players, my_hand)
+        if self.bid_table is not None:
+            points = self.bid_table.expected_points_by_suit(self, num_players, my_hand)
+            if points is not None:
+                return points
+        if self.bid_cache is not None:
+            return self.bid_cache.expected_points_by_suit(self, num_players, my_hand)
+        return self.calculate_expected_points_by_suit(num_players, my_hand)
+
+    def calculate_expected_points_by_suit(self, num_players, my_hand):
+        return [ self.calculate_expected_points(num_players, my_hand, suit) for suit in self.suits ]
+
+    def calculate_expected_points(self, num_players, my_hand, suit):
+        tmp_bid = 0
+        tmp_bid += self.expected_points_from_high(num_players, my_hand, suit)
+        tmp_bid += self.expected_points_from_low(num_players, my_hand, suit)
+        tmp_bid += self.expected_points_from_game(num_players, my_hand, suit)
+        tmp_bid += self.expected_points_from_jack_and_jick(num_players, my_hand, suit)
+        if self.debug:
+            print "{} tmp_bid: {}".format(suit, tmp_bid)
+        return tmp_bid
+
     def calculate_bid(self, current_hand, my_hand, force_two=False):
         bid = 0
         bid_trump = None
 
         if self.debug:
             print "Hand: {}".format(" ".join(x.abbrev for x in my_hand))
-        for suit in self.suits:
-            tmp_bid = 0
-            tmp_bid += self.expected_points_from_high(current_hand.num_players, my_hand, suit)
-            tmp_bid += self.expected_points_from_low(current_hand.num_players, my_hand, suit)
-            tmp_bid += self.expected_points_from_game(current_hand.num_players, my_hand, suit)
-            tmp_bid += self.expected_points_from_jack_and_jick(current_hand.num_players, my_hand, suit)
-            if self.debug:
-                print "{} tmp_bid: {}".format(suit, tmp_bid)
-            if tmp_bid > bid:
-                bid, bid_trump = tmp_bid, suit
+        points = self.expected_points_by_suit(current_hand.num_players, my_hand)
+        for i in range(0, len(self.suits)):
+            if points[i] > bid:
+                bid, bid_trump = points[i], self.suits[i]
 
         if bid < 2:
             if current_hand.bid < 2 and force_two and bid > 0.3:
@@ -196,27 +254,30 @@ class BetterBidding(BasicBidding):
 
 
     def expected_points_from_game(self, num_players, my_hand, suit):
-        exp_points = 0.0
-        my_trump = utils.get_trump_indices(suit, my_hand)
+        # Added up in hundredths of a point, so the total doesn't depend on
+        # the order of the cards in the hand
+        hundredths = 0
+        my_trump = self.trump_indices(suit, my_hand)
         for index in range(0, len(my_hand)):
             if index in my_trump:
                 if my_hand[index].value == '10':
                     # 10 of trump is valuable for game
                     if len(my_trump) > 2:
-                        exp_points += 0.6
+                        hundredths += 60
                     else:
-                        exp_points += 0.3
+                        hundredths += 30
                 else:
                     # All trump cards will help some
-                    exp_points += 0.20
+                    hundredths += 20
             else:
                 if my_hand[index].value in "Ace King":
                     # Face cards are worth some
-                    exp_points += 0.20
+                    hundredths += 20
                 elif my_hand[index].value in "Queen Jack":
                     # Face cards are worth some
-                    exp_points += 0.15
+                    hundredths += 15
 
+        exp_points = hundredths / 100.0
         if exp_points > 1:
             exp_points = 1
 
@@ -228,7 +289,7 @@ class BetterBidding(BasicBidding):
     def expected_points_from_jack_and_jick(self, num_players, my_hand, suit):
         exp_points = 0
         jacks_and_jicks = 0
-        my_trump = utils.get_trump_indices(suit, my_hand)
+        my_trump = self.trump_indices(suit, my_hand)
         for idx in my_trump:
             if my_hand[idx].value == "Jack":
                 jacks_and_jicks += 1
@@ -256,16 +317,10 @@ class BetterBidding(BasicBidding):
 
         if self.debug:
             print "Hand: {}".format(" ".join(x.abbrev for x in my_hand))
-        for suit in self.suits:
-            tmp_bid = 0
-            tmp_bid += self.expected_points_from_high(current_hand.num_players, my_hand, suit)
-            tmp_bid += self.expected_points_from_low(current_hand.num_players, my_hand, suit)
-            tmp_bid += self.expected_points_from_game(current_hand.num_players, my_hand, suit)
-            tmp_bid += self.expected_points_from_jack_and_jick(current_hand.num_players, my_hand, suit)
-            if self.debug:
-                print "{} tmp_bid: {}".format(suit, tmp_bid)
-            if tmp_bid > bid:
-                bid, bid_trump = tmp_bid, suit
+        points = self.expected_points_by_suit(current_hand.num_players, my_hand)
+        for i in range(0, len(self.suits)):
+            if points[i] > bid:
+                bid, bid_trump = points[i], self.suits[i]
 
         if bid < 2:
             if current_hand.bid < 2 and force_two and bid > 1:
@@ -0,0 +1,106 @@
+# Simulator for the card game smear
+
+import numpy as np
+from card_encoding import NUM_CARDS, SUIT_INDEX, LEAD_INDEX, LEAD_TRUMP, CARD_BIT, CARD_SUIT, IS_TRUMP, TRUMP_MASK, \
+        SUIT_MINUS_JICK_MASK, TRICK_STRENGTH, card_index
+
+
+# VOID_COLUMNS[trump][lead] is which cards (as a boolean array) a player
+# who is out of lead (a suit index, or LEAD_TRUMP) can't be holding
+VOID_COLUMNS = tuple(tuple(np.array([ bool(mask & CARD_BIT[c]) for c in range(0, NUM_CARDS) ])
+    for mask in [ SUIT_MINUS_JICK_MASK[t][s] for s in range(0, 4) ] + [ TRUMP_MASK[t] ]) for t in range(0, 4))
+# STRENGTH[trump][lead] as arrays, to find the cards that beat a card
+STRENGTH = tuple(tuple(np.array(TRICK_STRENGTH[t][lead]) for lead in range(0, 5)) for t in range(0, 4))
+
+
+# The probability that each player holds each card, from what everyone has
+# seen: the cards that have been played, and the suits players have shown
+# they are out of. Row p of matrix is player p, and the last row is the
+# rest of the deck, which wasn't dealt.
+#
+# The matrix is updated as each card is played, and then renormalized so
+# each player's row adds up to the cards they still hold and each card
+# still out adds up to one, by scaling rows and columns in turn (iterative
+# proportional fitting). That gives the most even probabilities that fit
+# what is known, which is close to, but not exactly, the chance of each card
+# over every deal that fits.
+class CardBeliefs(object):
+    __slots__ = ("num_players", "matrix", "hand_sizes", "iterations")
+
+    def __init__(self, num_players, iterations=10):
+        self.num_players = num_players
+        self.iterations = iterations
+        self.matrix = np.zeros((num_players + 1, NUM_CARDS))
+        self.hand_sizes = np.zeros(num_players + 1)
+
+    # Starts a hand with everyone holding hand_sizes[p] cards, each equally
+    # likely to be any card
+    def reset(self, hand_sizes):
+        self.hand_sizes = np.array(list(hand_sizes) + [ NUM_CARDS - sum(hand_sizes) ], dtype=float)
+        self.matrix = np.outer(self.hand_sizes / NUM_CARDS, np.ones(NUM_CARDS))
+
+    def copy(self):
+        beliefs = CardBeliefs(self.num_players, self.iterations)
+        beliefs.matrix = self.matrix.copy()
+        beliefs.hand_sizes = self.hand_sizes.copy()
+        return beliefs
+
+    # card (an int) was played by player_id, who showed they are out of
+    # out_of ("Trump" or a suit, or None)
+    def card_was_played(self, player_id, card, trump, out_of=None):
+        self.matrix[:, card] = 0.0
+        self.hand_sizes[player_id] -= 1
+        if out_of is not None:
+            self.matrix[player_id, VOID_COLUMNS[trump][LEAD_INDEX[out_of]]] = 0.0
+        self.renormalize()
+
+    def renormalize(self):
+        matrix = self.matrix
+        for i in range(0, self.iterations):
+            rows = matrix.sum(axis=1)
+            scale = np.divide(self.hand_sizes, rows, out=np.zeros_like(rows), where=rows > 0)
+            matrix *= scale[:, None]
+            columns = matrix.sum(axis=0)
+            matrix /= np.where(columns > 0, columns, 1.0)
+
+    # The probability that each player holds each card, indexed by [player, card]
+    def holdings(self):
+        return self.matrix[:self.num_players]
+
+    # The beliefs as player_id sees them, knowing they hold my_cards
+    def for_player(self, player_id, my_cards):
+        beliefs = self.copy()
+        mine = np.zeros(NUM_CARDS, dtype=bool)
+        for card in my_cards:
+            mine[card_index(card)] = True
+        beliefs.matrix[:, mine] = 0.0
+        beliefs.matrix[player_id] = 0.0
+        beliefs.matrix[player_id, mine] = 1.0
+        beliefs.renormalize()
+        return beliefs
+
+    # The probability that at least one of players can beat card, in a trick
+    # led with lead (a card, or None if card is leading). Anyone holding a
+    # card that beats it can play it (it is either trump or of the suit led),
+    # and players are taken to hold each card independently
+    def probability_beaten(self, card, lead, trump, players):
+        if not players:
+            return 0.0
+        if lead is None:
+            lead = card
+        strength = STRENGTH[trump][LEAD_TRUMP if IS_TRUMP[trump][lead] else CARD_SUIT[lead]]
+        beats = strength > strength[card]
+        misses = 1.0 - self.matrix[list(players)][:, beats]
+        return 1.0 - float(np.prod(misses))
+
+    # The probability that someone playing after player_id in current_trick
+    # (not counting teammates) can beat card, as player_id sees it
+    def probability_someone_behind_can_beat(self, player_id, card, current_trick, my_cards, teams=None):
+        behind = []
+        for i in range(1, self.num_players - len(current_trick.cards)):
+            p = (player_id + i) % self.num_players
+            if not teams or not any(player_id in team and p in team for team in teams):
+                behind.append(p)
+        lead = current_trick.cards[0] if current_trick.cards else card
+        beliefs = self.for_player(player_id, my_cards)
+        return beliefs.probability_beaten(card_index(card), card_index(lead), SUIT_INDEX[current_trick.trump], behind)
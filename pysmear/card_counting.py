@@ -1,64 +1,97 @@
 # Simulator for the card game smear
 
-import pydealer
-from pydealer.const import POKER_RANKS
 from smear_utils import SmearUtils as utils
+from card_beliefs import CardBeliefs
+from card_encoding import CARDS, NUM_CARDS, SUIT_INDEX, LEAD_INDEX, RANK_JACK, CARD_BIT, JACK_OF, JICK_OF, IS_TRUMP, card_to_int, int_to_card
 
-import operator
+
+# Bits of the cards within a suit, by rank, from CardCounting's bitsets
+RANKS_MASK = (1 << 13) - 1
+# The jack, queen, king and ace of a suit, which rank above the jick
+ABOVE_JICK_MASK = RANKS_MASK & ~((1 << RANK_JACK) - 1)
+# The 2 through the 10 of a suit, which rank below the jick
+BELOW_JICK_MASK = (1 << RANK_JACK) - 1
+JACKS_MASK = sum(CARD_BIT[JACK_OF[s]] for s in range(4))
+
+# Void flags are kept in one integer, with a bit for every player and suit
+# (in LEAD_INDEX order, so Trump is the fifth)
+VOID_BITS_PER_PLAYER = 5
+
+# One shared pydealer.Card per encoded card, returned by highest_card_still_out
+PYDEALER_CARDS = tuple(int_to_card(c) for c in range(NUM_CARDS))
 
 
 # A class that counts cards and can be used to aid playing logic
-class CardCounting:
-    def __init__(self, num_players, debug=False):
+class CardCounting(object):
+    __slots__ = ("num_players", "debug", "int_cards", "trump_played", "off_suit_played", "voids", "beliefs")
+
+    suits = [ "Trump", "Spades", "Clubs", "Hearts", "Diamonds" ]
+
+    def __init__(self, num_players, debug=False, int_cards=False):
         self.num_players = num_players
         self.debug = debug
-        self.suits = [ "Trump", "Spades", "Clubs", "Hearts", "Diamonds" ]
+        # Set when the engine is using integer cards (SmearCard)
+        self.int_cards = int_cards
+
+        # Bitsets (by encoded card) of the trump that has been played, and of
+        # the cards that were played while not trump
+        self.trump_played = 0
+        self.off_suit_played = 0
 
-        # Tracks which cards have been played, a dict of lists
-        self.cards_played = {}
+        # Tracks which players are known to be out of a suit, see set_out_of
+        self.voids = 0
 
-        # Tracks which players are known to be out of a suit, a dict of dicts
-        self.player_out_of_cards = {}
+        # Optional CardBeliefs, see track_beliefs
+        self.beliefs = None
 
         self.reset_for_next_hand()
 
 
-    def reset_for_next_hand(self):
-        for suit in self.suits:
-            self.cards_played[suit] = []
+    # Keeps a CardBeliefs up to date as cards are played. Whoever deals
+    # needs to reset it with each player's hand size at the start of a hand
+    def track_beliefs(self):
+        self.beliefs = CardBeliefs(self.num_players)
+
 
-        for i in range(0, self.num_players):
-            self.player_out_of_cards[i] = {}
-            for suit in self.suits:
-                self.player_out_of_cards[i][suit] = False
+    def reset_for_next_hand(self):
+        self.trump_played = 0
+        self.off_suit_played = 0
+        self.voids = 0
 
 
     def card_was_played(self, player_id, card, current_trick):
-        # Update the list of cards played
-        if utils.is_trump(card, current_trick.trump):
-            self.cards_played["Trump"].append(card)
-            if len(self.cards_played["Trump"]) == 14:
-                # If all trump has been played, everyone is out
-                for i in range(0, self.num_players):
-                    self.player_out_of_cards[i]["Trump"] == True
+        # Update the cards played
+        card_int = card if isinstance(card, int) else card_to_int(card)
+        is_trump = IS_TRUMP[SUIT_INDEX[current_trick.trump]][card_int]
+        if is_trump:
+            self.trump_played |= CARD_BIT[card_int]
         else:
-            self.cards_played[card.suit].append(card)
-            if len(self.cards_played[card.suit]) == 13 if not self.jick_suit_for(current_trick.trump) == card.suit else 12:
-                # If all cards of this suit have been played (only 12 cards for the jick suit), everyone is out
-                for i in range(0, self.num_players):
-                    self.player_out_of_cards[i][card.suit] == True
+            self.off_suit_played |= CARD_BIT[card_int]
 
         # Update if the player is out of the suit
+        out_of = None
         if current_trick.lead_suit == "Trump":
-            if not utils.is_trump(card, current_trick.trump):
-                self.player_out_of_cards[player_id]["Trump"] = True
+            if not is_trump:
+                out_of = "Trump"
         else:
-            if not utils.is_trump(card, current_trick.trump) and card.suit is not current_trick.lead_suit:
+            if not is_trump and card.suit != current_trick.lead_suit:
                 # If player is trumping in, can't tell if he/she is out of lead_suit
                 # So if it isn't trump, and isn't the lead_suit, must be out of lead_suit
-                self.player_out_of_cards[player_id][card.suit] = True
+                out_of = current_trick.lead_suit
+        if out_of is not None:
+            self.set_out_of(player_id, out_of)
+        if self.beliefs is not None:
+            self.beliefs.card_was_played(player_id, card_int, SUIT_INDEX[current_trick.trump], out_of)
+
+
+    def set_out_of(self, player_id, suit):
+        self.voids |= 1 << (player_id * VOID_BITS_PER_PLAYER + LEAD_INDEX[suit])
+
+
+    def is_out_of(self, player_id, suit):
+        return bool(self.voids & (1 << (player_id * VOID_BITS_PER_PLAYER + LEAD_INDEX[suit])))
+
 
-    
     def jick_suit_for(self, suit):
         if suit == "Spades":
             return "Clubs"
@@ -70,38 +103,36 @@ class CardCounting:
             return "Hearts"
         else:
             return "Unknown"
-        
 
+
+    # lookup_suit is "Trump" to look in the trump that has been played, or
+    # the suit the card was played as when it wasn't trump
     def card_has_been_played(self, card, lookup_suit, ignore_this_card):
-        has_been_played = False
-        if card in self.cards_played[lookup_suit]:
-            has_been_played = True
         if ignore_this_card == card:
-            has_been_played = False
-        return has_been_played
+            return False
+        played = self.trump_played if lookup_suit == "Trump" else self.off_suit_played
+        return bool(played & CARD_BIT[card if isinstance(card, int) else card_to_int(card)])
 
 
+    # Returns the highest card of suit that hasn't been played, checking
+    # A K Q J, then the jack of the suit's jick suit, then 10 down to 2. The
+    # jick is only looked for in the trump that has been played, so it's
+    # always still out when suit isn't trump
     def highest_card_still_out(self, suit, is_trump, ignore_this_card=None):
-        card = pydealer.Card("Ace", suit)
-        lookup_suit = suit
-        if is_trump:
-            lookup_suit = "Trump"
-        for entry in sorted(POKER_RANKS["values"].items(), key=operator.itemgetter(1), reverse=True):
-            value = entry[0]
-            if value == "Joker":
-                # We don't play with Jokers for now
-                continue
-            if value == "10":
-                # Last card was jack, force this card to be Jick, and still run the loop for 10
-                card.value = "Jack"
-                card.suit = self.jick_suit_for(suit)
-                if not self.card_has_been_played(card, lookup_suit, ignore_this_card):
-                    return card
-                card.suit = suit
-            card.value = value
-            if not self.card_has_been_played(card, lookup_suit, ignore_this_card):
-                return card
-        return None
+        played = self.trump_played if is_trump else self.off_suit_played
+        if ignore_this_card is not None:
+            played &= ~CARD_BIT[ignore_this_card if isinstance(ignore_this_card, int) else card_to_int(ignore_this_card)]
+        suit_index = SUIT_INDEX[suit]
+        still_out = ~(played >> (suit_index * 13)) & RANKS_MASK
+        if still_out & ABOVE_JICK_MASK:
+            card = suit_index * 13 + (still_out & ABOVE_JICK_MASK).bit_length() - 1
+        elif not is_trump or not played & CARD_BIT[JICK_OF[suit_index]]:
+            card = JICK_OF[suit_index]
+        elif still_out & BELOW_JICK_MASK:
+            card = suit_index * 13 + (still_out & BELOW_JICK_MASK).bit_length() - 1
+        else:
+            return None
+        return CARDS[card] if self.int_cards else PYDEALER_CARDS[card]
 
 
     # Returns true if it is known that no one else (besides teammates) in the trick can take this card
@@ -134,21 +165,21 @@ class CardCounting:
             elif utils.is_trump(card, current_trick.trump):
                 # If we don't have the highest remaining trump, then we need everyone after
                 # us to be out of trump
-                if self.player_out_of_cards[next_player]["Trump"]:
+                if self.is_out_of(next_player, "Trump"):
                     if self.debug:
                         print "safe_to_play {} continuing because {} is out of trump".format(card, next_player)
                     continue
             elif highest_of_suit:
                 # If we have the highest left of that suit, then we need everyone after 
                 # us to be out of trump
-                if self.player_out_of_cards[next_player]["Trump"]:
+                if self.is_out_of(next_player, "Trump"):
                     if self.debug:
                         print "safe_to_play {} continuing because {} is out of trump".format(card, next_player)
                     continue
             else:
                 # If we don't have the highest of the suit and we don't have trump, we need
                 # everyone after us to be out of trump and that suit
-                if self.player_out_of_cards[next_player]["Trump"] and self.player_out_of_cards[next_player][card.suit]:
+                if self.is_out_of(next_player, "Trump") and self.is_out_of(next_player, card.suit):
                     if self.debug:
                         print "safe_to_play {} continuing because {} is out of trump and {}".format(card, next_player, card.suit)
                     continue
@@ -169,11 +200,9 @@ class CardCounting:
 
 
     def jack_or_jick_still_out(self):
-        jboys = 0
-        for card in self.cards_played["Trump"]:
-            if card.value == "Jack":
-                jboys += 1
-        return jboys < 2
+        # The only jacks that can be played as trump are the jack and the jick
+        jboys = self.trump_played & JACKS_MASK
+        return jboys & (jboys - 1) == 0
 
 
     def is_teammate_taking_trick(self, player_id, current_trick, teams):
@@ -0,0 +1,243 @@
+# Simulator for the card game smear
+
+import pydealer
+from pydealer.card import card_abbrev, card_name
+from pydealer.const import POKER_RANKS
+
+# Cards can be encoded as small integers (0-51) for the simulation hot path.
+# card = suit_index * 13 + rank_index, where rank_index is 0 for a 2 and 12
+# for an Ace. Suits are ordered so that the jick of a suit is always the jack
+# of suit_index ^ 1 (Spades/Clubs and Diamonds/Hearts)
+SUITS = [ "Spades", "Clubs", "Diamonds", "Hearts" ]
+VALUES = [ "2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King", "Ace" ]
+NUM_CARDS = 52
+
+SUIT_INDEX = dict((suit, i) for i, suit in enumerate(SUITS))
+VALUE_INDEX = dict((value, i) for i, value in enumerate(VALUES))
+
+RANK_TEN = VALUE_INDEX["10"]
+RANK_JACK = VALUE_INDEX["Jack"]
+
+GAME_POINTS_FOR_VALUE = { "10": 10, "Ace": 4, "King": 3, "Queen": 2, "Jack": 1 }
+
+# Per-card tables, indexed by the encoded card
+CARD_SUIT = tuple(c // 13 for c in range(NUM_CARDS))
+CARD_RANK = tuple(c % 13 for c in range(NUM_CARDS))
+CARD_SUIT_NAME = tuple(SUITS[CARD_SUIT[c]] for c in range(NUM_CARDS))
+CARD_VALUE = tuple(VALUES[CARD_RANK[c]] for c in range(NUM_CARDS))
+CARD_POKER_RANK = tuple(POKER_RANKS["values"][CARD_VALUE[c]] for c in range(NUM_CARDS))
+CARD_GAME_POINTS = tuple(GAME_POINTS_FOR_VALUE.get(CARD_VALUE[c], 0) for c in range(NUM_CARDS))
+CARD_ABBREV = tuple(card_abbrev(CARD_VALUE[c], CARD_SUIT_NAME[c]) for c in range(NUM_CARDS))
+CARD_NAME = tuple(card_name(CARD_VALUE[c], CARD_SUIT_NAME[c]) for c in range(NUM_CARDS))
+# Lower case terms that Stack.find matches each card with
+CARD_FIND_TERMS = tuple(frozenset(x.lower() for x in [ CARD_NAME[c], CARD_SUIT_NAME[c], CARD_VALUE[c], CARD_ABBREV[c],
+    CARD_SUIT_NAME[c][0], CARD_VALUE[c][0] ]) for c in range(NUM_CARDS))
+
+
+def encode(suit_index, rank_index):
+    return suit_index * 13 + rank_index
+
+
+# Per-trump tables, indexed by the trump's suit index
+JACK_OF = tuple(encode(t, RANK_JACK) for t in range(4))
+JICK_OF = tuple(encode(t ^ 1, RANK_JACK) for t in range(4))
+IS_TRUMP = tuple(tuple(CARD_SUIT[c] == t or c == JICK_OF[t] for c in range(NUM_CARDS)) for t in range(4))
+
+
+# Strength of a card as trump: 0 if it isn't trump, otherwise 1 (the 2) up
+# to 14 (the Ace), with the jick ranked between the 10 and the jack
+def _trump_strength(card, trump):
+    if not IS_TRUMP[trump][card]:
+        return 0
+    if card == JICK_OF[trump]:
+        return RANK_JACK + 1
+    if CARD_RANK[card] >= RANK_JACK:
+        return CARD_RANK[card] + 2
+    return CARD_RANK[card] + 1
+
+TRUMP_STRENGTH = tuple(tuple(_trump_strength(c, t) for c in range(NUM_CARDS)) for t in range(4))
+
+# Hands can be held as bitmasks, with bit n set if card n is in the hand
+CARD_BIT = tuple(1 << c for c in range(NUM_CARDS))
+ALL_CARDS_MASK = (1 << NUM_CARDS) - 1
+SUIT_MASK = tuple(sum(CARD_BIT[encode(s, r)] for r in range(13)) for s in range(4))
+# All trump cards (including the jick), for each trump
+TRUMP_MASK = tuple(SUIT_MASK[t] | CARD_BIT[JICK_OF[t]] for t in range(4))
+# The cards that follow a non-trump lead suit: the suit without the jick.
+# Indexed by [trump][lead_suit]
+SUIT_MINUS_JICK_MASK = tuple(tuple(SUIT_MASK[s] & ~CARD_BIT[JICK_OF[t]] for s in range(4)) for t in range(4))
+
+# Sort key for legal plays: by poker rank, with the lead suit before trump
+# of the same rank and the jick before the jack
+LEGAL_PLAY_ORDER = tuple(tuple(CARD_POKER_RANK[c] * 16 + TRUMP_STRENGTH[t][c] for c in range(NUM_CARDS)) for t in range(4))
+
+# Trump cards ordered from lowest to highest, for each trump
+TRUMP_ORDER = tuple(tuple(sorted((c for c in range(NUM_CARDS) if IS_TRUMP[t][c]), key=lambda c: TRUMP_STRENGTH[t][c])) for t in range(4))
+
+
+# Lead suits are indexed like SUITS, with trump lead as LEAD_TRUMP
+LEAD_TRUMP = 4
+LEAD_INDEX = dict(SUIT_INDEX, Trump=LEAD_TRUMP)
+
+
+# Strength of a card within a trick: trump beats everything, then cards of
+# the lead suit by rank. Cards that can't win the trick have a strength of 0
+def _trick_strength(card, trump, lead):
+    if IS_TRUMP[trump][card]:
+        return 100 + TRUMP_STRENGTH[trump][card]
+    if lead != LEAD_TRUMP and CARD_SUIT[card] == lead:
+        return CARD_RANK[card] + 1
+    return 0
+
+# Indexed by [trump][lead][card]
+TRICK_STRENGTH = tuple(tuple(tuple(_trick_strength(c, t, l) for c in range(NUM_CARDS)) for l in range(5)) for t in range(4))
+
+
+class SmearCard(int):
+    """A card encoded as an integer, usable wherever the engine expects a pydealer.Card"""
+    __slots__ = ()
+
+    @property
+    def suit(self):
+        return CARD_SUIT_NAME[self]
+
+    @property
+    def value(self):
+        return CARD_VALUE[self]
+
+    @property
+    def abbrev(self):
+        return CARD_ABBREV[self]
+
+    @property
+    def name(self):
+        return CARD_NAME[self]
+
+    def to_card(self):
+        return pydealer.Card(CARD_VALUE[self], CARD_SUIT_NAME[self])
+
+    def lt(self, other, ranks=None):
+        ranks = ranks or POKER_RANKS
+        return ranks["values"][self.value] < ranks["values"][other.value]
+
+    def gt(self, other, ranks=None):
+        ranks = ranks or POKER_RANKS
+        return ranks["values"][self.value] > ranks["values"][other.value]
+
+    def __repr__(self):
+        return "SmearCard(value=%r, suit=%r)" % (self.value, self.suit)
+
+    def __str__(self):
+        return self.name
+
+# One shared instance per card, so dealing never allocates
+CARDS = tuple(SmearCard(c) for c in range(NUM_CARDS))
+
+
+def card_to_int(card):
+    return CARDS[SUIT_INDEX[card.suit] * 13 + VALUE_INDEX[card.value]]
+
+
+# The integer for card, which may already be one
+def card_index(card):
+    return card if isinstance(card, int) else card_to_int(card)
+
+
+def int_to_card(card):
+    return pydealer.Card(CARD_VALUE[card], CARD_SUIT_NAME[card])
+
+
+def cards_to_mask(cards):
+    mask = 0
+    for card in cards:
+        mask |= CARD_BIT[card]
+    return mask
+
+
+def mask_to_cards(mask):
+    return [ CARDS[c] for c in range(NUM_CARDS) if mask & CARD_BIT[c] ]
+
+
+# A list backed replacement for the parts of pydealer.Stack that the engine
+# uses, holding SmearCards. Cards are always ordered by POKER_RANKS.
+# mask is kept up to date with the cards in the stack
+class SmearStack(object):
+    __slots__ = ("cards", "mask")
+
+    def __init__(self, cards=None):
+        self.cards = list(cards) if cards else []
+        self.mask = cards_to_mask(self.cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __contains__(self, card):
+        return card in self.cards
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+    def __delitem__(self, index):
+        self.mask &= ~CARD_BIT[self.cards[index]]
+        del self.cards[index]
+
+    def __iadd__(self, other):
+        if isinstance(other, SmearCard):
+            self.cards.append(other)
+            self.mask |= CARD_BIT[other]
+        else:
+            for card in other:
+                self.cards.append(card)
+                self.mask |= CARD_BIT[card]
+        return self
+
+    def __str__(self):
+        return "\n".join(str(x) for x in self.cards)
+
+    @property
+    def size(self):
+        return len(self.cards)
+
+    def add(self, cards):
+        self += cards
+
+    def deal(self, num=1):
+        dealt = SmearStack(self.cards[-num:])
+        del self.cards[-num:]
+        self.mask &= ~dealt.mask
+        return dealt
+
+    def empty(self):
+        self.cards = []
+        self.mask = 0
+
+    def find(self, term, limit=0, sort=False, ranks=None):
+        term = term.lower()
+        found_indices = []
+        for i, card in enumerate(self.cards):
+            if term in CARD_FIND_TERMS[card]:
+                found_indices.append(i)
+                if limit and len(found_indices) == limit:
+                    break
+        if sort:
+            found_indices.sort(key=lambda x: CARD_POKER_RANK[self.cards[x]])
+        return found_indices
+
+    def sort(self, ranks=None):
+        self.cards.sort(key=lambda x: CARD_POKER_RANK[x])
+
+    def reverse(self):
+        self.cards.reverse()
+
+
+def stack_to_ints(stack):
+    return SmearStack(card_to_int(card) for card in stack)
+
+
+def ints_to_stack(cards):
+    stack = pydealer.Stack()
+    stack += [ int_to_card(card) for card in cards ]
+    return stack
@@ -0,0 +1,196 @@
+# Simulator for the card game smear
+
+import bisect
+from math import factorial
+import numpy as np
+from card_encoding import SUIT_INDEX, CARD_BIT, ALL_CARDS_MASK, TRUMP_MASK, SUIT_MINUS_JICK_MASK
+from double_dummy import mask_cards
+
+
+# Masks of the cards each player can't be holding, from the suits
+# CardCounting knows they are out of
+def void_masks(card_counting_info, num_players, trump):
+    voids = []
+    for p in range(0, num_players):
+        mask = 0
+        if card_counting_info.is_out_of(p, "Trump"):
+            mask |= TRUMP_MASK[trump]
+        for suit, suit_index in SUIT_INDEX.items():
+            if card_counting_info.is_out_of(p, suit):
+                mask |= SUIT_MINUS_JICK_MASK[trump][suit_index]
+        voids.append(mask)
+    return voids
+
+
+# Deals the cards a player can't see to the other players, num_cards[p]
+# each, so that no one gets a card of a suit they are known to be out of.
+# Every deal that fits is equally likely, and drawing one doesn't depend on
+# luck the way rejection sampling does, which almost never finds a deal
+# late in a hand when a lot of players are out of suits.
+#
+# Players who are out of the same suits (and the rest of the deck, which
+# isn't out of anything) can hold the same cards, so they're dealt to as
+# one "seat class", whose cards are then split between them at random.
+# Cards that the same classes can hold are grouped, and cards only one class
+# can hold go to it. How many cards of each group go to each class is drawn
+# with weights that count the deals with that many, found once (by dynamic
+# programming over the groups and the space left in each class) and then
+# shared by every deal drawn. Drawing a deal is then linear in the number of
+# unseen cards.
+class DealSampler(object):
+    def __init__(self, unseen, num_cards, voids, rng=None):
+        self.num_players = len(num_cards)
+        self.rng = rng if rng is not None else np.random.RandomState()
+        self.cards = mask_cards(unseen)
+        self.num_cards = list(num_cards)
+        left_in_deck = len(self.cards) - sum(num_cards)
+
+        # Seat classes, as (void mask, [ (player, or None for the deck, cards) ])
+        classes = {}
+        for p in range(0, self.num_players):
+            if num_cards[p] > 0:
+                classes.setdefault(voids[p] & unseen, []).append((p, num_cards[p]))
+        if left_in_deck > 0:
+            classes.setdefault(0, []).append((None, left_in_deck))
+        self.classes = sorted(classes.items())
+        self.capacity = tuple(sum(n for seat, n in seats) for void, seats in self.classes)
+
+        # Cards grouped by which classes can hold them, as (classes mask, cards)
+        groups = {}
+        for card in self.cards:
+            allowed = 0
+            for i, (void, seats) in enumerate(self.classes):
+                if not void & CARD_BIT[card]:
+                    allowed |= 1 << i
+            groups.setdefault(allowed, []).append(card)
+        self.groups = sorted(groups.items())
+        self.ways = {}
+        self.choices = {}
+        self.possible = left_in_deck >= 0 and self.count_ways(0, self.capacity) > 0
+
+    # Every way of putting n cards into the classes in allowed, with at most
+    # capacity[i] in class i
+    def splits(self, n, allowed, capacity, i=0):
+        if i == len(capacity):
+            if n == 0:
+                yield ()
+            return
+        if not allowed & (1 << i):
+            for rest in self.splits(n, allowed, capacity, i + 1):
+                yield (0,) + rest
+            return
+        for k in range(0, min(n, capacity[i]) + 1):
+            for rest in self.splits(n - k, allowed, capacity, i + 1):
+                yield (k,) + rest
+
+    # How many ways groups index on can be dealt into classes with capacity
+    # left. Which cards of a group go to each class counts, but not how a
+    # class's cards are split between its seats, which is the same for every
+    # deal
+    def count_ways(self, index, capacity):
+        if index == len(self.groups):
+            return 1 if not any(capacity) else 0
+        key = (index, capacity)
+        ways = self.ways.get(key)
+        if ways is not None:
+            return ways
+        allowed, cards = self.groups[index]
+        n = len(cards)
+        ways = 0
+        choices = []
+        for split in self.splits(n, allowed, capacity):
+            rest = self.count_ways(index + 1, tuple(c - k for c, k in zip(capacity, split)))
+            if rest:
+                weight = factorial(n) * rest
+                for k in split:
+                    weight //= factorial(k)
+                ways += weight
+                choices.append((ways, split))
+        self.ways[key] = ways
+        self.choices[key] = ([ float(total) for total, split in choices ], [ split for total, split in choices ])
+        return ways
+
+    # Draws how many cards of each group go to each class
+    def draw_splits(self, random_values):
+        capacity = self.capacity
+        splits = []
+        for index in range(0, len(self.groups)):
+            totals, choices = self.choices[(index, capacity)]
+            split = choices[bisect.bisect_right(totals, random_values[index] * totals[-1])]
+            splits.append(split)
+            capacity = tuple(c - k for c, k in zip(capacity, split))
+        return splits
+
+    # Returns a deal, as each player's cards (a mask), or None if there isn't
+    # any deal that fits
+    def sample(self):
+        if not self.possible:
+            return None
+        rng = self.rng
+        splits = self.draw_splits(rng.random_sample(len(self.groups)))
+        class_cards = [ [] for c in self.classes ]
+        for (allowed, cards), split in zip(self.groups, splits):
+            order = rng.permutation(len(cards))
+            start = 0
+            for i, k in enumerate(split):
+                class_cards[i].extend(cards[j] for j in order[start:start + k])
+                start += k
+        hands = [ 0 ] * self.num_players
+        for (void, seats), cards in zip(self.classes, class_cards):
+            order = rng.permutation(len(cards))
+            start = 0
+            for seat, n in seats:
+                if seat is not None:
+                    for j in order[start:start + n]:
+                        hands[seat] |= CARD_BIT[cards[j]]
+                start += n
+        return hands
+
+    # Returns num_deals deals as an array of masks, indexed by [deal, player],
+    # or None if there isn't any deal that fits
+    def sample_many(self, num_deals):
+        if not self.possible:
+            return None
+        rng = self.rng
+        num_unseen = len(self.cards)
+        random_values = rng.random_sample((num_deals, len(self.groups)))
+        splits = np.array([ self.draw_splits(random_values[d]) for d in range(0, num_deals) ], dtype=np.int64).reshape(
+                num_deals, len(self.groups), len(self.classes))
+        # Give every card a class: each group's cards in a random order take
+        # the classes in turn, as many as the split says
+        cards = np.empty((num_deals, num_unseen), dtype=np.int64)
+        labels = np.empty((num_deals, num_unseen), dtype=np.int64)
+        start = 0
+        for index, (allowed, group_cards) in enumerate(self.groups):
+            n = len(group_cards)
+            order = np.argsort(rng.random_sample((num_deals, n)), axis=1)
+            cards[:, start:start + n] = np.array(group_cards, dtype=np.int64)[order]
+            ends = np.cumsum(splits[:, index, :], axis=1)
+            labels[:, start:start + n] = (np.arange(n)[None, :, None] >= ends[:, None, :]).sum(axis=2)
+            start += n
+        # Sort the cards by class, in a random order within each class, so
+        # each seat's cards are in the same place in every deal
+        order = np.argsort(labels + rng.random_sample((num_deals, num_unseen)), axis=1)
+        cards = cards[np.arange(num_deals)[:, None], order]
+        bits = np.left_shift(np.uint64(1), cards.astype(np.uint64))
+        hands = np.zeros((num_deals, self.num_players), dtype=np.uint64)
+        start = 0
+        for void, seats in self.classes:
+            for seat, n in seats:
+                if seat is not None:
+                    hands[:, seat] = np.bitwise_or.reduce(bits[:, start:start + n], axis=1)
+                start += n
+        return hands
+
+
+# Returns a DealSampler for the cards player_id can't see, from what
+# card_counting_info knows: the cards that have been played and the suits
+# each player is out of. num_cards is how many cards each player still holds
+def sampler_for(card_counting_info, trump, my_cards, num_cards, player_id, rng=None):
+    num_players = len(num_cards)
+    seen = card_counting_info.trump_played | card_counting_info.off_suit_played
+    for card in my_cards:
+        seen |= CARD_BIT[card]
+    to_deal = list(num_cards)
+    to_deal[player_id] = 0
+    return DealSampler(ALL_CARDS_MASK & ~seen, to_deal, void_masks(card_counting_info, num_players, trump), rng)
@@ -0,0 +1,94 @@
+# Simulator for the card game smear
+
+import numpy as np
+from card_encoding import CARDS, NUM_CARDS, int_to_card, ints_to_stack, SmearStack
+
+
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_MULTIPLIER_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_MULTIPLIER_2 = np.uint64(0x94D049BB133111EB)
+SHIFT_30 = np.uint64(30)
+SHIFT_27 = np.uint64(27)
+SHIFT_31 = np.uint64(31)
+SHIFT_8 = np.uint64(8)
+# Keeps the keys of random streams apart from the keys of decks
+STREAM_TAG = np.uint64(0x5DEECE66D)
+
+
+# splitmix64 finalizer, applied elementwise to an array of uint64s
+def mix64(x):
+    with np.errstate(over="ignore"):
+        z = x + GOLDEN_GAMMA
+        z = (z ^ (z >> SHIFT_30)) * MIX_MULTIPLIER_1
+        z = (z ^ (z >> SHIFT_27)) * MIX_MULTIPLIER_2
+        return z ^ (z >> SHIFT_31)
+
+
+# Returns a (len(hand_indices), 52) array of shuffled decks. Each deck is a
+# pure function of (seed, game_index, hand_index), so any deal can be
+# regenerated on its own, no matter how the deals were batched.
+# game_index can also be an array, one game per hand index
+def shuffled_decks(seed, game_index, hand_indices):
+    hand_indices = np.asarray(hand_indices, dtype=np.uint64)
+    game_indices = np.asarray(game_index, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        game_keys = mix64(mix64(np.array([ seed ], dtype=np.uint64)) + game_indices)
+        deck_keys = mix64(game_keys + hand_indices).reshape(-1)
+        positions = np.arange(NUM_CARDS, dtype=np.uint64)
+        sort_keys = mix64((deck_keys[:, np.newaxis] << SHIFT_8) + positions)
+    return np.argsort(sort_keys, axis=1, kind="mergesort").astype(np.uint8)
+
+
+# Returns the 64 bit key of random stream number stream for game_index,
+# derived from seed the same way decks are
+def stream_key(seed, game_index, stream=0):
+    with np.errstate(over="ignore"):
+        game_key = mix64(mix64(np.array([ seed ], dtype=np.uint64)) + np.uint64(game_index))
+        return int(mix64((game_key ^ STREAM_TAG) + np.uint64(stream))[0])
+
+
+# Returns a RandomState for stream number stream of game_index. Each game (and
+# each stream within a game) gets its own generator, so game k of a run can
+# be regenerated without playing the games before it. Without a seed, the
+# generator is seeded from the OS
+def game_random_state(seed, game_index, stream=0):
+    if seed is None:
+        return np.random.RandomState()
+    key = stream_key(seed, game_index, stream)
+    return np.random.RandomState([ key & 0xFFFFFFFF, key >> 32 ])
+
+
+# Returns a shuffled deck, as a SmearStack of integer cards or a pydealer.Stack
+def shuffle_deck(rng, int_cards=False):
+    order = rng.permutation(NUM_CARDS).tolist()
+    if int_cards:
+        return SmearStack(CARDS[c] for c in order)
+    return ints_to_stack(order)
+
+
+# Deals hands by slicing them out of batches of shuffled decks
+class BatchDealer(object):
+    def __init__(self, seed=0, batch_size=64):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.game_index = None
+        self.first_hand_index = 0
+        self.decks = None
+
+    def get_deck(self, game_index, hand_index):
+        if game_index != self.game_index or not (self.first_hand_index <= hand_index < self.first_hand_index + self.batch_size):
+            self.game_index = game_index
+            self.first_hand_index = hand_index
+            self.decks = shuffled_decks(self.seed, game_index, range(hand_index, hand_index + self.batch_size))
+        return self.decks[hand_index - self.first_hand_index]
+
+    # Returns a list of hands, one per player, as lists of integer cards
+    def deal(self, game_index, hand_index, num_players, cards_to_deal):
+        deck = self.get_deck(game_index, hand_index).tolist()
+        return [ deck[i*cards_to_deal:(i+1)*cards_to_deal] for i in range(0, num_players) ]
+
+    def deal_int_cards(self, game_index, hand_index, num_players, cards_to_deal):
+        return [ [ CARDS[c] for c in hand ] for hand in self.deal(game_index, hand_index, num_players, cards_to_deal) ]
+
+    def deal_pydealer_cards(self, game_index, hand_index, num_players, cards_to_deal):
+        return [ [ int_to_card(c) for c in hand ] for hand in self.deal(game_index, hand_index, num_players, cards_to_deal) ]
@@ -0,0 +1,658 @@
+# Simulator for the card game smear
+
+import random
+from timeit import default_timer as clock
+from card_encoding import NUM_CARDS, SUIT_INDEX, LEAD_TRUMP, CARD_BIT, CARD_SUIT, CARD_RANK, CARD_GAME_POINTS, \
+        JACK_OF, JICK_OF, IS_TRUMP, TRUMP_MASK, SUIT_MINUS_JICK_MASK, TRUMP_STRENGTH, TRICK_STRENGTH, card_index
+
+
+# Solves smear hands with every player's cards known ("double dummy"): who
+# plays what for the rest of the hand when everyone plays perfectly, and
+# which team ends up with high, low, jack, jick and game.
+#
+# Tricks are played and won as Trick and SmearUtils.legal_play_mask do, on
+# integer cards, and points are scored as SmearHandManager.get_scores does.
+
+MAX_PLAYERS = 8
+# Most game points there can be in a hand
+MAX_GAME_POINTS = 80
+# The points that go to whoever wins (or, for low, plays) a particular card
+HIGH, LOW, JACK, JICK = range(0, 4)
+POINT_NAMES = [ "high", "low", "jack", "jick" ]
+INFINITY = 1000
+# Values are never further from 0 than this: a team can score at most 5
+# points, and be set at most 5
+MAX_VALUE = 10
+
+# Zobrist keys for the state of a hand: where each card is (in a player's
+# hand, or played to the current trick by a player), who led the trick, the
+# game points each team has taken, and which team has won each point
+_keys = random.Random(20170)
+def _key():
+    return _keys.getrandbits(64)
+
+HAND_KEYS = tuple(tuple(_key() for c in range(0, NUM_CARDS)) for p in range(0, MAX_PLAYERS))
+TRICK_KEYS = tuple(tuple(_key() for c in range(0, NUM_CARDS)) for p in range(0, MAX_PLAYERS))
+LEADER_KEYS = tuple(_key() for p in range(0, MAX_PLAYERS))
+GAME_KEYS = tuple(tuple(_key() for points in range(0, MAX_GAME_POINTS + 1)) for team in range(0, MAX_PLAYERS))
+# Indexed by [point][team + 1], so an unwon point (None) has a key too
+WON_KEYS = tuple(tuple(_key() for team in range(0, MAX_PLAYERS + 1)) for point in range(0, 4))
+
+# For finding equivalent cards, every card belongs to a group (its suit, or
+# LEAD_TRUMP for trump) and has a place in that group's order. Indexed by
+# [trump][card]
+CARD_GROUP = tuple(tuple(LEAD_TRUMP if IS_TRUMP[t][c] else CARD_SUIT[c] for c in range(0, NUM_CARDS)) for t in range(0, 4))
+CARD_ORDER = tuple(tuple(TRUMP_STRENGTH[t][c] if IS_TRUMP[t][c] else CARD_RANK[c] + 1 for c in range(0, NUM_CARDS)) for t in range(0, 4))
+# Masks of the cards in each group below each place, indexed by [trump][group][place]
+BELOW_MASK = tuple(tuple(tuple(sum(CARD_BIT[c] for c in range(0, NUM_CARDS) if CARD_GROUP[t][c] == g and CARD_ORDER[t][c] < place)
+    for place in range(0, 16)) for g in range(0, 5)) for t in range(0, 4))
+# Sort keys, indexed by [trump][card]: for equivalent cards, by group and
+# place; for leading, strongest first and trump before other suits; and for
+# cards that can't win the trick, the least valuable first
+GROUP_ORDER_KEY = tuple(tuple(CARD_GROUP[t][c] * 16 + CARD_ORDER[t][c] for c in range(0, NUM_CARDS)) for t in range(0, 4))
+LEAD_ORDER_KEY = tuple(tuple(-TRICK_STRENGTH[t][LEAD_TRUMP][c] * 4 - (CARD_SUIT[c] != t) for c in range(0, NUM_CARDS)) for t in range(0, 4))
+LOSER_ORDER_KEY = tuple(tuple(CARD_GAME_POINTS[c] * 32 + TRUMP_STRENGTH[t][c] * 2 for c in range(0, NUM_CARDS)) for t in range(0, 4))
+
+
+def mask_cards(mask):
+    cards = []
+    while mask:
+        bit = mask & -mask
+        cards.append(bit.bit_length() - 1)
+        mask ^= bit
+    return cards
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+# Finds the value of a deal for one team (my_team), with alpha-beta search.
+# My team plays to raise the value and every other team plays to lower it,
+# so with two teams it's the best either side can do. Values are the points
+# my team scores in the hand (or loses, if set) minus the most any other
+# team scores.
+#
+# The state is updated in place by play() and put back by undo(), and has an
+# incrementally updated hash, so positions reached again (in this search,
+# or another deal or trick searched with the same table) are looked up in
+# the transposition table. Moves are ordered with the best move found for a
+# position before, then cards that win the trick, and of cards that are
+# equivalent (no card anyone else holds falls between them, and they're
+# worth the same) only one is searched.
+#
+# Once everyone has two cards left, the last two tricks are looked up in the
+# tablebase, if there is one.
+class DoubleDummySolver(object):
+    # Optional EndgameTablebase shared by every solver, see
+    # endgame_tablebase.use_endgame_tablebase
+    tablebase = None
+
+    def __init__(self, trump, team_of, my_team, bid, bidder, table=None, deadline=None):
+        self.trump = SUIT_INDEX[trump]
+        self.team_of = team_of
+        self.num_players = len(team_of)
+        self.num_teams = max(team_of) + 1
+        self.my_team = my_team
+        self.bid = bid
+        self.bidder_team = team_of[bidder]
+        self.table = table if table is not None else {}
+        self.deadline = deadline
+        self.nodes = 0
+        self.hands = None
+        self.tricks = None
+        self.point_cards = None
+        self.trick = ()
+        self.trick_players = ()
+        self.leader = 0
+        self.game = None
+        self.won = None
+        # The team that will win high and low, once the deal is set
+        self.sure_won = None
+        self.hash = 0
+        self.cards_left = 0
+        # Every card still in someone's hand, every card in the deal, and
+        # their game points
+        self.in_hands = 0
+        self.in_deal = 0
+        self.total_game = 0
+        self.history = []
+
+    # hands is the cards (as a mask) each player is holding, and trick and
+    # trick_players the cards played to the current trick so far. The
+    # finished tricks are given as (cards, player ids, winner id)
+    def set_deal(self, hands, tricks, trick, trick_players, leader):
+        trump = self.trump
+        self.hands = list(hands)
+        self.tricks = list(tricks)
+        self.trick = tuple(trick)
+        self.trick_players = tuple(trick_players)
+        self.leader = leader
+        self.cards_left = sum(bin(h).count("1") for h in hands)
+        self.in_hands = 0
+        for h in hands:
+            self.in_hands |= h
+        self.history = []
+
+        # Which cards win each point, out of every card in this deal
+        in_deal = 0
+        for h in hands:
+            in_deal |= h
+        for cards, player_ids, winner_id in tricks:
+            for card in cards:
+                in_deal |= CARD_BIT[card]
+        for card in trick:
+            in_deal |= CARD_BIT[card]
+        strength = TRUMP_STRENGTH[trump]
+        trump_cards = sorted(mask_cards(in_deal & TRUMP_MASK[trump]), key=lambda c: strength[c])
+        high = trump_cards[-1] if trump_cards else None
+        low = trump_cards[0] if trump_cards else None
+        self.point_cards = (high, low, JACK_OF[trump], JICK_OF[trump])
+        self.in_deal = in_deal
+        self.total_game = sum(CARD_GAME_POINTS[c] for c in mask_cards(in_deal))
+
+        game = [ 0 ] * self.num_teams
+        won = [ None ] * 4
+        for cards, player_ids, winner_id in tricks:
+            for card, player_id in zip(cards, player_ids):
+                game[self.team_of[winner_id]] += CARD_GAME_POINTS[card]
+                self.update_won(won, card, player_id, winner_id)
+        for card, player_id in zip(trick, trick_players):
+            if card == low:
+                won[LOW] = self.team_of[player_id]
+        if not trump_cards:
+            # No one has any trump, high and low go to the first player
+            won[HIGH] = won[LOW] = self.team_of[0]
+        self.game = tuple(game)
+        self.won = tuple(won)
+        # High always wins its trick, and low goes to whoever plays it, so
+        # both go to the team holding them (or that played high to this trick)
+        sure_won = list(won)
+        for point in [ HIGH, LOW ]:
+            if sure_won[point] is not None:
+                continue
+            card = self.point_cards[point]
+            for card_played, player_id in zip(trick, trick_players):
+                if card_played == card:
+                    sure_won[point] = self.team_of[player_id]
+            for p in range(0, self.num_players):
+                if hands[p] & CARD_BIT[card]:
+                    sure_won[point] = self.team_of[p]
+        self.sure_won = tuple(sure_won)
+
+        h = LEADER_KEYS[leader]
+        for p in range(0, self.num_players):
+            for card in mask_cards(self.hands[p]):
+                h ^= HAND_KEYS[p][card]
+        for card, player_id in zip(trick, trick_players):
+            h ^= TRICK_KEYS[player_id][card]
+        for team in range(0, self.num_teams):
+            h ^= GAME_KEYS[team][game[team]]
+        for point in range(0, 4):
+            h ^= WON_KEYS[point][1 if won[point] is None else won[point] + 1]
+        self.hash = h
+
+    def update_won(self, won, card, player_id, winner_id):
+        high, low, jack, jick = self.point_cards
+        if card == high:
+            won[HIGH] = self.team_of[winner_id]
+        if card == low:
+            won[LOW] = self.team_of[player_id]
+        if card == jack:
+            won[JACK] = self.team_of[winner_id]
+        elif card == jick:
+            won[JICK] = self.team_of[winner_id]
+
+    def to_play(self):
+        return (self.leader + len(self.trick)) % self.num_players
+
+    def legal_moves(self, player):
+        if not self.trick:
+            return self.hands[player]
+        return self.legal_follows(self.trick[0], self.hands[player])
+
+    # The cards in hand that can be played to a trick led with lead
+    def legal_follows(self, lead, hand):
+        trump = self.trump
+        trump_cards = hand & TRUMP_MASK[trump]
+        if IS_TRUMP[trump][lead]:
+            return trump_cards or hand
+        lead_suit_cards = hand & SUIT_MINUS_JICK_MASK[trump][CARD_SUIT[lead]]
+        if lead_suit_cards == 0:
+            return hand
+        return lead_suit_cards | trump_cards
+
+    # Drops every card that is equivalent to the next lower card kept
+    def without_equivalent_cards(self, player, cards):
+        trump = self.trump
+        group = CARD_GROUP[trump]
+        order = CARD_ORDER[trump]
+        below = BELOW_MASK[trump]
+        point_cards = self.point_cards
+        in_play = self.in_hands & ~self.hands[player]
+        for card in self.trick:
+            in_play |= CARD_BIT[card]
+        cards.sort(key=GROUP_ORDER_KEY[trump].__getitem__)
+        kept = [ cards[0] ]
+        last = cards[0]
+        for card in cards[1:]:
+            if group[card] == group[last] and CARD_GAME_POINTS[card] == CARD_GAME_POINTS[last] and card not in point_cards and \
+                    last not in point_cards and in_play & below[group[card]][order[card]] & ~below[group[last]][order[last] + 1] == 0:
+                continue
+            kept.append(card)
+            last = card
+        return kept
+
+    # Cards that can win the trick are tried first, lowest first, and then
+    # the rest from the least to the most valuable
+    def ordered_moves(self, player, first=None):
+        legal = self.legal_moves(player)
+        if legal & (legal - 1) == 0:
+            return [ legal.bit_length() - 1 ]
+        cards = self.without_equivalent_cards(player, mask_cards(legal))
+        trump = self.trump
+        if not self.trick:
+            cards.sort(key=LEAD_ORDER_KEY[trump].__getitem__)
+        else:
+            lead = self.trick[0]
+            strength = TRICK_STRENGTH[trump][LEAD_TRUMP if IS_TRUMP[trump][lead] else CARD_SUIT[lead]]
+            best = max([ strength[c] for c in self.trick ])
+            winners = [ c for c in cards if strength[c] > best ]
+            if winners:
+                winners.sort(key=strength.__getitem__)
+                losers = [ c for c in cards if strength[c] <= best ]
+                losers.sort(key=LOSER_ORDER_KEY[trump].__getitem__)
+                cards = winners + losers
+            else:
+                cards.sort(key=LOSER_ORDER_KEY[trump].__getitem__)
+        if first is not None and cards[0] != first and first in cards:
+            cards.remove(first)
+            cards.insert(0, first)
+        return cards
+
+    def play(self, card):
+        player = (self.leader + len(self.trick)) % self.num_players
+        self.history.append((self.trick, self.trick_players, self.leader, self.game, self.won, self.hash))
+        self.hands[player] ^= CARD_BIT[card]
+        self.in_hands ^= CARD_BIT[card]
+        self.cards_left -= 1
+        h = self.hash ^ HAND_KEYS[player][card] ^ TRICK_KEYS[player][card]
+        trick = self.trick + (card,)
+        trick_players = self.trick_players + (player,)
+        if len(trick) < self.num_players:
+            self.trick = trick
+            self.trick_players = trick_players
+            if card == self.point_cards[LOW]:
+                won = list(self.won)
+                won[LOW] = self.team_of[player]
+                h ^= WON_KEYS[LOW][1] ^ WON_KEYS[LOW][won[LOW] + 1]
+                self.won = tuple(won)
+            self.hash = h
+            return
+        # The trick is finished, give it to the winner
+        trump = self.trump
+        strength = TRICK_STRENGTH[trump][LEAD_TRUMP if IS_TRUMP[trump][trick[0]] else CARD_SUIT[trick[0]]]
+        winner_index = 0
+        for i in range(1, len(trick)):
+            if strength[trick[i]] > strength[trick[winner_index]]:
+                winner_index = i
+        winner_id = trick_players[winner_index]
+        winning_team = self.team_of[winner_id]
+        game = list(self.game)
+        won = list(self.won)
+        old_won = self.won
+        points = 0
+        for i in range(0, len(trick)):
+            h ^= TRICK_KEYS[trick_players[i]][trick[i]]
+            points += CARD_GAME_POINTS[trick[i]]
+            self.update_won(won, trick[i], trick_players[i], winner_id)
+        h ^= GAME_KEYS[winning_team][game[winning_team]]
+        game[winning_team] += points
+        h ^= GAME_KEYS[winning_team][game[winning_team]]
+        for point in range(0, 4):
+            if won[point] != old_won[point]:
+                h ^= WON_KEYS[point][1 if old_won[point] is None else old_won[point] + 1] ^ WON_KEYS[point][won[point] + 1]
+        h ^= LEADER_KEYS[self.leader] ^ LEADER_KEYS[winner_id]
+        self.trick = ()
+        self.trick_players = ()
+        self.leader = winner_id
+        self.game = tuple(game)
+        self.won = tuple(won)
+        self.hash = h
+
+    def undo(self, card):
+        self.trick, self.trick_players, self.leader, self.game, self.won, self.hash = self.history.pop()
+        player = (self.leader + len(self.trick)) % self.num_players
+        self.hands[player] |= CARD_BIT[card]
+        self.in_hands |= CARD_BIT[card]
+        self.cards_left += 1
+
+    # The points each team scores, as get_scores awards them
+    def team_scores(self):
+        scores = [ 0 ] * self.num_teams
+        for team in self.won:
+            if team is not None:
+                scores[team] += 1
+        most = max(self.game)
+        if self.game.count(most) == 1:
+            scores[self.game.index(most)] += 1
+        if scores[self.bidder_team] < self.bid:
+            scores[self.bidder_team] = -self.bid
+        return scores
+
+    def value(self):
+        scores = self.team_scores()
+        mine = scores[self.my_team]
+        scores[self.my_team] = -INFINITY
+        return mine - max(scores)
+
+    # The least and most the value can end up as, from the points that are
+    # already decided: high and low from the start, jack and jick once
+    # they're won (or their card isn't in the deal), and game once the team
+    # ahead can't be caught. Only the teams that could still get to the most
+    # game points might win it
+    def value_bounds(self):
+        scores = [ 0 ] * self.num_teams
+        undecided = 0
+        won = self.won
+        sure_won = self.sure_won
+        for point in range(0, 4):
+            team = won[point] if won[point] is not None else sure_won[point]
+            if team is not None:
+                scores[team] += 1
+            elif self.in_deal & CARD_BIT[self.point_cards[point]]:
+                undecided += 1
+        # Which teams could still take the most game points
+        game = self.game
+        game_left = self.total_game - sum(game)
+        can_win_game = []
+        for team in range(0, self.num_teams):
+            others = max(game[t] for t in range(0, self.num_teams) if t != team)
+            if game[team] > others + game_left:
+                scores[team] += 1
+                can_win_game.append(False)
+            else:
+                can_win_game.append(game[team] + game_left > others)
+        lowest = []
+        highest = []
+        for team in range(0, self.num_teams):
+            low = scores[team]
+            high = scores[team] + undecided + can_win_game[team]
+            if team == self.bidder_team:
+                if low < self.bid:
+                    low = -self.bid
+                if high < self.bid:
+                    high = -self.bid
+            lowest.append(low)
+            highest.append(high)
+        my_team = self.my_team
+        others = [ t for t in range(0, self.num_teams) if t != my_team ]
+        return lowest[my_team] - max(highest[t] for t in others), highest[my_team] - max(lowest[t] for t in others)
+
+    # Everyone has one card left to play, so there's nothing to choose
+    def last_trick_value(self):
+        played = []
+        while self.cards_left > 0:
+            card = self.hands[self.to_play()].bit_length() - 1
+            self.play(card)
+            played.append(card)
+        value = self.value()
+        for card in reversed(played):
+            self.undo(card)
+        return value
+
+    # Everyone has two cards left: finds the best line in the tablebase, or
+    # returns None if it isn't there
+    def endgame_value(self):
+        num_players = self.num_players
+        order = [ (self.leader + i) % num_players for i in range(0, num_players) ]
+        found = self.tablebase.lookup(self.trump, [ mask_cards(self.hands[p]) for p in order ])
+        if found is None:
+            return None
+        winners, cards = found
+        # The game points of the cards each player plays first, and the
+        # cards that win points, as (player index, choice, card)
+        game_points = [ (CARD_GAME_POINTS[first], CARD_GAME_POINTS[second]) for first, second in cards ]
+        point_cards = [ (i, choice, cards[i][choice]) for i in range(0, num_players) for choice in [ 0, 1 ]
+            if cards[i][choice] in self.point_cards ]
+        total_points = sum(first + second for first, second in game_points)
+        return self.best_line((order, cards, winners, game_points, total_points, point_cards), 0, 0)
+
+    def best_line(self, endgame, i, line):
+        order, cards = endgame[0], endgame[1]
+        if i == len(order):
+            return self.line_value(endgame, line)
+        first, second = cards[i]
+        if i == 0:
+            choices = [ 0, 1 ]
+        else:
+            lead = cards[0][line & 1]
+            legal = self.legal_follows(lead, CARD_BIT[first] | CARD_BIT[second])
+            choices = [ choice for choice in [ 0, 1 ] if legal & CARD_BIT[cards[i][choice]] ]
+        values = [ self.best_line(endgame, i + 1, line | choice << i) for choice in choices ]
+        return max(values) if self.team_of[order[i]] == self.my_team else min(values)
+
+    # The value once both tricks are played as line
+    def line_value(self, endgame, line):
+        order, cards, winners, game_points, total_points, point_cards = endgame
+        line_winners = winners >> (4 * line) & 15
+        first_winner = order[line_winners & 3]
+        second_winner = order[line_winners >> 2]
+        first_points = 0
+        for i in range(0, len(order)):
+            first_points += game_points[i][line >> i & 1]
+        game = list(self.game)
+        game[self.team_of[first_winner]] += first_points
+        game[self.team_of[second_winner]] += total_points - first_points
+        won = list(self.won)
+        for i, choice, card in point_cards:
+            self.update_won(won, card, order[i], first_winner if line >> i & 1 == choice else second_winner)
+        saved = self.game, self.won
+        self.game, self.won = tuple(game), tuple(won)
+        value = self.value()
+        self.game, self.won = saved
+        return value
+
+    def search(self, alpha, beta):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & 1023 == 0 and clock() > self.deadline:
+            raise SearchTimeout()
+        if self.cards_left + len(self.trick) <= self.num_players:
+            return self.last_trick_value()
+        key = self.hash
+        entry = self.table.get(key)
+        if entry is not None:
+            lower, upper, best_card = entry
+            if lower >= beta:
+                return lower
+            if upper <= alpha:
+                return upper
+            if lower == upper:
+                return lower
+        else:
+            lower, upper, best_card = -INFINITY, INFINITY, None
+        if not self.trick:
+            least, most = self.value_bounds()
+            if least >= beta or least == most:
+                return least
+            if most <= alpha:
+                return most
+            if self.tablebase is not None and self.cards_left == 2 * self.num_players:
+                value = self.endgame_value()
+                if value is not None:
+                    self.table[key] = (value, value, None)
+                    return value
+        original_alpha, original_beta = alpha, beta
+        alpha = max(alpha, lower)
+        beta = min(beta, upper)
+
+        player = (self.leader + len(self.trick)) % self.num_players
+        maximizing = self.team_of[player] == self.my_team
+        best = -INFINITY if maximizing else INFINITY
+        for card in self.ordered_moves(player, best_card):
+            self.play(card)
+            value = self.search(alpha, beta)
+            self.undo(card)
+            if maximizing:
+                if value > best:
+                    best = value
+                    best_card = card
+                    if best > alpha:
+                        alpha = best
+            else:
+                if value < best:
+                    best = value
+                    best_card = card
+                    if best < beta:
+                        beta = best
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            upper = min(upper, best)
+        elif best >= original_beta:
+            lower = max(lower, best)
+        else:
+            lower = upper = best
+        self.table[key] = (lower, upper, best_card)
+        return best
+
+    # Finds the value with null window searches, which cut off far more than
+    # searching for it with the whole range at once. The first search is at
+    # guess (if it's given, usually the value of a similar position), and
+    # then each one halves the range of values it could still be in, which
+    # starts at value_bounds
+    def solve_value(self, guess=None):
+        if self.cards_left == 0:
+            return self.value()
+        lower, upper = self.value_bounds()
+        while lower < upper:
+            if guess is None or not lower < guess <= upper:
+                guess = (lower + upper + 1) // 2
+            value = self.search(guess - 1, guess)
+            if value >= guess:
+                lower = value
+                # Most likely it is exactly value
+                guess = value + 1
+            else:
+                upper = value
+                guess = None
+        return lower
+
+    # Returns the value of playing each card, for the player to play
+    def card_values(self, cards):
+        values = []
+        guess = None
+        for card in cards:
+            self.play(card)
+            value = self.solve_value(guess)
+            self.undo(card)
+            values.append(value)
+            guess = value
+        return values
+
+    # Returns the best card for the player to play, and its value. Of
+    # equally good cards, the first one ordered_moves tries is chosen
+    def best_card(self):
+        player = self.to_play()
+        cards = self.ordered_moves(player)
+        values = self.card_values(cards)
+        if self.team_of[player] == self.my_team:
+            best = max(values)
+        else:
+            best = min(values)
+        return cards[values.index(best)], best
+
+    # Returns the first card ordered_moves tries that keeps the value at
+    # value, the value of the position. Only one null window search is
+    # needed per card, and the ones searched for the value are mostly in
+    # the transposition table already
+    def card_keeping_value(self, value):
+        player = self.to_play()
+        maximizing = self.team_of[player] == self.my_team
+        cards = self.ordered_moves(player)
+        for card in cards[:-1]:
+            self.play(card)
+            if maximizing:
+                keeps_value = self.search(value - 1, value) >= value
+            else:
+                keeps_value = self.search(value, value + 1) <= value
+            self.undo(card)
+            if keeps_value:
+                return card
+        return cards[-1]
+
+    # Plays out the rest of the hand with the best card at every turn (the
+    # same card best_card chooses), and returns what happened. The state is
+    # left as it was
+    def solve(self):
+        plays = []
+        value = self.solve_value()
+        while self.cards_left > 0:
+            player = self.to_play()
+            card = self.card_keeping_value(value)
+            plays.append((player, card))
+            self.play(card)
+        result = self.outcome(plays)
+        result["value"] = value
+        for player, card in reversed(plays):
+            self.undo(card)
+        return result
+
+    # Who won each point, the game points taken by each team and the points
+    # each team scores, once plays have finished the hand
+    def outcome(self, plays):
+        tricks = list(self.tricks)
+        trick = list(zip(self.trick_players, self.trick))
+        for player, card in plays:
+            trick.append((player, card))
+            if len(trick) == self.num_players:
+                strength = TRICK_STRENGTH[self.trump][LEAD_TRUMP if IS_TRUMP[self.trump][trick[0][1]] else CARD_SUIT[trick[0][1]]]
+                winner_id = max(trick, key=lambda x: strength[x[1]])[0]
+                tricks.append(([ c for p, c in trick ], [ p for p, c in trick ], winner_id))
+                trick = []
+        result = { "plays": plays, "game_points": list(self.game), "scores": self.team_scores() }
+        winners = [ None ] * 4
+        high, low, jack, jick = self.point_cards
+        for cards, player_ids, winner_id in tricks:
+            for card, player_id in zip(cards, player_ids):
+                if card == high:
+                    winners[HIGH] = winner_id
+                if card == low:
+                    winners[LOW] = player_id
+                if card == jack:
+                    winners[JACK] = winner_id
+                elif card == jick:
+                    winners[JICK] = winner_id
+        if high is None:
+            winners[HIGH] = winners[LOW] = 0
+        for point in range(0, 4):
+            result[POINT_NAMES[point]] = winners[point]
+        most = max(self.game)
+        result["game"] = self.game.index(most) if self.game.count(most) == 1 else None
+        return result
+
+
+# Returns a solver for the hand being played by hand_manager, from the point
+# of view of player_id's team
+def solver_for_hand(hand_manager, player_id, table=None, deadline=None):
+    current_hand = hand_manager.current_hand
+    num_players = hand_manager.num_players
+    # Without teams, everyone plays for themselves
+    team_of = range(0, num_players)
+    for team_id, team in enumerate(hand_manager.teams or []):
+        for p in team:
+            team_of[p] = team_id
+    solver = DoubleDummySolver(current_hand.trump, team_of, team_of[player_id], current_hand.bid, current_hand.bidder, table, deadline)
+    hands = []
+    for p in range(0, num_players):
+        mask = 0
+        for card in hand_manager.players[p].hand:
+            mask |= CARD_BIT[card_index(card)]
+        hands.append(mask)
+    tricks = [ ([ card_index(c) for c in cards ], list(player_ids), winner_id) for cards, player_ids, winner_id in current_hand.tricks ]
+    current_trick = current_hand.current_trick
+    trick_players = list(current_trick.player_ids)
+    leader = trick_players[0] if trick_players else current_hand.first_player
+    solver.set_deal(hands, tricks, [ card_index(c) for c in current_trick.cards ], trick_players, leader)
+    return solver
@@ -0,0 +1,250 @@
+# Simulator for the card game smear
+
+import os
+import sys
+import random
+import argparse
+import itertools
+from timeit import default_timer as clock
+import numpy as np
+from card_encoding import NUM_CARDS, CARD_BIT, CARD_SUIT, IS_TRUMP, SUITS
+from double_dummy import DoubleDummySolver, CARD_ORDER
+
+
+# A precomputed table of the last two tricks of a hand, for the double dummy
+# solver, built offline with:
+#
+#   python pysmear/endgame_tablebase.py build --output endgame.npy
+#
+# Once everyone is down to two cards, the only choice left is which of them
+# to play to the next trick. Who wins the two tricks only depends on which
+# cards are trump, the suits of the rest, and the order of the cards within
+# each suit (or trump), so states are stored trump relative, with every
+# card's rank replaced by its place among the cards still in play, and the
+# players counted from the one leading.
+#
+# Which line of play is best depends on the score (the bid, and the points
+# and game points already taken), so for each state the table stores who
+# wins both tricks for every line instead: a line is which of their two
+# cards each player plays first. The solver then finds the best line for
+# its own score with a search over at most 2 ** players lines, instead of
+# playing the cards out. Entries are sorted by state, and the file is a
+# .npy array opened with mmap, so processes using the same file share its
+# pages.
+#
+# States with up to MAX_PLAYERS players are built. With one card each
+# there's nothing to choose, and the solver already scores those directly.
+
+CARDS_PER_PLAYER = 2
+MAX_PLAYERS = 4
+# Bits for a card's place within its group, and for a card (group and place)
+PLACE_BITS = 3
+CARD_BITS = PLACE_BITS + 2
+# Bits for the winner of a trick, and for both winners of a line
+WINNER_BITS = 2
+LINE_BITS = 2 * WINNER_BITS
+
+# Trump is group 0, and the other suits are 1 to 3, counting up from trump.
+# Indexed by [trump][card]
+ENDGAME_GROUP = tuple(tuple(0 if IS_TRUMP[t][c] else (CARD_SUIT[c] - t) % 4 for c in range(0, NUM_CARDS)) for t in range(0, 4))
+
+
+# Returns the key of a state, from each player's cards, as (group, place),
+# lowest first, starting with the player leading
+def state_key(pairs):
+    key = len(pairs)
+    for pair in pairs:
+        for group, place in pair:
+            key = key << CARD_BITS | group << PLACE_BITS | place
+    return key
+
+
+# Returns the index (from the first card played) of the card that wins a
+# trick of (group, place) cards
+def trick_winner(cards):
+    best = 0
+    for i in range(1, len(cards)):
+        group, place = cards[i]
+        best_group, best_place = cards[best]
+        if group == best_group:
+            if place > best_place:
+                best = i
+        elif group == 0:
+            best = i
+    return best
+
+
+# Returns who (counted from the player leading) wins each trick for every
+# line, packed LINE_BITS to a line. Bit i of a line is set if the player i
+# after the leader plays their second card to the first trick
+def line_winners(pairs):
+    num_players = len(pairs)
+    packed = 0
+    for line in range(0, 1 << num_players):
+        first = [ pairs[i][line >> i & 1] for i in range(0, num_players) ]
+        first_winner = trick_winner(first)
+        # The winner of the first trick leads the second
+        order = [ (first_winner + i) % num_players for i in range(0, num_players) ]
+        second = [ pairs[p][1 - (line >> p & 1)] for p in order ]
+        second_winner = order[trick_winner(second)]
+        packed |= (first_winner | second_winner << WINNER_BITS) << (LINE_BITS * line)
+    return packed
+
+
+# Every state for num_players: each player's pair of (group, place) cards,
+# lowest first
+def all_states(num_players):
+    num_cards = CARDS_PER_PLAYER * num_players
+    for trump_cards in range(0, num_cards + 1):
+        for first_suit in range(0, num_cards - trump_cards + 1):
+            for second_suit in range(0, num_cards - trump_cards - first_suit + 1):
+                sizes = [ trump_cards, first_suit, second_suit, num_cards - trump_cards - first_suit - second_suit ]
+                cards = [ (group, place) for group in range(0, 4) for place in range(0, sizes[group]) ]
+                for pairs in deal_pairs(cards, num_players):
+                    yield pairs
+
+
+def deal_pairs(cards, num_players):
+    if num_players == 0:
+        yield []
+        return
+    for pair in itertools.combinations(cards, CARDS_PER_PLAYER):
+        rest = [ c for c in cards if c not in pair ]
+        for pairs in deal_pairs(rest, num_players - 1):
+            yield [ pair ] + pairs
+
+
+# Returns an array with the sorted keys of every state for player_counts in
+# row 0, and their line winners in row 1
+def build_table(player_counts=range(2, MAX_PLAYERS + 1), verbose=False):
+    entries = []
+    for num_players in player_counts:
+        if verbose:
+            sys.stdout.write("Building {} player endgames\n".format(num_players))
+        for pairs in all_states(num_players):
+            entries.append((state_key(pairs), line_winners(pairs)))
+    entries.sort()
+    return np.array([ [ key for key, winners in entries ], [ winners for key, winners in entries ] ], dtype=np.uint64)
+
+
+class EndgameTablebase(object):
+    def __init__(self, path):
+        self.path = path
+        self.table = None
+        self.lookups = 0
+        self.hits = 0
+
+    # Opened the first time it's used
+    def get_table(self):
+        if self.table is None:
+            self.table = np.load(self.path, mmap_mode="r")
+        return self.table
+
+    # Returns the line winners for hands (two card ints each, starting with
+    # the player leading) with trump, and each player's cards in the order
+    # lines use them, or None if the table doesn't cover it
+    def lookup(self, trump, hands):
+        self.lookups += 1
+        if len(hands) > MAX_PLAYERS:
+            return None
+        group = ENDGAME_GROUP[trump]
+        order = CARD_ORDER[trump]
+        place = {}
+        count = [ 0 ] * 4
+        for g, o, c in sorted((group[c], order[c], c) for hand in hands for c in hand):
+            place[c] = (g, count[g])
+            count[g] += 1
+        pairs = []
+        cards = []
+        for a, b in hands:
+            if place[b] < place[a]:
+                a, b = b, a
+            pairs.append((place[a], place[b]))
+            cards.append((a, b))
+        key = state_key(pairs)
+        table = self.get_table()
+        index = np.searchsorted(table[0], np.uint64(key))
+        if index == table.shape[1] or table[0, index] != key:
+            return None
+        self.hits += 1
+        return int(table[1, index]), cards
+
+    def coverage(self):
+        return self.hits / float(self.lookups) if self.lookups else 0.0
+
+    # How many states are in the table for each number of players
+    def states_by_players(self):
+        keys = self.get_table()[0]
+        counts = {}
+        for num_players in range(2, MAX_PLAYERS + 1):
+            bits = CARD_BITS * CARDS_PER_PLAYER * num_players
+            counts[num_players] = int(np.searchsorted(keys, (num_players + 1) << bits) - np.searchsorted(keys, num_players << bits))
+        return counts
+
+
+# Makes every DoubleDummySolver in this process (and so PimcPlaying) look
+# endgames up in the table at path (None stops using a table)
+def use_endgame_tablebase(path):
+    if path is None:
+        DoubleDummySolver.tablebase = None
+    elif DoubleDummySolver.tablebase is None or DoubleDummySolver.tablebase.path != path:
+        DoubleDummySolver.tablebase = EndgameTablebase(path)
+
+
+def random_solver(rng, num_players, hand_size):
+    deck = range(0, NUM_CARDS)
+    rng.shuffle(deck)
+    team_of = [ p % 2 for p in range(0, num_players) ] if num_players % 2 == 0 else range(0, num_players)
+    solver = DoubleDummySolver(rng.choice(SUITS), team_of, 0, rng.choice([ 0, 2, 3 ]), rng.randrange(num_players))
+    hands = [ sum(CARD_BIT[c] for c in deck[p * hand_size:(p + 1) * hand_size]) for p in range(0, num_players) ]
+    solver.set_deal(hands, [], [], [], rng.randrange(num_players))
+    return solver
+
+
+# Solves random deals with and without the table, and reports how many of
+# the endgames the solver reached were in the table, and the time taken
+def report(path, player_counts, num_deals, hand_size, seed=1):
+    tablebase = EndgameTablebase(path)
+    print "{}: {} bytes".format(path, os.path.getsize(path))
+    for num_players, count in sorted(tablebase.states_by_players().items()):
+        print "  {} players: {} states".format(num_players, count)
+    print "Solving {} deals of {} cards for each number of players".format(num_deals, hand_size)
+    print "players  endgames  in table  coverage  without table  with table  same values"
+    for num_players in player_counts:
+        rng = random.Random(seed)
+        deals = [ random_solver(rng, num_players, hand_size) for i in range(0, num_deals) ]
+        start = clock()
+        without = [ solver.solve_value() for solver in deals ]
+        without_time = clock() - start
+        tablebase.lookups = tablebase.hits = 0
+        start = clock()
+        with_table = []
+        for solver in deals:
+            solver.table = {}
+            solver.tablebase = tablebase
+            with_table.append(solver.solve_value())
+        with_time = clock() - start
+        print "{:7d}  {:8d}  {:8d}  {:7.1f}%  {:12.2f}s  {:9.2f}s  {}".format(num_players, tablebase.lookups, tablebase.hits,
+                100 * tablebase.coverage(), without_time, with_time, "yes" if with_table == without else "NO")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the endgame tablebase, or report how much it covers")
+    parser.add_argument("command", choices=[ "build", "report" ])
+    parser.add_argument("--output", default="endgame.npy", help="file to write the table to, or report on")
+    parser.add_argument("--deals", type=int, default=20, help="deals to solve for each number of players, for the report")
+    parser.add_argument("--cards", type=int, default=4, help="cards per player in the deals, for the report")
+    parser.add_argument("--players", type=int, nargs="+", default=[ 2, 3, 4, 5 ], help="numbers of players, for the report")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        table = build_table(verbose=True)
+        np.save(args.output, table)
+        print "Saved {} states to {}".format(table.shape[1], args.output)
+    else:
+        report(args.output, args.players, args.deals, args.cards)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,11 +6,34 @@ from hand import *
 from player import Player
 from smear_exceptions import *
 from score_graph import ScoreGraphManager
+from dealing import game_random_state
 
 
-class SmearGameManager:
-    def __init__(self, num_players=0, cards_to_deal=6, score_to_play_to=11, debug=False, num_teams=0, graph_prefix=None, static_dir=None, dbm=None):
+class SmearGameManager(object):
+    __slots__ = ("num_players", "int_cards", "num_teams", "cards_to_deal", "players", "debug", "game_over", "winning_score",
+            "winning_player", "scores", "score_to_play_to", "hand_manager", "dealer", "all_hand_results", "all_high_bid_infos",
+            "bidding_is_finished", "trump_revealed", "forced_two_set", "score_graph", "graph_prefix", "static_dir", "dbm",
+            "batch_dealer", "game_index", "seed", "rng", "timers", "keep_piles", "track_beliefs",
+            "end_decided_hands")
+
+    def __init__(self, num_players=0, cards_to_deal=6, score_to_play_to=11, debug=False, num_teams=0, graph_prefix=None, static_dir=None, dbm=None, int_cards=False, batch_dealer=None, seed=None, timers=None, keep_piles=True, track_beliefs=False, end_decided_hands=False):
         self.num_players = num_players
+        self.int_cards = int_cards
+        # Optional BatchDealer, game_index picks which of its games is dealt
+        self.batch_dealer = batch_dealer
+        self.game_index = 0
+        # Each game gets its own random stream, derived from seed and
+        # game_index (from the OS if seed is None)
+        self.seed = seed
+        self.rng = None
+        # Optional PhaseTimers, shared with the hand manager
+        self.timers = timers
+        # Whether players keep the cards from the tricks they take
+        self.keep_piles = keep_piles
+        # Whether card counting keeps a CardBeliefs for playing logics
+        self.track_beliefs = track_beliefs
+        # Whether hands stop as soon as the cards left can't change the scores
+        self.end_decided_hands = end_decided_hands
         self.num_teams = num_teams
         self.cards_to_deal = cards_to_deal
         self.players = {}
@@ -40,7 +63,7 @@ class SmearGameManager:
 
     def reset_players(self):
         for i in range(0, self.num_players):
-            self.players[i].reset()
+            self.players[i].reset(int_cards=self.int_cards)
 
     def reorder_players_by_team(self):
         # The goal is to have players in order according to their teams.
@@ -94,7 +117,10 @@ class SmearGameManager:
     def start_game(self):
         if self.dbm:
             self.dbm.add_game_to_db_for_first_time()
-        self.hand_manager = SmearHandManager(self.players, self.num_teams, self.cards_to_deal, self.debug)
+        self.rng = game_random_state(self.seed, self.game_index)
+        self.hand_manager = SmearHandManager(self.players, self.num_teams, self.cards_to_deal, self.debug, self.int_cards,
+                self.batch_dealer, self.game_index, self.rng, self.timers, self.keep_piles,
+                self.track_beliefs, self.end_decided_hands)
         self.start_next_hand()
         self.save_score_graph([0]*self.num_players)
 
@@ -203,7 +229,7 @@ class SmearGameManager:
             player_info = {}
             player_info["username"] = self.players[i].name
             player_info["score"] = self.scores[i]
-            player_info["game_points"] = self.players[i].calculate_game_score()
+            player_info["game_points"] = self.hand_manager.game_points[i]
             player_infos.append(player_info)
         return player_infos
 
@@ -231,7 +257,12 @@ class SmearGameManager:
 
     # Can be called repeatedly
     def continue_bidding(self):
+        timers = self.timers
+        if timers:
+            start = timers.start()
         self.forced_two_set = self.hand_manager.get_bids(self.dealer)
+        if timers:
+            timers.stop("bids", start)
         self.save_high_bid_info()
         if self.forced_two_set:
             # Forced set, dealer get_scores() will return appropriately
@@ -263,12 +294,17 @@ class SmearGameManager:
     def save_score_graph(self, current_scores, game_is_over=False):
         if self.static_dir is None or self.graph_prefix is None:
             return
+        timers = self.timers
+        if timers:
+            start = timers.start()
         hand_id = self.hand_manager.current_hand_id
         if game_is_over:
             hand_id = "final"
         filename = "{}/{}_hand{}.png".format(self.static_dir, self.graph_prefix, hand_id)
 
         self.score_graph.export_graph(self.graph_prefix, filename, current_scores, self.get_player_or_team_names())
+        if timers:
+            timers.stop("score_graph", start)
     
 
     # points lost defined as any points that the bidder didn't get
@@ -312,8 +348,13 @@ class SmearGameManager:
 
     # Needs to be called only once per hand
     def finish_hand(self):
+        timers = self.timers
         # Update scores
+        if timers:
+            start = timers.start()
         current_hand_scores = self.hand_manager.get_scores(self.dealer)
+        if timers:
+            timers.stop("get_scores", start)
         self.update_scores(current_hand_scores, self.hand_manager.current_hand.bidder)
         # Save hand results
         self.all_hand_results[self.hand_manager.current_hand_id] = self.hand_manager.hand_results
@@ -326,6 +367,8 @@ class SmearGameManager:
         self.all_hand_results[self.hand_manager.current_hand_id]["player_infos"] = self.generate_player_infos()
         # Add results of hand (and game, if necessary) to db
         if self.dbm:
+            if timers:
+                start = timers.start()
             bidders_points_won = current_hand_scores[self.hand_manager.current_hand.bidder]
             bidders_points_lost = self.get_bidders_points_lost(current_hand_scores)
             results_for_db = None
@@ -336,6 +379,8 @@ class SmearGameManager:
                     points_lost = bidders_points_lost,
                     results = results_for_db,
                     overall_winners = self.get_winners() if self.is_game_over() else None)
+            if timers:
+                timers.stop("finish_hand_db", start)
 
 
     # Can be called repeatedly
@@ -351,12 +396,21 @@ class SmearGameManager:
                     self.dbm.finalize_hand_creation(self.players[self.dealer].name if self.forced_two_set else None)
             if not self.forced_two_set:
                 # Only play the hand if the dealer wasn't forced to take a two set
+                timers = self.timers
                 if not self.trump_revealed:
+                    if timers:
+                        start = timers.start()
                     self.hand_manager.reveal_trump()
+                    if timers:
+                        timers.stop("reveal_trump", start)
                     self.trump_revealed = True
                 while not self.hand_manager.is_hand_over():
                     # Play trick
+                    if timers:
+                        start = timers.start()
                     self.hand_manager.play_trick()
+                    if timers:
+                        timers.stop("play_trick", start)
         except SmearNeedInput as e:
             if self.debug:
                 print "Stopping to allow input: {}".format(e.strerror)
@@ -1,16 +1,23 @@
 # Simulator for the card game smear
 
 import pydealer
+import numpy as np
 from pydealer.const import POKER_RANKS
 from smear_utils import SmearUtils as utils
 from trick import Trick
 from card_counting import CardCounting
+from hand_state import HandState
+from dealing import shuffle_deck
+from card_encoding import SUIT_INDEX, JACK_OF, JICK_OF, TRUMP_STRENGTH, TRUMP_ORDER, SmearCard, SmearStack, CARD_BIT, \
+        CARD_GAME_POINTS, GAME_POINTS_FOR_VALUE, mask_to_cards, card_index
 from playing_logic import CautiousTaker
 from bidding_logic import BetterBidding
 
 
 # Everything regarding the state of a hand, so a player can look at this and chose a card to play
-class SmearHand:
+class SmearHand(object):
+    __slots__ = ("num_players", "trump", "bid", "bidder", "first_player", "debug", "current_trick", "all_bids", "tricks")
+
     def __init__(self, num_players, debug=False):
         self.num_players = num_players
         self.trump = ""
@@ -19,7 +26,11 @@ class SmearHand:
         self.first_player = 0
         self.debug = debug
         self.current_trick = Trick(self.trump, debug)
+        # List of (player_id, bid), in the order they were made
         self.all_bids = []
+        # The tricks that have been finished this hand, in order, as
+        # (cards, player_ids, winner_id) so the Tricks themselves can go
+        self.tricks = []
 
     def set_trump(self, trump):
         self.trump = trump
@@ -30,22 +41,51 @@ class SmearHand:
             self.current_trick.add_card(player_id, card)
 
     def prepare_for_next_trick(self):
+        trick = self.current_trick
+        self.tricks.append((trick.cards, trick.player_ids, trick.current_winner_id))
         self.current_trick = Trick(self.trump, self.debug)
 
     def get_cards_played(self):
         return self.current_trick.get_cards_played()
 
     def add_bid(self, player_id, bid):
-        self.all_bids.append({ "game_id": "", "username": player_id, "bid": bid })
+        self.all_bids.append((player_id, bid))
 
     def get_all_bids(self):
-        return self.all_bids
+        return [ { "game_id": "", "username": player_id, "bid": bid } for player_id, bid in self.all_bids ]
 
 
 # A hand is one deal, play until all cards are out, and tally the score iteration
-class SmearHandManager:
-    def __init__(self, players_dict, num_teams, cards_to_deal=6, debug=False):
+class SmearHandManager(object):
+    __slots__ = ("players", "int_cards", "num_players", "num_teams", "cards_to_deal", "deck", "current_hand_id", "current_hand",
+            "scores", "current_low_id", "current_low", "all_bids_are_in", "remaining_bids", "current_bidder", "forced_two_set",
+            "hand_results", "debug", "remaining_players", "current_player", "card_counting_info", "teams", "batch_dealer", "game_index", "rng", "timers",
+            "keep_piles", "current_high_id", "current_high", "jack_id", "jick_id", "game_points", "track_beliefs",
+            "end_decided_hands", "hand_decided")
+
+    def __init__(self, players_dict, num_teams, cards_to_deal=6, debug=False, int_cards=False, batch_dealer=None, game_index=0, rng=None, timers=None, keep_piles=True,
+            track_beliefs=False, end_decided_hands=False):
         self.players = players_dict
+        # When set, cards are dealt as integers (SmearCard) instead of pydealer.Cards
+        self.int_cards = int_cards
+        # When set, hands are sliced out of the BatchDealer's decks for game_index
+        # instead of shuffling a new deck for every hand
+        self.batch_dealer = batch_dealer
+        self.game_index = game_index
+        # All randomness in the hand comes from rng (a numpy RandomState)
+        self.rng = rng if rng is not None else np.random.RandomState()
+        # Optional PhaseTimers
+        self.timers = timers
+        # Scoring doesn't look at the piles, so simulations can skip giving
+        # each trick's cards to the winner
+        self.keep_piles = keep_piles
+        # When set, card_counting_info keeps a CardBeliefs for playing logics
+        self.track_beliefs = track_beliefs
+        # Simulations only need the scores, so they can stop a hand once the
+        # cards left can't change them, and play the cards the rules force
+        # without asking the playing logics. See is_hand_decided
+        self.end_decided_hands = end_decided_hands
+        self.hand_decided = False
         self.num_players = len(players_dict.values())
         self.num_teams = num_teams
         self.cards_to_deal = cards_to_deal
@@ -58,6 +98,11 @@ class SmearHandManager:
         self.scores = {}
         self.current_low_id = 0
         self.current_low = None
+        self.current_high_id = 0
+        self.current_high = None
+        self.jack_id = None
+        self.jick_id = None
+        self.game_points = [ 0 ] * self.num_players
         self.all_bids_are_in = False
         self.remaining_bids = self.num_players
         self.current_bidder = 0
@@ -66,13 +111,15 @@ class SmearHandManager:
         self.debug = debug
         self.remaining_players = self.num_players
         self.current_player = 0
-        self.card_counting_info = CardCounting(self.num_players, self.debug)
+        self.card_counting_info = CardCounting(self.num_players, self.debug, self.int_cards)
+        if track_beliefs:
+            self.card_counting_info.track_beliefs()
         self.teams = []
         self.add_players_to_teams()
 
     def reset_players(self):
         for i in range(0, self.num_players):
-            self.players[i].reset()
+            self.players[i].reset(int_cards=self.int_cards)
 
     def add_players_to_teams(self):
         # Add empty array for each team
@@ -84,26 +131,67 @@ class SmearHandManager:
                 self.teams[self.players[i].team_id].append(self.players[i].player_id)
 
     def deal_new_deck(self):
-        self.deck = pydealer.Deck(ranks=POKER_RANKS)
-        self.deck.shuffle()
+        if self.batch_dealer:
+            if self.int_cards:
+                hands = self.batch_dealer.deal_int_cards(self.game_index, self.current_hand_id, self.num_players, self.cards_to_deal)
+            else:
+                hands = self.batch_dealer.deal_pydealer_cards(self.game_index, self.current_hand_id, self.num_players, self.cards_to_deal)
+            for i in range(0, self.num_players):
+                self.players[i].receive_dealt_card(hands[i])
+            return
+        self.deck = shuffle_deck(self.rng, self.int_cards)
         for j in range(0, self.cards_to_deal):
             for i in range(0, self.num_players):
                 self.players[i].receive_dealt_card(self.deck.deal(1))
 
     def reset_for_next_hand(self):
         self.reset_players()
+        timers = self.timers
+        if timers:
+            start = timers.start()
         self.deal_new_deck()
+        if timers:
+            timers.stop("deal", start)
+        self.current_hand_id += 1
+        self.reset_hand_state()
+
+    # Starts a hand with the given cards (one SmearStack or list of cards per
+    # player) instead of dealing, with bidding already over, so it can be
+    # played out from there
+    def start_hand_with(self, hands, trump, bidder, bid=0):
+        self.reset_players()
+        for i in range(0, self.num_players):
+            self.players[i].receive_dealt_card(hands[i])
         self.current_hand_id += 1
+        self.reset_hand_state()
+        self.all_bids_are_in = True
+        self.remaining_bids = 0
+        self.current_hand.bid = bid
+        self.current_hand.bidder = bidder
+        self.current_hand.first_player = bidder
+        self.current_hand.set_trump(trump)
+        self.players[bidder].is_bidder = True
+        self.remaining_players = self.num_players
+
+    def reset_hand_state(self):
         self.current_hand = SmearHand(self.num_players, self.debug)
         self.scores = {}
         self.hand_results = {}
         self.current_low_id = 0
         self.current_low = None
+        self.current_high_id = 0
+        self.current_high = None
+        self.jack_id = None
+        self.jick_id = None
+        self.game_points = [ 0 ] * self.num_players
         self.all_bids_are_in = False
         self.remaining_bids = self.num_players
         self.current_bidder = 0
         self.forced_two_set = False
+        self.hand_decided = False
         self.card_counting_info.reset_for_next_hand()
+        if self.track_beliefs:
+            self.card_counting_info.beliefs.reset([ len(self.players[i].hand) for i in range(0, self.num_players) ])
 
     def prepare_for_next_trick(self):
         self.current_hand.prepare_for_next_trick()
@@ -111,6 +199,8 @@ class SmearHandManager:
         self.current_player = 0
 
     def is_hand_over(self):
+        if self.hand_decided:
+            return True
         for player in self.players.values():
             if player.has_cards():
                 return False
@@ -166,7 +256,7 @@ class SmearHandManager:
                 high_player_id = 0
                 for player_id in team:
                     # Find that player's game score
-                    player_score = self.players[player_id].calculate_game_score()
+                    player_score = self.game_points[player_id]
                     # Add the score to the team game score
                     team_game_score += player_score
                     # Determine if this is the player that should "win" game in the UI
@@ -181,7 +271,7 @@ class SmearHandManager:
         else:
             # Not playing with teams, just find the player's score
             for player_id in range(0, self.num_players):
-                game_score = self.players[player_id].calculate_game_score()
+                game_score = self.game_points[player_id]
                 if game_winning_score < game_score:
                     game_winning_score = game_score
                     current_winning_players = [ player_id ]
@@ -202,6 +292,61 @@ class SmearHandManager:
         return game_winning_id
 
 
+    # Returns True if no card left in the players' hands can change who wins
+    # high, low, jack, jick or game, so scoring the hand now gives the same
+    # scores as playing it out. Only meaningful between tricks, when every
+    # trump played has been taken
+    def is_hand_decided(self):
+        trump = SUIT_INDEX[self.current_hand.trump]
+        cards_left = 0
+        for player in self.players.values():
+            if player.hand.__class__ is SmearStack:
+                cards_left |= player.hand.mask
+            else:
+                for card in player.hand:
+                    cards_left |= CARD_BIT[card_index(card)]
+        # Whoever takes the jack or jick wins it
+        if cards_left & (CARD_BIT[JACK_OF[trump]] | CARD_BIT[JICK_OF[trump]]):
+            return False
+        trump_left = [ c for c in TRUMP_ORDER[trump] if cards_left & CARD_BIT[c] ]
+        if trump_left:
+            strength = TRUMP_STRENGTH[trump]
+            # High is decided if it was taken and nothing left beats it, low if
+            # it was played and nothing left is lower
+            if self.current_high is None or strength[card_index(self.current_high)] < strength[trump_left[-1]]:
+                return False
+            if self.current_low is None or strength[card_index(self.current_low)] > strength[trump_left[0]]:
+                return False
+        return self.is_game_decided(sum(CARD_GAME_POINTS[c] for c in mask_to_cards(cards_left)))
+
+    # Returns True if game goes to the same team (or player), or to no one,
+    # however points_left more game points are taken. With teams, which
+    # teammate is named as winning game may still change, but not the scores
+    def is_game_decided(self, points_left):
+        if points_left == 0:
+            return True
+        if len(self.teams) > 0:
+            totals = sorted(sum(self.game_points[player_id] for player_id in team) for team in self.teams)
+        else:
+            totals = sorted(self.game_points)
+        return len(totals) > 1 and totals[-1] - totals[-2] > points_left
+
+    # Returns the index of the only card in hand that can be played in the
+    # current trick, or None if there is a choice
+    def forced_card_index(self, hand):
+        trick = self.current_hand.current_trick
+        if hand.__class__ is SmearStack:
+            legal = utils.legal_play_mask(trick.lead_suit, self.current_hand.trump, hand.mask)
+            if legal == 0 or legal & (legal - 1):
+                return None
+            return hand.cards.index(legal.bit_length() - 1)
+        if len(hand) == 1:
+            return 0
+        if len(hand) == 0 or len(trick.cards) == 0:
+            return None
+        legal = utils.get_legal_play_indices(trick.lead_suit, self.current_hand.trump, hand)
+        return legal[0] if len(legal) == 1 else None
+
     def get_scores(self, dealer_id):
         if self.forced_two_set:
             self.scores = {}
@@ -214,25 +359,19 @@ class SmearHandManager:
             print "Hand isn't over yet"
             return None
         self.scores = {}
-        current_high_id = 0
-        current_high = None
-        jack_id = None
-        jick_id = None
+        timers = self.timers
+        if timers:
+            start = timers.start()
         game_winning_id = self.calculate_game_winner()
+        if timers:
+            timers.stop("calculate_game_winner", start)
         for i in range(0, self.num_players):
             # Initialize each player's score
             self.scores[i] = 0
-            # Check to see if we have high
-            high = self.players[i].get_high_trump_card(self.current_hand.trump)
-            if (not high == None) and (current_high == None or utils.is_less_than(current_high, high, self.current_hand.trump)):
-                current_high = high
-                current_high_id = i
-            # Check to see if we have jack
-            if self.players[i].has_jack_of_trump(self.current_hand.trump):
-                jack_id = i
-            # Check to see if we have jick
-            if self.players[i].has_jick_of_trump(self.current_hand.trump):
-                jick_id = i
+        current_high_id = self.current_high_id
+        current_high = self.current_high
+        jack_id = self.jack_id
+        jick_id = self.jick_id
         # Award high
         self.add_to_score(current_high_id)
         self.hand_results["high_winner"] = current_high_id
@@ -343,13 +482,63 @@ class SmearHandManager:
             self.current_low = card
             self.current_low_id = player_id
 
-    def get_hint_from_computer(self, player_id):
-        playing_logic = CautiousTaker(debug=self.debug)
+    # Keeps track of who has won high, jack, jick and game points as each
+    # trick is taken, so scoring doesn't need to look through the piles
+    def update_points_won(self, winner_id, cards):
+        trump = self.current_hand.trump
+        game_points = 0
+        for card in cards:
+            if card.__class__ is SmearCard:
+                game_points += CARD_GAME_POINTS[card]
+            else:
+                game_points += GAME_POINTS_FOR_VALUE.get(card.value, 0)
+            if not utils.is_trump(card, trump):
+                continue
+            if self.current_high is None or utils.is_less_than(self.current_high, card, trump):
+                self.current_high = card
+                self.current_high_id = winner_id
+            if card.value == "Jack":
+                if card.suit == trump:
+                    self.jack_id = winner_id
+                else:
+                    self.jick_id = winner_id
+        self.game_points[winner_id] += game_points
+
+    # Returns a HandState for the hand being played (after bidding), which
+    # can be played forward and back without changing this hand
+    def get_hand_state(self):
+        current_hand = self.current_hand
+        current_trick = current_hand.current_trick
+        hands = []
+        for player_id in range(0, self.num_players):
+            mask = 0
+            for card in self.players[player_id].hand:
+                mask |= CARD_BIT[card_index(card)]
+            hands.append(mask)
+        leader = current_trick.player_ids[0] if current_trick.player_ids else current_hand.first_player
+        state = HandState(current_hand.trump, hands, leader, current_hand.bidder, current_hand.bid, self.teams)
+        state.trick = tuple(card_index(c) for c in current_trick.cards)
+        state.trick_players = tuple(current_trick.player_ids)
+        state.low = card_index(self.current_low) if self.current_low is not None else None
+        state.low_id = self.current_low_id
+        state.high = card_index(self.current_high) if self.current_high is not None else None
+        state.high_id = self.current_high_id
+        state.jack_id = self.jack_id
+        state.jick_id = self.jick_id
+        state.game_points = tuple(self.game_points)
+        state.trump_played = self.card_counting_info.trump_played
+        state.off_suit_played = self.card_counting_info.off_suit_played
+        state.voids = self.card_counting_info.voids
+        return state
+
+    def get_hint_from_computer(self, player_id, playing_logic=None):
+        if playing_logic is None:
+            playing_logic = CautiousTaker(debug=self.debug)
         playing_logic.player_id = player_id
         hand = self.players[player_id].hand
         is_bidder = self.current_bidder == player_id
-        card_index = playing_logic.choose_card(self.current_hand, self.card_counting_info, hand, self.teams, is_bidder)
-        card_to_play = hand[card_index]
+        index_to_play = playing_logic.choose_card(self.current_hand, self.card_counting_info, hand, self.teams, is_bidder)
+        card_to_play = hand[index_to_play]
         if self.debug:
             print "Computer advises playing {} out of {}".format(str(card_to_play), " ".join(x.abbrev for x in hand))
         return card_to_play
@@ -373,29 +562,46 @@ class SmearHandManager:
             self.current_player = self.current_hand.first_player
 
         msg = ""
+        timers = self.timers
         for i in range(0, self.remaining_players):
             if self.debug:
                 # Grab this before playing a card so that card is included
                 msg = str(self.players[self.current_player])
-            card = self.players[self.current_player].play_card(self.current_hand, self.card_counting_info, self.teams)
+            player = self.players[self.current_player]
+            forced_index = self.forced_card_index(player.hand) if self.end_decided_hands else None
+            if forced_index is not None:
+                card = player.play_card_at(forced_index)
+            else:
+                card = player.play_card(self.current_hand, self.card_counting_info, self.teams)
             # Because you don't need to take low home to get the point
             self.update_low_if_needed(card, self.current_player)
             if self.debug:
                 print "{} plays {}".format(msg, str(card))
             self.current_hand.add_card(self.current_player, card)
+            if timers:
+                start = timers.start()
             self.card_counting_info.card_was_played(self.current_player, card, self.current_hand.current_trick)
+            if timers:
+                timers.stop("card_was_played", start)
             self.current_player = self.next_player_id(self.current_player)
             self.remaining_players -= 1
 
         # Give all cards to winner
-        cards = self.current_hand.current_trick.get_all_cards_as_stack()
         winner_id = self.current_hand.current_trick.get_winner_id()
-        self.players[winner_id].add_cards_to_pile(cards)
+        cards = self.current_hand.current_trick.cards
+        self.update_points_won(winner_id, cards)
+        if self.keep_piles:
+            self.players[winner_id].add_cards_to_pile(self.current_hand.current_trick.get_all_cards_as_stack())
         # Tell each player the results of the trick
+        cards_played = self.current_hand.get_cards_played()
         for i in range(0, self.num_players):
-            self.players[i].save_results_of_trick(winner_id, self.current_hand.get_cards_played())
+            self.players[i].save_results_of_trick(winner_id, cards_played)
         # Reset for the next trick
         self.prepare_for_next_trick()
         self.current_hand.first_player = winner_id
         if self.debug:
             print "{} won {}\n".format(self.players[winner_id].name, " ".join(x.abbrev for x in cards))
+        if self.end_decided_hands and self.is_hand_decided():
+            self.hand_decided = True
+            if self.debug:
+                print "The cards left can't change the score, ending the hand"
@@ -0,0 +1,259 @@
+# Simulator for the card game smear
+
+import sys
+import copy
+import random
+import argparse
+from timeit import default_timer as clock
+from card_encoding import NUM_CARDS, SUIT_INDEX, LEAD_TRUMP, CARD_BIT, CARD_SUIT, CARD_GAME_POINTS, JACK_OF, JICK_OF, IS_TRUMP, \
+        TRUMP_MASK, SUIT_MINUS_JICK_MASK, TRUMP_STRENGTH, TRICK_STRENGTH
+from card_counting import CardCounting, VOID_BITS_PER_PLAYER
+
+
+# The most players a HandState can have
+MAX_PLAYERS = 8
+# VOID_BIT[player][lead] is CardCounting's void flag for player being out of
+# lead (a suit index, or LEAD_TRUMP)
+VOID_BIT = tuple(tuple(1 << (p * VOID_BITS_PER_PLAYER + lead) for lead in range(0, 5)) for p in range(0, MAX_PLAYERS))
+
+
+# The state of a hand being played, on integer cards and masks, that can be
+# played forward with play() and back with undo(), and copied with clone(),
+# for exploring lines of play from a position without copying the hand
+# manager, its players and their stacks.
+#
+# It keeps what SmearHandManager and CardCounting keep track of while a hand
+# is played: each player's cards, the current trick, who played low and who
+# won high, jack, jick and game points, the cards played and the suits each
+# player is known to be out of (in CardCounting's encoding). scores() scores
+# the hand as get_scores does.
+class HandState(object):
+    __slots__ = ("num_players", "trump", "bidder", "bid", "teams", "team_of", "num_teams", "hands", "cards_left", "trick",
+            "trick_players", "leader", "low", "low_id", "high", "high_id", "jack_id", "jick_id", "game_points", "trump_played",
+            "off_suit_played", "voids", "history")
+
+    # hands is the cards (as a mask) each player is holding, and leader the
+    # player leading the first trick. Without teams, everyone plays for
+    # themselves
+    def __init__(self, trump, hands, leader, bidder, bid, teams=None):
+        self.num_players = len(hands)
+        self.trump = SUIT_INDEX[trump]
+        self.bidder = bidder
+        self.bid = bid
+        self.teams = teams or None
+        self.team_of = range(0, self.num_players)
+        for team_id, team in enumerate(self.teams or []):
+            for player_id in team:
+                self.team_of[player_id] = team_id
+        self.num_teams = len(self.teams) if self.teams else self.num_players
+        self.hands = list(hands)
+        self.cards_left = sum(bin(h).count("1") for h in hands)
+        self.trick = ()
+        self.trick_players = ()
+        self.leader = leader
+        # As SmearHandManager keeps them: high and low are cards (or None),
+        # and players default to player 0
+        self.low = None
+        self.low_id = 0
+        self.high = None
+        self.high_id = 0
+        self.jack_id = None
+        self.jick_id = None
+        self.game_points = (0,) * self.num_players
+        self.trump_played = 0
+        self.off_suit_played = 0
+        self.voids = 0
+        self.history = []
+
+    def to_play(self):
+        return (self.leader + len(self.trick)) % self.num_players
+
+    def is_hand_over(self):
+        return self.cards_left == 0
+
+    # The cards (as a mask) the player to play can play
+    def legal_moves(self):
+        hand = self.hands[(self.leader + len(self.trick)) % self.num_players]
+        if not self.trick:
+            return hand
+        trump = self.trump
+        trump_cards = hand & TRUMP_MASK[trump]
+        lead = self.trick[0]
+        if IS_TRUMP[trump][lead]:
+            return trump_cards or hand
+        lead_suit_cards = hand & SUIT_MINUS_JICK_MASK[trump][CARD_SUIT[lead]]
+        if lead_suit_cards == 0:
+            return hand
+        return lead_suit_cards | trump_cards
+
+    # The player to play plays card (an int), which isn't checked to be legal
+    def play(self, card):
+        trick = self.trick
+        player = (self.leader + len(trick)) % self.num_players
+        trump = self.trump
+        is_trump = IS_TRUMP[trump]
+        self.history.append((trick, self.trick_players, self.leader, self.low, self.low_id, self.high, self.high_id, self.jack_id,
+            self.jick_id, self.game_points, self.trump_played, self.off_suit_played, self.voids, card))
+        self.hands[player] ^= CARD_BIT[card]
+        self.cards_left -= 1
+        if is_trump[card]:
+            self.trump_played |= CARD_BIT[card]
+            # Low goes to whoever plays it, whether they win the trick or not
+            if self.low is None or TRUMP_STRENGTH[trump][card] < TRUMP_STRENGTH[trump][self.low]:
+                self.low = card
+                self.low_id = player
+        else:
+            self.off_suit_played |= CARD_BIT[card]
+        if trick:
+            lead = trick[0]
+            if is_trump[lead]:
+                if not is_trump[card]:
+                    self.voids |= VOID_BIT[player][LEAD_TRUMP]
+            elif not is_trump[card] and CARD_SUIT[card] != CARD_SUIT[lead]:
+                self.voids |= VOID_BIT[player][CARD_SUIT[lead]]
+        trick = trick + (card,)
+        trick_players = self.trick_players + (player,)
+        if len(trick) < self.num_players:
+            self.trick = trick
+            self.trick_players = trick_players
+            return
+
+        # The trick is finished, give it to the winner
+        strength = TRICK_STRENGTH[trump][LEAD_TRUMP if is_trump[trick[0]] else CARD_SUIT[trick[0]]]
+        winner_index = 0
+        for i in range(1, len(trick)):
+            if strength[trick[i]] > strength[trick[winner_index]]:
+                winner_index = i
+        winner_id = trick_players[winner_index]
+        points = 0
+        for c in trick:
+            points += CARD_GAME_POINTS[c]
+            if is_trump[c]:
+                if self.high is None or TRUMP_STRENGTH[trump][c] > TRUMP_STRENGTH[trump][self.high]:
+                    self.high = c
+                    self.high_id = winner_id
+                if c == JACK_OF[trump]:
+                    self.jack_id = winner_id
+                elif c == JICK_OF[trump]:
+                    self.jick_id = winner_id
+        if points:
+            game_points = list(self.game_points)
+            game_points[winner_id] += points
+            self.game_points = tuple(game_points)
+        self.trick = ()
+        self.trick_players = ()
+        self.leader = winner_id
+
+    # Takes back the last card played
+    def undo(self):
+        self.trick, self.trick_players, self.leader, self.low, self.low_id, self.high, self.high_id, self.jack_id, self.jick_id, \
+                self.game_points, self.trump_played, self.off_suit_played, self.voids, card = self.history.pop()
+        self.hands[(self.leader + len(self.trick)) % self.num_players] |= CARD_BIT[card]
+        self.cards_left += 1
+
+    # Returns a copy that can be played and undone without changing this one
+    def clone(self):
+        state = HandState.__new__(HandState)
+        for name in HandState.__slots__:
+            setattr(state, name, getattr(self, name))
+        state.hands = list(self.hands)
+        state.history = list(self.history)
+        return state
+
+    # Returns a CardCounting for the cards played so far, for playing logics
+    def card_counting(self, debug=False, int_cards=True):
+        card_counting_info = CardCounting(self.num_players, debug, int_cards)
+        card_counting_info.trump_played = self.trump_played
+        card_counting_info.off_suit_played = self.off_suit_played
+        card_counting_info.voids = self.voids
+        return card_counting_info
+
+    # Once the hand is over, returns each player's score, as
+    # SmearHandManager.get_scores does: everyone on a team scores what the
+    # team does, ties for game don't score, and a bidder who doesn't make
+    # their bid loses it
+    def scores(self):
+        team_of = self.team_of
+        points = [ 0 ] * self.num_teams
+        for winner_id in [ self.high_id, self.low_id, self.jack_id, self.jick_id ]:
+            if winner_id is not None:
+                points[team_of[winner_id]] += 1
+        game = [ 0 ] * self.num_teams
+        for player_id in range(0, self.num_players):
+            game[team_of[player_id]] += self.game_points[player_id]
+        most = max(game)
+        if game.count(most) == 1:
+            points[game.index(most)] += 1
+        bidder_team = team_of[self.bidder]
+        if points[bidder_team] < self.bid:
+            points[bidder_team] = -self.bid
+        return [ points[team_of[player_id]] for player_id in range(0, self.num_players) ]
+
+
+# Times play() and undo() over random lines of play, and clone(), against
+# copy.deepcopy of a hand manager in the same position
+def benchmark(num_players=4, hand_size=6, num_lines=2000, seed=1):
+    from hand import SmearHandManager
+    from player import Player
+    from card_encoding import SUITS, SmearStack, CARDS
+    rng = random.Random(seed)
+    players = dict((i, Player("player{}".format(i))) for i in range(0, num_players))
+    for i in range(0, num_players):
+        players[i].set_player_id(i)
+    hand_manager = SmearHandManager(players, 0, int_cards=True, keep_piles=False)
+    deck = range(0, NUM_CARDS)
+    rng.shuffle(deck)
+    hand_manager.start_hand_with([ SmearStack(CARDS[c] for c in deck[p * hand_size:(p + 1) * hand_size]) for p in range(0, num_players) ],
+            rng.choice(SUITS), 0, 2)
+    state = hand_manager.get_hand_state()
+
+    # Random lines of play, chosen up front so only play and undo are timed
+    lines = []
+    for i in range(0, num_lines):
+        line = []
+        while not state.is_hand_over():
+            legal = state.legal_moves()
+            cards = [ c for c in range(0, NUM_CARDS) if legal & CARD_BIT[c] ]
+            card = rng.choice(cards)
+            state.play(card)
+            line.append(card)
+        for card in line:
+            state.undo()
+        lines.append(line)
+    moves = sum(len(line) for line in lines)
+    start = clock()
+    for line in lines:
+        for card in line:
+            state.play(card)
+        for card in line:
+            state.undo()
+    play_undo = (clock() - start) / moves
+
+    start = clock()
+    for i in range(0, num_lines):
+        state.clone()
+    clone_time = (clock() - start) / num_lines
+    copies = max(num_lines // 20, 1)
+    start = clock()
+    for i in range(0, copies):
+        copy.deepcopy(hand_manager)
+    deepcopy_time = (clock() - start) / copies
+    return { "play_undo": play_undo, "clone": clone_time, "deepcopy": deepcopy_time }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time HandState's play and undo, and clone")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--cards", type=int, default=6, help="cards per player")
+    parser.add_argument("--lines", type=int, default=2000, help="random lines of play to time")
+    args = parser.parse_args(argv)
+
+    times = benchmark(args.players, args.cards, args.lines)
+    print "play and undo:       {:8.2f} us per card".format(times["play_undo"] * 1e6)
+    print "clone:               {:8.2f} us".format(times["clone"] * 1e6)
+    print "deepcopy of manager: {:8.2f} us".format(times["deepcopy"] * 1e6)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
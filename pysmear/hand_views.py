@@ -0,0 +1,89 @@
+# Simulator for the card game smear
+
+from pydealer.const import POKER_RANKS
+from smear_utils import SmearUtils as utils
+from card_encoding import SmearCard, CARD_POKER_RANK
+
+
+def poker_rank(card):
+    return CARD_POKER_RANK[card] if card.__class__ is SmearCard else POKER_RANKS["values"][card.value]
+
+
+# Removes index from indices, and moves the ones after it down one, after
+# the card at index was taken out of the hand
+def remove_index(indices, index):
+    i = 0
+    while i < len(indices):
+        if indices[i] == index:
+            del indices[i]
+            continue
+        if indices[i] > index:
+            indices[i] -= 1
+        i += 1
+
+
+# Sorted views of a player's hand, as lists of indices into it, kept up to
+# date as cards are dealt (card_added) and played (card_removed), so bidding
+# and playing logics don't sort the hand or look for its trump every time
+# they choose something.
+#
+# by_rank is by poker rank from lowest to highest, cards of the same rank in
+# the order they are in the hand. The trump views (trump_indices and
+# off_suit_by_rank) are only kept for one trump at a time: they are made the
+# first time they are asked for with a trump, and kept up to date from then
+# on until a card is dealt or another trump is asked for. Every player has
+# one, so only what the logics read is kept. The lists are shared, so they
+# must not be changed by their readers
+class HandViews(object):
+    __slots__ = ("hand", "by_rank", "trump", "trump_by_rank", "off_suit")
+
+    def __init__(self, hand):
+        self.reset(hand)
+
+    def reset(self, hand):
+        self.hand = hand
+        self.by_rank = []
+        self.clear_trump_views()
+        for index in range(0, len(hand)):
+            self.card_added(index)
+
+    def clear_trump_views(self):
+        self.trump = None
+        self.trump_by_rank = None
+        self.off_suit = None
+
+    # hand[index] was just added to the end of the hand
+    def card_added(self, index):
+        hand = self.hand
+        rank = poker_rank(hand[index])
+        by_rank = self.by_rank
+        i = len(by_rank)
+        while i > 0 and poker_rank(hand[by_rank[i - 1]]) > rank:
+            i -= 1
+        by_rank.insert(i, index)
+        if self.trump is not None:
+            self.clear_trump_views()
+
+    # hand[index] was just taken out of the hand
+    def card_removed(self, index):
+        remove_index(self.by_rank, index)
+        if self.trump is not None:
+            remove_index(self.trump_by_rank, index)
+            remove_index(self.off_suit, index)
+
+    def use_trump(self, trump):
+        if self.trump != trump:
+            hand = self.hand
+            self.trump = trump
+            self.trump_by_rank = utils.get_trump_indices(trump, hand)
+            self.off_suit = [ i for i in self.by_rank if not utils.is_trump(hand[i], trump) ]
+
+    # Trump, lowest to highest, with the jick in its place
+    def trump_indices(self, trump):
+        self.use_trump(trump)
+        return self.trump_by_rank
+
+    # The cards that aren't trump, by rank
+    def off_suit_by_rank(self, trump):
+        self.use_trump(trump)
+        return self.off_suit
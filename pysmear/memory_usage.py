@@ -0,0 +1,66 @@
+# Simulator for the card game smear
+
+import sys
+import types
+from collections import deque
+from card_encoding import CARDS, SUITS, VALUES
+from smear_engine_api import SmearEngineApi
+
+
+# Objects that are shared by every game, and so don't count towards any one game
+SHARED_OBJECTS = set(id(x) for x in list(CARDS) + SUITS + VALUES + [ None, True, False ])
+
+SKIPPED_TYPES = (types.ModuleType, type, types.ClassType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+# Returns the number of bytes used by obj and everything it references,
+# counting each object once
+def deep_sizeof(obj, exclude=None):
+    seen = set(SHARED_OBJECTS)
+    if exclude:
+        seen.update(id(x) for x in exclude)
+    total = 0
+    pending = [ obj ]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            pending.extend(current)
+        if hasattr(current, "__dict__"):
+            pending.append(current.__dict__)
+        for cls in type(current).__mro__:
+            for slot in cls.__dict__.get("__slots__", ()):
+                if hasattr(current, slot):
+                    pending.append(getattr(current, slot))
+    return total
+
+
+# Creates a game through SmearEngineApi with computer players, plays
+# hands_to_play hands, and returns how many bytes the game is using
+def bytes_per_game(num_players=4, num_teams=0, score_to_play_to=11, int_cards=False, hands_to_play=1):
+    api = SmearEngineApi()
+    api.create_new_game(num_players, 0, score_to_play_to=score_to_play_to, num_teams=num_teams, int_cards=int_cards)
+    for i in range(0, num_players):
+        api.add_player("player{}".format(i))
+    api.start_game()
+    for i in range(0, hands_to_play):
+        if api.game_finished:
+            break
+        api.continue_game()
+    return deep_sizeof(api)
+
+
+def main():
+    for int_cards in [ False, True ]:
+        for num_players in [ 2, 4, 6, 8 ]:
+            print "{} players, int_cards={}: {} bytes per game".format(num_players, int_cards, bytes_per_game(num_players, int_cards=int_cards))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Simulator for the card game smear
+
+from timeit import default_timer as clock
+
+
+# The phases of a hand that are timed, in the order they are reported
+PHASES = [ "deal", "bids", "reveal_trump", "play_trick", "card_was_played", "get_scores", "calculate_game_winner",
+        "finish_hand_db", "score_graph" ]
+
+
+# Counts how many times each phase of a hand ran and how long it took in
+# total (in nanoseconds). Code being timed holds a PhaseTimers or None, and
+# checks it before reading the clock, so timing costs nothing when disabled:
+#
+#   if timers:
+#       start = timers.start()
+#   ...
+#   if timers:
+#       timers.stop("phase", start)
+class PhaseTimers(object):
+    __slots__ = ("counts", "total_ns")
+
+    def __init__(self):
+        self.counts = {}
+        self.total_ns = {}
+
+    def start(self):
+        return clock()
+
+    def stop(self, phase, start):
+        elapsed_ns = int((clock() - start) * 1000000000)
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+        self.total_ns[phase] = self.total_ns.get(phase, 0) + elapsed_ns
+
+    # Adds the counts and totals from other (e.g. from another process)
+    def merge(self, other):
+        for phase, count in other.counts.items():
+            self.counts[phase] = self.counts.get(phase, 0) + count
+        for phase, total in other.total_ns.items():
+            self.total_ns[phase] = self.total_ns.get(phase, 0) + total
+
+    def reset(self):
+        self.counts = {}
+        self.total_ns = {}
+
+    def report(self):
+        msg = ""
+        phases = [ x for x in PHASES if x in self.counts ] + sorted(x for x in self.counts if x not in PHASES)
+        for phase in phases:
+            count = self.counts[phase]
+            total_ns = self.total_ns[phase]
+            msg += "{:<22} {:>10} calls {:>12.1f} ms total {:>10.1f} us/call\n".format(phase, count, total_ns / 1e6, total_ns / 1e3 / count)
+        return msg
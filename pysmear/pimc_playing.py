@@ -0,0 +1,106 @@
+# Simulator for the card game smear
+
+from timeit import default_timer as clock
+import numpy as np
+from playing_logic import SmearPlayingLogic, CautiousTaker
+from smear_utils import SmearUtils as utils
+from card_encoding import SUIT_INDEX, CARD_BIT, ALL_CARDS_MASK, card_index
+from double_dummy import DoubleDummySolver, SearchTimeout
+from deal_sampler import DealSampler, void_masks
+
+
+# Plays by sampling the hands the other players could be holding, given the
+# cards that have been played and the suits CardCounting knows they are out
+# of (with DealSampler), and solving each sampled deal with DoubleDummySolver. The card
+# with the best average value over the samples is played.
+#
+# The transposition table is kept for the whole hand, so positions searched
+# for one sample or trick are reused by the next. Sampling stops after
+# num_samples deals, or once time_budget seconds have passed (a deal that
+# isn't finished in time is left out). If no deal could be searched in time,
+# CautiousTaker chooses instead.
+class PimcPlaying(SmearPlayingLogic):
+    def __init__(self, debug=False, num_samples=20, time_budget=1.0, max_table_size=2000000, seed=None):
+        SmearPlayingLogic.__init__(self, debug)
+        self.num_samples = num_samples
+        self.time_budget = time_budget
+        self.max_table_size = max_table_size
+        self.rng = np.random.RandomState(seed)
+        self.fallback = CautiousTaker(debug=debug)
+        self.table = {}
+        # The hand the transposition table has been filled for
+        self.table_hand = None
+        # From the last decision, how many deals were searched, and the
+        # average value of each card searched
+        self.samples_searched = 0
+        self.average_values = {}
+
+    def choose_card(self, current_hand, card_counting_info, my_hand, teams, is_bidder):
+        self.teams = teams
+        current_trick = current_hand.current_trick
+        if current_trick.cards:
+            legal = utils.get_legal_play_indices(current_trick.lead_suit, current_hand.trump, my_hand)
+        else:
+            legal = range(0, len(my_hand))
+        if len(legal) == 1:
+            return legal[0]
+        start = clock()
+        if self.table_hand is not current_hand or len(self.table) > self.max_table_size:
+            self.table = {}
+            self.table_hand = current_hand
+
+        num_players = current_hand.num_players
+        trump = SUIT_INDEX[current_hand.trump]
+        # Without teams, everyone plays for themselves
+        team_of = range(0, num_players)
+        for team_id, team in enumerate(teams or []):
+            for player_id in team:
+                team_of[player_id] = team_id
+
+        tricks = [ ([ card_index(c) for c in cards ], list(player_ids), winner_id) for cards, player_ids, winner_id in current_hand.tricks ]
+        trick = [ card_index(c) for c in current_trick.cards ]
+        trick_players = list(current_trick.player_ids)
+        leader = trick_players[0] if trick_players else self.player_id
+        my_cards = [ card_index(c) for c in my_hand ]
+        seen = 0
+        for card in my_cards + trick:
+            seen |= CARD_BIT[card]
+        for cards, player_ids, winner_id in tricks:
+            for card in cards:
+                seen |= CARD_BIT[card]
+        num_cards = [ len(my_cards) - (1 if p in trick_players else 0) for p in range(0, num_players) ]
+        num_cards[self.player_id] = 0
+        sampler = DealSampler(ALL_CARDS_MASK & ~seen, num_cards, void_masks(card_counting_info, num_players, trump), self.rng)
+        if not sampler.possible:
+            # The voids don't fit any deal, so sample without them
+            sampler = DealSampler(ALL_CARDS_MASK & ~seen, num_cards, [ 0 ] * num_players, self.rng)
+
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        search = DoubleDummySolver(current_hand.trump, team_of, team_of[self.player_id], current_hand.bid, current_hand.bidder, self.table, deadline)
+        candidates = [ my_cards[i] for i in legal ]
+        totals = [ 0 ] * len(candidates)
+        searched = 0
+        try:
+            while searched < self.num_samples:
+                hands = sampler.sample()
+                hands[self.player_id] = sum(CARD_BIT[c] for c in my_cards)
+                search.set_deal(hands, tricks, trick, trick_players, leader)
+                for i, value in enumerate(search.card_values(candidates)):
+                    totals[i] += value
+                searched += 1
+        except SearchTimeout:
+            pass
+
+        self.samples_searched = searched
+        if searched == 0:
+            self.average_values = {}
+            if self.debug:
+                print "PIMC ran out of time, falling back to CautiousTaker"
+            self.fallback.player_id = self.player_id
+            return self.fallback.choose_card(current_hand, card_counting_info, my_hand, teams, is_bidder)
+        self.average_values = dict((card, total / float(searched)) for card, total in zip(candidates, totals))
+        best = max(range(0, len(candidates)), key=lambda i: totals[i])
+        if self.debug:
+            print "PIMC searched {} deals ({} nodes): {}".format(searched, search.nodes,
+                    ", ".join("{} {:.2f}".format(my_hand[legal[i]], totals[i] / float(searched)) for i in range(0, len(candidates))))
+        return legal[best]
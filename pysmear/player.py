@@ -6,10 +6,15 @@ from bidding_logic import *
 from playing_logic import *
 from player_input import *
 from card_counting import CardCounting
+from card_encoding import SmearStack
+from hand_views import HandViews
 
 
 
 class Player(object):
+    __slots__ = ("hand", "pile", "bid", "bid_trump", "is_bidder", "debug", "trick_results", "name", "playing_logic", "bidding_logic",
+            "player_id", "team_id", "hand_views")
+
     def __init__(self, name, initial_cards=None, debug=False, playing_logic=None, bidding_logic=None):
         self.hand = pydealer.Stack()
         self.pile = pydealer.Stack()
@@ -29,10 +34,23 @@ class Player(object):
         self.bidding_logic = bidding_logic
         self.player_id = None
         self.team_id = None
-
-    def reset(self):
-        self.hand = pydealer.Stack()
-        self.pile = pydealer.Stack()
+        # Sorted views of hand, kept up to date as cards are dealt and played,
+        # that the logics read instead of sorting the hand themselves
+        self.hand_views = HandViews(self.hand)
+        self.share_hand_views()
+
+    def share_hand_views(self):
+        self.playing_logic.hand_views = self.hand_views
+        self.bidding_logic.hand_views = self.hand_views
+
+    def reset(self, int_cards=False):
+        if int_cards:
+            self.hand = SmearStack()
+            self.pile = SmearStack()
+        else:
+            self.hand = pydealer.Stack()
+            self.pile = pydealer.Stack()
+        self.hand_views.reset(self.hand)
         self.bid = 0
         self.bid_trump = None
         self.is_bidder = False
@@ -47,9 +65,15 @@ class Player(object):
     def set_initial_cards(self, initial_cards):
         self.hand = pydealer.Stack()
         self.hand += initial_cards
+        self.hand_views.reset(self.hand)
 
     def receive_dealt_card(self, dealt_card):
+        num_cards = len(self.hand)
         self.hand += dealt_card
+        # Adding to a pydealer.Stack makes a new one
+        self.hand_views.hand = self.hand
+        for index in range(num_cards, len(self.hand)):
+            self.hand_views.card_added(index)
 
     def print_cards(self, print_pile=False):
         msg = "{} hand: {}".format(self.name, " ".join(x.abbrev for x in self.hand))
@@ -63,8 +87,14 @@ class Player(object):
         if self.hand.size == 0:
             return None
         card_index = self.playing_logic.choose_card(current_hand, card_counting_info, self.hand, teams, self.is_bidder)
+        return self.play_card_at(card_index)
+
+    # Plays hand[card_index] without asking the playing logic, for a card
+    # the rules leave no choice about
+    def play_card_at(self, card_index):
         card_to_play = self.hand[card_index]
         del self.hand[card_index]
+        self.hand_views.card_removed(card_index)
         return card_to_play
 
     def has_cards(self):
@@ -126,13 +156,16 @@ class Player(object):
 
 
 class InteractivePlayer(Player):
+    __slots__ = ()
+
     def __init__(self, player_id, initial_cards=None, debug=False):
         super(InteractivePlayer, self).__init__(player_id, initial_cards, debug)
         self.playing_logic = PlayerInput(debug=debug)
         self.bidding_logic = self.playing_logic
+        self.share_hand_views()
 
-    def reset(self):
-        super(InteractivePlayer, self).reset()
+    def reset(self, int_cards=False):
+        super(InteractivePlayer, self).reset(int_cards)
         self.playing_logic.reset()
 
     def get_hand(self):
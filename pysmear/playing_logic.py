@@ -4,10 +4,114 @@ import pydealer
 from pydealer.const import POKER_RANKS
 from smear_utils import SmearUtils as utils
 from card_counting import CardCounting
+from card_encoding import SmearStack, CARD_POKER_RANK
+from hand_views import poker_rank
 
 rank_values = POKER_RANKS
 
+
+# What a playing logic needs to know about its hand and the trick to choose
+# a card, made once per choose_card so the rules don't each find the trump,
+# sort the hand or look through the trick again. Each view is worked out the
+# first time a rule asks for it, or taken from hand_views (the player's
+# HandViews) when it is for my_hand. Index lists are into my_hand, which is
+# never reordered
+class DecisionContext(object):
+    __slots__ = ("hand", "trick", "trump", "lead_suit", "leading", "trump_indices", "_by_rank", "_off_suit_by_rank",
+            "_lead_suit_by_rank", "_legal_indices", "_game_points", "_trump_jack_in_trick", "_ten_in_trick", "_teammate_taking_trick")
+
+    def __init__(self, my_hand, current_trick, hand_views=None):
+        self.hand = my_hand
+        self.trick = current_trick
+        self.trump = current_trick.trump
+        self.leading = len(current_trick.cards) == 0
+        self.lead_suit = None if self.leading else current_trick.lead_suit
+        self._lead_suit_by_rank = None
+        if hand_views is not None and hand_views.hand is my_hand:
+            # Trump, lowest to highest
+            self.trump_indices = hand_views.trump_indices(self.trump)
+            self._by_rank = hand_views.by_rank
+            self._off_suit_by_rank = hand_views.off_suit_by_rank(self.trump)
+        else:
+            self.trump_indices = utils.get_trump_indices(self.trump, my_hand)
+            self._by_rank = None
+            self._off_suit_by_rank = None
+        self._legal_indices = None
+        self._game_points = None
+        self._trump_jack_in_trick = False
+        self._ten_in_trick = None
+        self._teammate_taking_trick = None
+
+    # Every card, by poker rank from lowest to highest (cards of the same rank
+    # in the order they are in the hand)
+    @property
+    def by_rank(self):
+        if self._by_rank is None:
+            my_hand = self.hand
+            if my_hand.__class__ is SmearStack:
+                cards = my_hand.cards
+                self._by_rank = sorted(range(0, len(cards)), key=lambda i: CARD_POKER_RANK[cards[i]])
+            else:
+                self._by_rank = sorted(range(0, len(my_hand)), key=lambda i: poker_rank(my_hand[i]))
+        return self._by_rank
+
+    # The cards that aren't trump, by rank
+    @property
+    def off_suit_by_rank(self):
+        if self._off_suit_by_rank is None:
+            self._off_suit_by_rank = [ i for i in self.by_rank if not utils.is_trump(self.hand[i], self.trump) ]
+        return self._off_suit_by_rank
+
+    # The cards whose suit is the lead suit (the jick included), by rank
+    @property
+    def lead_suit_by_rank(self):
+        if self._lead_suit_by_rank is None:
+            self._lead_suit_by_rank = [ i for i in self.by_rank if self.hand[i].suit == self.lead_suit ]
+        return self._lead_suit_by_rank
+
+    # Sorted from smallest to largest
+    @property
+    def legal_indices(self):
+        if self._legal_indices is None:
+            if self.leading:
+                self._legal_indices = range(0, len(self.hand))
+            else:
+                self._legal_indices = utils.get_legal_play_indices(self.lead_suit, self.trump, self.hand)
+        return self._legal_indices
+
+    @property
+    def game_points(self):
+        if self._game_points is None:
+            self._game_points = utils.calculate_game_score(self.trick.cards)
+        return self._game_points
+
+    # The first jack or jick played in the trick, or None
+    @property
+    def trump_jack_in_trick(self):
+        if self._trump_jack_in_trick is False:
+            self._trump_jack_in_trick = None
+            for card in self.trick.cards:
+                if card.value == "Jack" and utils.is_trump(card, self.trump):
+                    self._trump_jack_in_trick = card
+                    break
+        return self._trump_jack_in_trick
+
+    @property
+    def ten_in_trick(self):
+        if self._ten_in_trick is None:
+            self._ten_in_trick = any(card.value == "10" for card in self.trick.cards)
+        return self._ten_in_trick
+
+    def is_teammate_taking_trick(self, card_counting_info, player_id, teams):
+        if self._teammate_taking_trick is None:
+            self._teammate_taking_trick = card_counting_info.is_teammate_taking_trick(player_id, self.trick, teams)
+        return self._teammate_taking_trick
+
+
 class SmearPlayingLogic:
+    # The player's HandViews, set by Player
+    hand_views = None
+
     def __init__(self, debug=False):
         self.debug = debug
         self.player_id = None
@@ -18,22 +122,22 @@ class SmearPlayingLogic:
 
 # TODO: write more and better versions of these
 class JustGreedyEnough(SmearPlayingLogic):
-    def find_lowest_card_index_to_beat(self, my_hand, card_to_beat, lead_suit, trump):
+    def find_lowest_card_index_to_beat(self, context):
         lowest_index = None
+        my_hand = context.hand
+        trump = context.trump
+        card_to_beat = context.trick.current_winning_card
         if utils.is_trump(card_to_beat, trump):
             # Card to beat is trump, see if I have a higher trump
-            my_trump = utils.get_trump_indices(trump, my_hand)
-            for idx in my_trump:
+            for idx in context.trump_indices:
                 if utils.is_less_than(card_to_beat, my_hand[idx], trump):
                     lowest_index = idx
-        elif card_to_beat.suit == lead_suit:
-            my_trump = utils.get_trump_indices(trump, my_hand)
-            if len(my_trump) != 0:
+        elif card_to_beat.suit == context.lead_suit:
+            if len(context.trump_indices) != 0:
                 # Card to beat isn't trump, but I have trump. Play my lowest trump
-                lowest_index = my_trump[0]
+                lowest_index = context.trump_indices[0]
             else:
-                matching_idxs = my_hand.find(card_to_beat.suit, sort=True, ranks=rank_values)
-                for idx in matching_idxs:
+                for idx in context.lead_suit_by_rank:
                     # Play the lowest card in the matching suit that will beat the card to beat
                     if my_hand[idx].gt(card_to_beat, ranks=rank_values):
                         lowest_index = idx
@@ -42,31 +146,21 @@ class JustGreedyEnough(SmearPlayingLogic):
             print "Error: card to beat seems incorrect: {}".format(card_to_beat)
         return lowest_index
         
-    def find_strongest_card(self, my_hand, trump):
-        my_trump = utils.get_trump_indices(trump, my_hand)
-        strongest_idx = None
-        if len(my_trump) != 0:
-            strongest_idx = my_trump[-1]
-        else:
-            my_hand.sort(ranks=rank_values)
-            strongest_idx = len(my_hand) - 1
-        return strongest_idx
+    def find_strongest_card(self, context):
+        if len(context.trump_indices) != 0:
+            return context.trump_indices[-1]
+        return context.by_rank[-1]
 
-    def find_lowest_card_index(self, my_hand, lead_suit, trump):
+    def find_lowest_card_index(self, context):
         lowest_index = None
         lowest_trump_index = None
-        # First try following suit.
-        my_hand.sort(ranks=rank_values)
-        indices = []
-        if lead_suit == "Trump":
-            indices = utils.get_trump_indices(trump, my_hand)
-            indices.reverse()
+        # First try following suit. Trump is tried from the highest down
+        if context.lead_suit == "Trump":
+            indices = reversed(context.trump_indices) if context.trump_indices else context.by_rank
         else:
-            indices = my_hand.find(lead_suit, sort=True, ranks=rank_values)
-        if len(indices) == 0:
-            indices = range(0, len(my_hand))
+            indices = context.lead_suit_by_rank or context.by_rank
         for idx in indices:
-            if utils.is_trump(my_hand[idx], trump) and lowest_trump_index == None:
+            if utils.is_trump(context.hand[idx], context.trump) and lowest_trump_index == None:
                 lowest_trump_index = idx
             else:
                 lowest_index = idx
@@ -76,16 +170,16 @@ class JustGreedyEnough(SmearPlayingLogic):
         return lowest_index
 
     def choose_card(self, current_hand, card_counting_info, my_hand, teams, is_bidder):
-        idx = 0
-        if len(current_hand.current_trick.cards) == 0:
+        context = DecisionContext(my_hand, current_hand.current_trick, self.hand_views)
+        if context.leading:
             # I'm the first player. Choose my strongest card
-            idx = self.find_strongest_card(my_hand, current_hand.trump)
+            idx = self.find_strongest_card(context)
         else:
             # Otherwise choose the lowest card to beat the current highest card
-            idx = self.find_lowest_card_index_to_beat(my_hand, current_hand.current_trick.current_winning_card, current_hand.current_trick.lead_suit, current_hand.trump)
+            idx = self.find_lowest_card_index_to_beat(context)
             if idx == None:
                 # If we can't beat it, then just play the lowest card, following suit as needed
-                idx = self.find_lowest_card_index(my_hand, current_hand.current_trick.lead_suit, current_hand.trump)
+                idx = self.find_lowest_card_index(context)
 
         return idx
 
@@ -93,98 +187,77 @@ class JustGreedyEnough(SmearPlayingLogic):
 
 class CautiousTaker(SmearPlayingLogic):
 
-    def get_A_K_Q_of_trump(self, my_hand, trump):
+    def get_A_K_Q_of_trump(self, context):
         idx = None
-        indices = utils.get_trump_indices(trump, my_hand)
-        if len(indices) is not 0 and my_hand[indices[-1]].value in "Ace King Queen":
+        indices = context.trump_indices
+        if len(indices) is not 0 and context.hand[indices[-1]].value in "Ace King Queen":
             idx = indices[-1]
         if idx is not None and self.debug:
-            print "get_A_K_Q_of_trump chooses {}".format(my_hand[idx])
+            print "get_A_K_Q_of_trump chooses {}".format(context.hand[idx])
         return idx
 
 
-    def get_lowest_trump(self, my_hand, trump):
+    def get_lowest_trump(self, context):
         idx = None
-        indices = utils.get_trump_indices(trump, my_hand)
+        indices = context.trump_indices
         if len(indices) is not 0:
             idx = indices[0]
         if idx is not None and self.debug:
-            print "get_lowest_trump chooses {}".format(my_hand[idx])
+            print "get_lowest_trump chooses {}".format(context.hand[idx])
         return idx
 
 
-    def get_A_K_Q_J_of_off_suit(self, my_hand, trump):
+    def get_A_K_Q_J_of_off_suit(self, context):
         idx = None
-        tmp_hand = pydealer.Stack(cards=my_hand.cards)
-        # Sorts lowest to highest
-        tmp_hand.sort(ranks=rank_values)
-        # Now highest to lowest
-        tmp_hand.reverse()
-        for card in tmp_hand:
-            if utils.is_trump(card, trump):
-                # Skip all trump
-                continue
-            if card.value in "Ace King Queen Jack":
-                # If it is a A, K, Q, or J, then find its index in my_hand
-                idx = my_hand.find(card.abbrev)[0]
+        # Highest to lowest
+        for index in reversed(context.off_suit_by_rank):
+            if context.hand[index].value in "Ace King Queen Jack":
+                idx = index
                 break
         if idx is not None and self.debug:
-            print "get_A_K_Q_J_of_off_suit chooses {}".format(my_hand[idx])
+            print "get_A_K_Q_J_of_off_suit chooses {}".format(context.hand[idx])
         return idx
 
 
-    def get_below_10_of_off_suit(self, my_hand, trump):
+    def get_below_10_of_off_suit(self, context):
         idx = None
-        tmp_hand = pydealer.Stack(cards=my_hand.cards)
-        # Sorts lowest to highest
-        tmp_hand.sort(ranks=rank_values)
-        for card in tmp_hand:
-            if utils.is_trump(card, trump):
-                # Skip all trump
-                continue
-            elif card.value in "Ace King Queen Jack 10":
+        # Lowest to highest
+        for index in context.off_suit_by_rank:
+            if context.hand[index].value in "Ace King Queen Jack 10":
                 # If it is a A, K, Q, J, or 10, skip it
                 continue
-            else:
-                idx = my_hand.find(card.abbrev)[0]
-                break
+            idx = index
+            break
         if idx is not None and self.debug:
-            print "get_below_10_of_off_suit chooses {}".format(my_hand[idx])
+            print "get_below_10_of_off_suit chooses {}".format(context.hand[idx])
         return idx
 
 
-    def get_any_card(self, my_hand):
+    def get_any_card(self, context):
         # We should only be calling this if we can only play an off-suit 10
         idx = None
-        if len(my_hand) > 0:
+        if len(context.hand) > 0:
             idx = 0
         if idx is not None and self.debug:
-            print "get_any_card chooses {}".format(my_hand[idx])
+            print "get_any_card chooses {}".format(context.hand[idx])
         return idx
 
 
-    def take_jack_or_jick_if_possible(self, my_hand, current_trick, card_counting_info):
+    def take_jack_or_jick_if_possible(self, context, card_counting_info):
         idx = None
-        jack_or_jick = False
-        jick_found = False
-        for card in current_trick.cards:
-            if card.value == "Jack" and utils.is_trump(card, current_trick.trump):
-                # Jack or Jick found
-                jack_or_jick = True
-                if card.suit != current_trick.trump:
-                    jick_found = True
-                break
-        if jack_or_jick:
+        my_hand = context.hand
+        current_trick = context.trick
+        jack_or_jick = context.trump_jack_in_trick
+        if jack_or_jick is not None:
             # First check to see if I can play AKQ
-            idx = self.get_A_K_Q_of_trump(my_hand, current_trick.trump)
+            idx = self.get_A_K_Q_of_trump(context)
             if idx is not None:
-                if not utils.is_new_card_higher(current_trick.current_winning_card, my_hand[idx], current_trick.trump):
+                if not utils.is_new_card_higher(current_trick.current_winning_card, my_hand[idx], context.trump):
                     idx = None
-            if idx is None and jick_found:
+            if idx is None and jack_or_jick.suit != context.trump:
                 # If no AKQ, check to see if I have a Jack that can safely take the Jick
-                indices = utils.get_trump_indices(current_trick.trump, my_hand)
-                for index in indices:
-                    if my_hand[index].value == "Jack" and my_hand[index].suit == current_trick.trump and card_counting_info.safe_to_play(self.player_id, my_hand[index], current_trick, self.teams):
+                for index in context.trump_indices:
+                    if my_hand[index].value == "Jack" and my_hand[index].suit == context.trump and card_counting_info.safe_to_play(self.player_id, my_hand[index], current_trick, self.teams):
                         idx = index
                         break
         if idx is not None and self.debug:
@@ -192,60 +265,54 @@ class CautiousTaker(SmearPlayingLogic):
         return idx
 
 
-    def take_ten_if_possible(self, my_hand, current_trick, card_counting_info):
+    def take_ten_if_possible(self, context, card_counting_info):
         idx = None
-        ten_card = None
-        for card in current_trick.cards:
-            if card.value == "10":
-                # Ten found
-                ten_card = card
-                break
-        if ten_card is not None:
-            indices = utils.get_legal_play_indices(current_trick.lead_suit, current_trick.trump, my_hand)
+        my_hand = context.hand
+        current_trick = context.trick
+        if context.ten_in_trick:
             # First check to see if I can safely take it with a non-trump
             if idx is None:
-                for index in indices:
-                    if utils.is_trump(my_hand[index], current_trick.trump):
+                for index in context.legal_indices:
+                    if utils.is_trump(my_hand[index], context.trump):
                         continue
-                    if utils.is_new_card_higher(current_trick.current_winning_card, my_hand[index], current_trick.trump) and card_counting_info.safe_to_play(self.player_id, my_hand[index], current_trick, self.teams):
+                    if utils.is_new_card_higher(current_trick.current_winning_card, my_hand[index], context.trump) and card_counting_info.safe_to_play(self.player_id, my_hand[index], current_trick, self.teams):
                         idx = index
                         break
             # Then check to see if I can safely take it with a jack or jick
             if idx is None:
-                indices = utils.get_trump_indices(current_trick.trump, my_hand)
-                for index in indices:
+                for index in context.trump_indices:
                     if my_hand[index].value == "Jack" and card_counting_info.safe_to_play(self.player_id, my_hand[index], current_trick, self.teams):
                         idx = index
                         break
             # Then check to see if I can take it with a low trump (including 10)
             if idx is None:
-                indices = utils.get_trump_indices(current_trick.trump, my_hand)
-                for index in indices:
-                    if my_hand[index].value not in "Ace King Queen Jack" and utils.is_new_card_higher(current_trick.current_winning_card, my_hand[index], current_trick.trump):
+                for index in context.trump_indices:
+                    if my_hand[index].value not in "Ace King Queen Jack" and utils.is_new_card_higher(current_trick.current_winning_card, my_hand[index], context.trump):
                         idx = index
                         break
             # Then see if there are any jacks or jicks left still, and if not if I can take it with an AKQ
             if idx is None:
                 if not card_counting_info.jack_or_jick_still_out():
-                    idx = self.get_A_K_Q_of_trump(my_hand, current_trick.trump)
+                    idx = self.get_A_K_Q_of_trump(context)
         if idx is not None and self.debug:
             print "take_10_if_possible chooses {}".format(my_hand[idx])
         return idx
 
 
-    def take_jack_or_jick_if_high_cards_are_out(self, my_hand, current_trick, card_counting_info):
+    def take_jack_or_jick_if_high_cards_are_out(self, context, card_counting_info):
         idx = None
-        highest_card = card_counting_info.highest_card_still_out(current_trick.trump, is_trump=True)
+        my_hand = context.hand
+        trump = context.trump
+        highest_card = card_counting_info.highest_card_still_out(trump, is_trump=True)
         if highest_card == None:
             return None
-        indices = utils.get_trump_indices(current_trick.trump, my_hand)
-        for index in indices:
-            if my_hand[index].value == "Jack" and card_counting_info.safe_to_play(self.player_id, my_hand[index], current_trick, self.teams):
-                if my_hand[index].suit == current_trick.trump and highest_card.value in "Ace King Queen":
+        for index in context.trump_indices:
+            if my_hand[index].value == "Jack" and card_counting_info.safe_to_play(self.player_id, my_hand[index], context.trick, self.teams):
+                if my_hand[index].suit == trump and highest_card.value in "Ace King Queen":
                     # If I have a Jack, play if there are still A K Q out
                     idx = index
                     break
-                elif my_hand[index].suit != current_trick.trump and (highest_card.value in "Ace King Queen" or ( highest_card.value == "Jack" and highest_card.suit == current_trick.trump)):
+                elif my_hand[index].suit != trump and (highest_card.value in "Ace King Queen" or ( highest_card.value == "Jack" and highest_card.suit == trump)):
                     # If I have a Jick, play if there are still A K Q Jack out
                     idx = index
                     break
@@ -254,12 +321,13 @@ class CautiousTaker(SmearPlayingLogic):
         return idx
 
 
-    def take_home_ten_safely(self, my_hand, current_trick, card_counting_info):
+    def take_home_ten_safely(self, context, card_counting_info):
         idx = None
         ten_trump = None
-        indices = utils.get_legal_play_indices(current_trick.lead_suit, current_trick.trump, my_hand)
-        for index in indices:
-            if my_hand[index].value == "10" and utils.is_trump(my_hand[index], current_trick.trump):
+        my_hand = context.hand
+        current_trick = context.trick
+        for index in context.legal_indices:
+            if my_hand[index].value == "10" and utils.is_trump(my_hand[index], context.trump):
                 # Save for later, try other 10s first
                 ten_trump = index
                 continue
@@ -274,14 +342,15 @@ class CautiousTaker(SmearPlayingLogic):
         return idx
 
 
-    def take_with_off_suit(self, my_hand, current_trick, card_counting_info):
+    def take_with_off_suit(self, context, card_counting_info):
         idx = None
-        indices = utils.get_legal_play_indices(current_trick.lead_suit, current_trick.trump, my_hand)
-        for index in indices:
-            if utils.is_trump(my_hand[index], current_trick.trump):
+        my_hand = context.hand
+        current_trick = context.trick
+        for index in context.legal_indices:
+            if utils.is_trump(my_hand[index], context.trump):
                 # Skip all trump
                 continue
-            if utils.is_new_card_higher(current_trick.current_winning_card, my_hand[index], current_trick.trump) and card_counting_info.safe_to_play(self.player_id, my_hand[index], current_trick, self.teams):
+            if utils.is_new_card_higher(current_trick.current_winning_card, my_hand[index], context.trump) and card_counting_info.safe_to_play(self.player_id, my_hand[index], current_trick, self.teams):
                 # Find the lowest card that can win the trick
                 idx = index
                 break
@@ -290,35 +359,35 @@ class CautiousTaker(SmearPlayingLogic):
         return idx
 
 
-    def get_lowest_spare_trump_to_lead(self, my_hand, current_trick):
+    def get_lowest_spare_trump_to_lead(self, context):
         idx = None
-        indices = utils.get_trump_indices(current_trick.trump, my_hand)
+        indices = context.trump_indices
         jacks_and_jicks = 0
         for index in indices:
-            if my_hand[index].value == "Jack":
+            if context.hand[index].value == "Jack":
                 jacks_and_jicks += 1
         non_jacks = len(indices) - jacks_and_jicks
 
         # If we have a jack or jick, make sure we keep one extra trump to protect it
         if non_jacks > 1:
             for index in indices:
-                if my_hand[index].value not in "Ace King Queen Jack 10":
+                if context.hand[index].value not in "Ace King Queen Jack 10":
                     idx = index
                     break
 
         if idx is not None and self.debug:
-            print "get_lowest_spare_trump_to_lead chooses {}".format(my_hand[idx])
+            print "get_lowest_spare_trump_to_lead chooses {}".format(context.hand[idx])
         return idx
 
 
-    def take_with_low_trump_if_game_points(self, my_hand, current_trick, card_counting_info):
+    def take_with_low_trump_if_game_points(self, context, card_counting_info):
         idx = None
-        indices = utils.get_trump_indices(current_trick.trump, my_hand)
-        game_points = utils.calculate_game_score(current_trick.cards)
+        my_hand = context.hand
+        indices = context.trump_indices
         # Only take 3 or more game points
-        if len(indices) > 1 and game_points > 3:
+        if len(indices) > 1 and context.game_points > 3:
             for index in indices:
-                if my_hand[index].value not in "Ace King Queen Jack 10" and utils.is_new_card_higher(current_trick.current_winning_card, my_hand[index], current_trick.trump):
+                if my_hand[index].value not in "Ace King Queen Jack 10" and utils.is_new_card_higher(context.trick.current_winning_card, my_hand[index], context.trump):
                     idx = index
                     break
         if idx is not None and self.debug:
@@ -326,11 +395,11 @@ class CautiousTaker(SmearPlayingLogic):
         return idx
 
 
-    def get_a_loser(self, my_hand, current_trick):
+    def get_a_loser(self, context):
         idx = None
-        indices = utils.get_legal_play_indices(current_trick.lead_suit, current_trick.trump, my_hand)
-        for index in indices:
-            if utils.is_trump(my_hand[index], current_trick.trump):
+        my_hand = context.hand
+        for index in context.legal_indices:
+            if utils.is_trump(my_hand[index], context.trump):
                 continue
             if my_hand[index].value not in "Ace King Queen Jack 10":
                 idx = index
@@ -340,11 +409,11 @@ class CautiousTaker(SmearPlayingLogic):
         return idx
 
 
-    def get_least_valuable_face_card(self, my_hand, current_trick):
+    def get_least_valuable_face_card(self, context):
         idx = None
-        indices = utils.get_legal_play_indices(current_trick.lead_suit, current_trick.trump, my_hand)
-        for index in indices:
-            if utils.is_trump(my_hand[index], current_trick.trump):
+        my_hand = context.hand
+        for index in context.legal_indices:
+            if utils.is_trump(my_hand[index], context.trump):
                 continue
             if my_hand[index].value not in "10":
                 idx = index
@@ -354,11 +423,11 @@ class CautiousTaker(SmearPlayingLogic):
         return idx
 
 
-    def get_least_valuable_trump(self, my_hand, trump):
+    def get_least_valuable_trump(self, context):
         idx = None
-        indices = utils.get_trump_indices(trump, my_hand)
+        indices = context.trump_indices
         for index in indices:
-            if my_hand[index].value in "10 Jack":
+            if context.hand[index].value in "10 Jack":
                 # Try to skip 10s and Jacks if we can
                 continue
             idx = index
@@ -366,15 +435,15 @@ class CautiousTaker(SmearPlayingLogic):
         if idx == None and len(indices) > 0:
             idx = indices[0]
         if idx is not None and self.debug:
-            print "get_least_valuable_trump chooses {}".format(my_hand[idx])
+            print "get_least_valuable_trump chooses {}".format(context.hand[idx])
         return idx
 
 
-    def get_the_least_worst_card_to_lose(self, my_hand, current_trick):
+    def get_the_least_worst_card_to_lose(self, context):
         idx = None
-        indices = utils.get_legal_play_indices(current_trick.lead_suit, current_trick.trump, my_hand)
+        indices = context.legal_indices
         for index in indices:
-            if my_hand[index].value == "10":
+            if context.hand[index].value == "10":
                 # Try to skip 10s if we can
                 continue
             idx = index
@@ -382,103 +451,100 @@ class CautiousTaker(SmearPlayingLogic):
         if idx == None:
             idx = indices[0]
         if idx is not None and self.debug:
-            print "get_the_least_worst_card_to_lose chooses {}".format(my_hand[idx])
+            print "get_the_least_worst_card_to_lose chooses {}".format(context.hand[idx])
         return idx
 
 
-    def give_teammate_jack_or_jick_if_possible(self, my_hand, current_trick, card_counting_info):
+    def give_teammate_jack_or_jick_if_possible(self, context, card_counting_info):
         idx = None
         if self.teams == None or self.teams == []:
             return None
-        if card_counting_info.is_teammate_taking_trick(self.player_id, current_trick, self.teams):
-            indices = utils.get_trump_indices(current_trick.trump, my_hand)
-            for index in indices:
-                if my_hand[index].value == "Jack":
+        if context.is_teammate_taking_trick(card_counting_info, self.player_id, self.teams):
+            for index in context.trump_indices:
+                if context.hand[index].value == "Jack":
                     idx = index
                     break
         if idx is not None and self.debug:
-            print "give_teammate_jack_or_jick_if_possible chooses {}".format(my_hand[idx])
+            print "give_teammate_jack_or_jick_if_possible chooses {}".format(context.hand[idx])
         return idx
 
 
-    def give_teammate_ten_if_possible(self, my_hand, current_trick, card_counting_info):
+    def give_teammate_ten_if_possible(self, context, card_counting_info):
         idx = None
         if self.teams == None or self.teams == []:
             return None
-        if card_counting_info.is_teammate_taking_trick(self.player_id, current_trick, self.teams):
-            indices = utils.get_legal_play_indices(current_trick.lead_suit, current_trick.trump, my_hand)
-            for index in indices:
-                if my_hand[index].value == "10":
+        if context.is_teammate_taking_trick(card_counting_info, self.player_id, self.teams):
+            for index in context.legal_indices:
+                if context.hand[index].value == "10":
                     idx = index
                     break
         if idx is not None and self.debug:
-            print "give_teammate_ten_if_possible chooses {}".format(my_hand[idx])
+            print "give_teammate_ten_if_possible chooses {}".format(context.hand[idx])
         return idx
 
 
     def choose_card(self, current_hand, card_counting_info, my_hand, teams, is_bidder):
         self.teams = teams
         idx = None
+        context = DecisionContext(my_hand, current_hand.current_trick, self.hand_views)
         # First player, leading the trick...
-        if len(current_hand.current_trick.cards) == 0:
+        if context.leading:
             # Play A, K, Q of trump
-            idx = self.get_A_K_Q_of_trump(my_hand, current_hand.trump)
+            idx = self.get_A_K_Q_of_trump(context)
             if idx is None and is_bidder and len(my_hand) == 6:
                 # (If bidder and I didn't have AKQ, and this is first trick, play lowest trump)
-                idx = self.get_lowest_trump(my_hand, current_hand.trump)
+                idx = self.get_lowest_trump(context)
             if idx is None and is_bidder and len(my_hand) == 5:
                 # If bidder and this is second trick, and I didn't have AKQ, play another trump if I have one to spare
-                idx = self.get_lowest_spare_trump_to_lead(my_hand, current_hand.current_trick)
+                idx = self.get_lowest_spare_trump_to_lead(context)
             # Play A, K, Q, J of other suits
             if idx is None:
-                idx = self.get_A_K_Q_J_of_off_suit(my_hand, current_hand.trump)
+                idx = self.get_A_K_Q_J_of_off_suit(context)
             # Play low of other suit
             if idx is None:
-                idx = self.get_below_10_of_off_suit(my_hand, current_hand.trump)
+                idx = self.get_below_10_of_off_suit(context)
             # Play lowest trump
             if idx is None:
-                idx = self.get_lowest_trump(my_hand, current_hand.trump)
+                idx = self.get_lowest_trump(context)
             # Play anything (should be just 10 off suit at this point)
             if idx is None:
-                idx = self.get_any_card(my_hand)
+                idx = self.get_any_card(context)
         else:
             # Not the first player
             # Give my teammate a jack or jick, if possible
-            idx = self.give_teammate_jack_or_jick_if_possible(my_hand, current_hand.current_trick, card_counting_info)
+            idx = self.give_teammate_jack_or_jick_if_possible(context, card_counting_info)
             # If I can take a Jack or Jick, take it
             if idx is None:
-                idx = self.take_jack_or_jick_if_possible(my_hand, current_hand.current_trick, card_counting_info)
+                idx = self.take_jack_or_jick_if_possible(context, card_counting_info)
             # If I can take a 10, take it
             if idx is None:
-                idx = self.take_ten_if_possible(my_hand, current_hand.current_trick, card_counting_info)
+                idx = self.take_ten_if_possible(context, card_counting_info)
             # If there are high trump still out but I can safely take home my jack or jick, play it
             if idx is None:
-                idx = self.take_jack_or_jick_if_high_cards_are_out(my_hand, current_hand.current_trick, card_counting_info)
+                idx = self.take_jack_or_jick_if_high_cards_are_out(context, card_counting_info)
             # Give my teammate a 10, if possible
             if idx is None:
-                idx = self.give_teammate_ten_if_possible(my_hand, current_hand.current_trick, card_counting_info)
+                idx = self.give_teammate_ten_if_possible(context, card_counting_info)
             # If I can safely take home a ten, take it
             if idx is None:
-                idx = self.take_home_ten_safely(my_hand, current_hand.current_trick, card_counting_info)
+                idx = self.take_home_ten_safely(context, card_counting_info)
             # If I can take the trick with a non-trump, take it
             if idx is None:
-                idx = self.take_with_off_suit(my_hand, current_hand.current_trick, card_counting_info)
+                idx = self.take_with_off_suit(context, card_counting_info)
             # If there is a face card and I have two or more low trump, take it
             if idx is None:
-                idx = self.take_with_low_trump_if_game_points(my_hand, current_hand.current_trick, card_counting_info)
+                idx = self.take_with_low_trump_if_game_points(context, card_counting_info)
             # Play a loser
             if idx is None:
-                idx = self.get_a_loser(my_hand, current_hand.current_trick)
+                idx = self.get_a_loser(context)
             # Play a face card to save trump and 10s
             if idx is None:
-                idx = self.get_least_valuable_face_card(my_hand, current_hand.current_trick)
+                idx = self.get_least_valuable_face_card(context)
             # Play lowest trump
             if idx is None:
-                idx = self.get_least_valuable_trump(my_hand, current_hand.current_trick.trump)
+                idx = self.get_least_valuable_trump(context)
             # At this point we likely only have 10s left
             if idx == None:
-                idx = self.get_the_least_worst_card_to_lose(my_hand, current_hand.current_trick)
+                idx = self.get_the_least_worst_card_to_lose(context)
 
         return idx
-
-
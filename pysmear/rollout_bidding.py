@@ -0,0 +1,194 @@
+# Simulator for the card game smear
+
+import math
+import timeit
+import multiprocessing
+import numpy as np
+from bidding_logic import SmearBiddingLogic
+from playing_logic import JustGreedyEnough
+from hand import SmearHandManager
+from player import Player
+from card_encoding import CARDS, NUM_CARDS, SmearCard, SmearStack, card_to_int
+
+
+# Runs in a worker process: plays up to num_rollouts rollouts of my_cards,
+# stopping early like RolloutBidding.calculate_bid (on its own rollouts, or
+# at deadline), and returns the totals from RolloutBidding.play_rollouts
+def play_rollouts_in_worker(args):
+    playing_logic, num_players, my_cards, num_rollouts, min_rollouts, z_score, deadline, seed = args
+    bidding_logic = RolloutBidding(playing_logic=playing_logic, min_rollouts=min_rollouts, z_score=z_score, seed=seed)
+    return bidding_logic.play_rollouts(num_players, my_cards, num_rollouts, can_stop_early=True, deadline=deadline)
+
+
+# Bids by playing the hand out: the cards I can't see are dealt to the
+# other players at random, and the hand is played with each suit as trump
+# (with me as the bidder) by players using playing_logic. The bid is the
+# most points I won on average with any suit, rounded down.
+#
+# Every suit is played with the same deals, and rollouts stop early once one
+# suit is clearly better than the rest (its average is more than
+# z_score standard errors above every other suit's), after
+# num_rollouts rollouts, or once time_budget seconds have passed.
+#
+# With workers > 1 the rollouts are split between a pool of processes,
+# which is kept until close() is called (SmearSimulator does this once its
+# games are played). It can't be used if this is already running in a
+# pool's worker.
+# Each worker stops early on its own rollouts, and all of them stop at the
+# same deadline.
+#
+# Teams aren't known when bidding, so only my own points are counted.
+class RolloutBidding(SmearBiddingLogic):
+    def __init__(self, debug=False, playing_logic=JustGreedyEnough, num_rollouts=64, min_rollouts=8, time_budget=None,
+            z_score=2.0, workers=1, seed=None):
+        super(RolloutBidding, self).__init__(debug)
+        self.playing_logic = playing_logic
+        self.num_rollouts = num_rollouts
+        self.min_rollouts = min_rollouts
+        self.time_budget = time_budget
+        self.z_score = z_score
+        self.workers = workers
+        self.rng = np.random.RandomState(seed)
+        self.trump = ""
+        self.bid = 0
+        # Average points won with each suit as trump, and how many rollouts
+        # they came from, for the last hand bid on
+        self.expected_points = [ 0.0 ] * len(self.suits)
+        self.rollouts_played = 0
+        # A hand manager (and players) for playing out rollouts, for each
+        # number of players, created when first needed
+        self.hand_managers = {}
+        self.pool = None
+
+    def get_hand_manager(self, num_players):
+        hand_manager = self.hand_managers.get(num_players)
+        if hand_manager is None:
+            players = {}
+            for i in range(0, num_players):
+                players[i] = Player("rollout{}".format(i), playing_logic=self.playing_logic())
+                players[i].set_player_id(i)
+            hand_manager = SmearHandManager(players, 0, int_cards=True, keep_piles=False)
+            self.hand_managers[num_players] = hand_manager
+        return hand_manager
+
+    # Deals the cards I can't see to the other players, returning each player's cards
+    def deal_unseen_cards(self, num_players, my_cards):
+        in_my_hand = set(my_cards)
+        unseen = np.array([ c for c in range(0, NUM_CARDS) if c not in in_my_hand ])
+        self.rng.shuffle(unseen)
+        hand_size = len(my_cards)
+        hands = [ [ CARDS[c] for c in my_cards ] ]
+        for i in range(1, num_players):
+            hands.append([ CARDS[c] for c in unseen[(i - 1) * hand_size:i * hand_size] ])
+        return hands
+
+    # Plays out the hand with trump, with me (player 0) as the bidder, and
+    # returns the points I won
+    def play_out(self, num_players, hands, trump):
+        hand_manager = self.get_hand_manager(num_players)
+        hand_manager.start_hand_with([ SmearStack(cards) for cards in hands ], trump, 0)
+        while not hand_manager.is_hand_over():
+            hand_manager.play_trick()
+        return hand_manager.get_scores(0)[0]
+
+    # Plays num_rollouts deals with each suit as trump (stopping early if
+    # allowed), and returns the number of rollouts played and the total and
+    # total squared points for each suit. deadline is a timeit.default_timer()
+    # time, and defaults to time_budget seconds from now
+    def play_rollouts(self, num_players, my_cards, num_rollouts, can_stop_early=False, deadline=None):
+        totals = [ 0.0 ] * len(self.suits)
+        squares = [ 0.0 ] * len(self.suits)
+        if deadline is None and self.time_budget is not None:
+            deadline = timeit.default_timer() + self.time_budget
+        played = 0
+        while played < num_rollouts:
+            hands = self.deal_unseen_cards(num_players, my_cards)
+            for i in range(0, len(self.suits)):
+                points = self.play_out(num_players, hands, self.suits[i])
+                totals[i] += points
+                squares[i] += points * points
+            played += 1
+            if can_stop_early:
+                if deadline is not None and timeit.default_timer() >= deadline:
+                    break
+                if played >= self.min_rollouts and self.one_suit_dominates(played, totals, squares):
+                    break
+        return played, totals, squares
+
+    def one_suit_dominates(self, played, totals, squares):
+        means = [ total / played for total in totals ]
+        errors = []
+        for i in range(0, len(totals)):
+            variance = max(squares[i] / played - means[i] * means[i], 0.0)
+            errors.append(math.sqrt(variance / played))
+        best = means.index(max(means))
+        for i in range(0, len(totals)):
+            if i != best and means[best] - self.z_score * errors[best] <= means[i] + self.z_score * errors[i]:
+                return False
+        return True
+
+    def play_rollouts_in_pool(self, num_players, my_cards):
+        if self.pool is None:
+            if multiprocessing.current_process().daemon:
+                # multiprocessing doesn't let a pool's workers start processes
+                raise ValueError("RolloutBidding can't use workers ({}) inside a worker process, use workers=1".format(self.workers))
+            self.pool = multiprocessing.Pool(self.workers)
+        # timeit.default_timer() is the wall clock, so the workers can share a deadline
+        deadline = timeit.default_timer() + self.time_budget if self.time_budget is not None else None
+        seeds = self.rng.randint(0, 2**31 - 1, size=self.workers)
+        args = []
+        for i in range(0, self.workers):
+            # Split the rollouts exactly, the first workers playing one more
+            num_rollouts = self.num_rollouts // self.workers + (1 if i < self.num_rollouts % self.workers else 0)
+            if num_rollouts > 0:
+                args.append((self.playing_logic, num_players, my_cards, num_rollouts, self.min_rollouts, self.z_score, deadline, seeds[i]))
+        played = 0
+        totals = [ 0.0 ] * len(self.suits)
+        squares = [ 0.0 ] * len(self.suits)
+        for worker_played, worker_totals, worker_squares in self.pool.map(play_rollouts_in_worker, args):
+            played += worker_played
+            for i in range(0, len(self.suits)):
+                totals[i] += worker_totals[i]
+                squares[i] += worker_squares[i]
+        return played, totals, squares
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def calculate_bid(self, current_hand, my_hand, force_two=False):
+        my_cards = [ int(card) if card.__class__ is SmearCard else int(card_to_int(card)) for card in my_hand ]
+        num_players = current_hand.num_players
+        if self.workers > 1:
+            played, totals, squares = self.play_rollouts_in_pool(num_players, my_cards)
+        else:
+            played, totals, squares = self.play_rollouts(num_players, my_cards, self.num_rollouts, can_stop_early=True)
+        self.rollouts_played = played
+        self.expected_points = [ total / played for total in totals ]
+        bid = max(self.expected_points)
+        bid_trump = self.suits[self.expected_points.index(bid)]
+        if self.debug:
+            print "Rollouts ({}): {}".format(played, ", ".join("{} {:.2f}".format(suit, points) for suit, points in zip(self.suits, self.expected_points)))
+
+        if bid < 2:
+            if current_hand.bid < 2 and force_two and bid > 1:
+                # Go for it, otherwise we get set
+                if self.debug:
+                    print "Forced to bid two in order to avoid an automatic set"
+                bid = 2
+            else:
+                bid = 0
+
+        self.bid = min(int(bid), 5)
+        if self.bid <= current_hand.bid:
+            # We have to bid greater than current bid
+            self.bid = 0
+        self.trump = bid_trump
+
+    def declare_bid(self):
+        return self.bid
+
+    def declare_trump(self):
+        return self.trump
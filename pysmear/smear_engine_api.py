@@ -7,6 +7,7 @@ from game_manager import *
 from player import *
 from playing_logic import *
 from bidding_logic import *
+from pimc_playing import PimcPlaying
 from smear_exceptions import *
 
 
@@ -24,6 +25,8 @@ class SmearEngineApi:
         self.static_dir =  None
         self.graph_prefix = None 
         self.dbm = None
+        # Playing logic for hints with a time budget, by player id
+        self.hint_playing_logics = {}
 
 
     def set_graph_details(self, path_to_static, graph_prefix):
@@ -35,8 +38,8 @@ class SmearEngineApi:
         return self.graph_prefix
 
 
-    def create_new_game(self, num_players, num_human_players, cards_to_deal=6, score_to_play_to=11, num_teams=0):
-        self.smear = SmearGameManager(cards_to_deal=cards_to_deal, score_to_play_to=score_to_play_to, num_teams=num_teams, debug=self.debug, graph_prefix=self.graph_prefix, static_dir=self.static_dir, dbm=self.dbm)
+    def create_new_game(self, num_players, num_human_players, cards_to_deal=6, score_to_play_to=11, num_teams=0, int_cards=False):
+        self.smear = SmearGameManager(cards_to_deal=cards_to_deal, score_to_play_to=score_to_play_to, num_teams=num_teams, debug=self.debug, graph_prefix=self.graph_prefix, static_dir=self.static_dir, dbm=self.dbm, int_cards=int_cards)
         self.desired_players = num_players
         self.desired_human_players = num_human_players
 
@@ -409,7 +412,9 @@ class SmearEngineApi:
         return hand_results
 
 
-    def get_hint_for_player(self, player_name):
+    # With a time_budget (in seconds), the hint comes from PimcPlaying
+    # instead of CautiousTaker
+    def get_hint_for_player(self, player_name, time_budget=None):
         player = None
         for player_itr in self.smear.get_players():
             if player_itr.name == player_name:
@@ -417,7 +422,15 @@ class SmearEngineApi:
         if player == None:
             print "Error: unable to find {}".format(player_name)
             return None
-        card_to_play = self.smear.hand_manager.get_hint_from_computer(player.player_id)
+        playing_logic = None
+        if time_budget is not None:
+            playing_logic = self.hint_playing_logics.get(player.player_id)
+            if playing_logic is None:
+                # Kept for each player, so searches carry over between hints
+                playing_logic = PimcPlaying(debug=self.debug)
+                self.hint_playing_logics[player.player_id] = playing_logic
+            playing_logic.time_budget = time_budget
+        card_to_play = self.smear.hand_manager.get_hint_from_computer(player.player_id, playing_logic)
         return { "suit": card_to_play.suit, "value": card_to_play.value }
 
 
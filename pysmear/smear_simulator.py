@@ -1,42 +1,100 @@
 # Simulator for the card game smear
 
 import sys
+import random
+import multiprocessing
 sys.path.insert(0, "..")
 sys.path.insert(0, "../../pydealer")
 
 from game_manager import SmearGameManager
+from dealing import BatchDealer
+from batch_engine import SmearBatchEngine
+from phase_timers import PhaseTimers
+from bid_cache import BidCache
+from bid_table import use_bid_table
+from endgame_tablebase import use_endgame_tablebase
 from player import *
 from playing_logic import *
 from bidding_logic import *
 
+
+# Runs in a worker process: plays games first_game_index up to (but not
+# including) last_game_index with a new simulator, and returns how many games
+# each player won, how many hands were played, the phase timers (if
+# enabled) and the bid cache hits and misses. The simulator's deals only depend on its seed and the
+# game's index, so it doesn't matter which worker plays which game
+def play_games_in_worker(args):
+    config, first_game_index, last_game_index = args
+    sim = SmearSimulator(**config)
+    sim.play_games(first_game_index, last_game_index, show_progress=False)
+    bid_cache_stats = (sim.bid_cache.hits, sim.bid_cache.misses) if sim.bid_cache is not None else None
+    return sim.games_won, sim.num_hands, sim.timers, bid_cache_stats
+
+
 class SmearSimulator:
-    def __init__(self, debug=False, num_teams=2, num_players=4, score_to_play_to=11, log_to_db=False, create_graphs=False):
+    def __init__(self, debug=False, num_teams=2, num_players=4, score_to_play_to=11, log_to_db=False, create_graphs=False, int_cards=False, seed=None, batch=False, playing_logic=None, bidding_logic=None, time_phases=False, bid_cache_size=0, bid_cache_file=None, bid_table_file=None, endgame_tablebase_file=None, end_decided_hands=False):
         self.debug = debug
+        # Everything needed to create an identical simulator in a worker process
+        self.config = { "debug": debug, "num_teams": num_teams, "num_players": num_players, "score_to_play_to": score_to_play_to,
+                "int_cards": int_cards, "seed": seed, "batch": batch, "playing_logic": playing_logic, "bidding_logic": bidding_logic,
+                "time_phases": time_phases, "bid_cache_size": bid_cache_size, "bid_cache_file": bid_cache_file,
+                "bid_table_file": bid_table_file, "endgame_tablebase_file": endgame_tablebase_file,
+                "end_decided_hands": end_decided_hands }
+        # With a seed, every game's deals are generated in batches and can be
+        # reproduced from the seed and the game's index
+        batch_dealer = BatchDealer(seed) if seed is not None else None
         self.dbm = None
+        # Time spent in each phase of a hand, if asked for
+        self.timers = PhaseTimers() if time_phases else None
+        # Expected points of bids, shared by every player. With a file, the
+        # cache is loaded from it and saved back after run()
+        self.bid_cache = BidCache(bid_cache_size, bid_cache_file) if bid_cache_size else None
+        # A table built by bid_table.py, used by every bidding logic in this process
+        if bid_table_file:
+            use_bid_table(bid_table_file)
+        # A table built by endgame_tablebase.py, used by every PimcPlaying in this process
+        if endgame_tablebase_file:
+            use_endgame_tablebase(endgame_tablebase_file)
         static_dir=None
         graph_prefix=None
         if create_graphs:
             static_dir="static"
             graph_prefix="1234"
 
-        self.smear = SmearGameManager(cards_to_deal=6, debug=debug, num_teams=num_teams, score_to_play_to=score_to_play_to, static_dir=static_dir, graph_prefix=graph_prefix, dbm=self.dbm)
+        self.smear = SmearGameManager(cards_to_deal=6, debug=debug, num_teams=num_teams, score_to_play_to=score_to_play_to, static_dir=static_dir, graph_prefix=graph_prefix, dbm=self.dbm, int_cards=int_cards, batch_dealer=batch_dealer, seed=seed, timers=self.timers, keep_piles=False,
+                end_decided_hands=end_decided_hands)
         player_list = []
         for i in range(0, num_players):
-            if i % 2 == 0 and (i == 0 or num_teams != 0):
+            if playing_logic or bidding_logic:
+                # Everyone uses the same logic (the Player defaults for anything not given)
+                self.smear.add_player(Player("player{}".format(i), debug=debug, playing_logic=playing_logic(debug=debug) if playing_logic else None,
+                    bidding_logic=bidding_logic(debug=debug) if bidding_logic else None))
+            elif i % 2 == 0 and (i == 0 or num_teams != 0):
                 self.smear.add_player(Player("player{}".format(i), debug=debug, playing_logic=CautiousTaker(debug=debug), bidding_logic=BetterBidding(debug=debug)))
             else:
                 self.smear.add_player(Player("player{}".format(i), debug=debug, playing_logic=CautiousTaker(debug=debug)))
             player_list.append("player{}".format(i))
+        for player in self.smear.get_players():
+            player.bidding_logic.bid_cache = self.bid_cache
         self.games_won = {}
         for player in player_list:
             self.games_won[player] = 0
         self.num_games = 0
+        self.num_hands = 0
+        # In batch mode, games are played by SmearBatchEngine instead, with
+        # every player using JustGreedyEnough and BetterBidding
+        self.batch_engine = None
+        if batch:
+            if seed is None:
+                seed = random.randint(0, 2**32 - 1)
+            self.batch_engine = SmearBatchEngine(num_players=num_players, num_teams=num_teams, score_to_play_to=score_to_play_to, cards_to_deal=6, seed=seed)
         #self.smear_stats = SmearStats()
 
-    def play_game(self):
+    def play_game(self, game_index=0):
         if self.debug:
             print "\n\n Starting game \n"
         self.smear.reset_game()
+        self.smear.game_index = game_index
         self.smear.start_game()
         #self.smear_stats.add_new_game()
         #for player in self.smear.get_players():
@@ -52,21 +110,79 @@ class SmearSimulator:
         winners = self.smear.get_winners()
         for winner in winners:
             self.games_won[winner] += 1
+        self.num_hands += self.smear.get_hand_id()
         #self.smear_stats.finalize_game(self.smear.number_of_hands, self.smear.get_winner())
 
-    def run(self, num_games=1):
+    def play_games(self, first_game_index, last_game_index, show_progress=True):
+        if self.batch_engine:
+            hands_played = self.batch_engine.hands_played
+            games_won = self.batch_engine.play_games(last_game_index - first_game_index, first_game_index)
+            for i in range(0, len(games_won)):
+                self.games_won["player{}".format(i)] += int(games_won[i])
+            self.num_hands += self.batch_engine.hands_played - hands_played
+            return
+        try:
+            for n in range(first_game_index, last_game_index):
+                if show_progress:
+                    sys.stdout.write(".")
+                    sys.stdout.flush()
+                self.play_game(n)
+        finally:
+            # Bidding logics may hold on to worker processes
+            for player in self.smear.get_players():
+                player.bidding_logic.close()
+
+    def merge_results(self, games_won, num_hands, timers=None, bid_cache_stats=None):
+        for player, won in games_won.items():
+            self.games_won[player] += won
+        self.num_hands += num_hands
+        if self.timers and timers:
+            self.timers.merge(timers)
+        if self.bid_cache is not None and bid_cache_stats:
+            self.bid_cache.hits += bid_cache_stats[0]
+            self.bid_cache.misses += bid_cache_stats[1]
+
+    def run(self, num_games=1, workers=1):
         self.num_games=num_games
         sys.stdout.write("Running simulation")
-        for n in range(0, num_games):
-            sys.stdout.write(".")
-            sys.stdout.flush()
-            self.play_game()
+        if workers > 1:
+            self.run_in_pool(num_games, workers)
+        else:
+            self.play_games(0, num_games)
+            if self.bid_cache is not None and self.bid_cache.path:
+                # Workers load the file, but don't send their entries back,
+                # so the file is only updated when the games are played here
+                self.bid_cache.save()
         sys.stdout.write("\n")
 
+    # Shards the games across a pool of worker processes, each with its own
+    # simulator, and adds up how many games each player won
+    def run_in_pool(self, num_games, workers):
+        config = dict(self.config)
+        if config["seed"] is None:
+            # Pick one seed for the whole run, so that every worker plays
+            # different games from the same streams
+            config["seed"] = random.randint(0, 2**32 - 1)
+        games_per_shard = max(1, num_games // (workers * 4))
+        shards = [ (config, i, min(i + games_per_shard, num_games)) for i in range(0, num_games, games_per_shard) ]
+        pool = multiprocessing.Pool(workers)
+        try:
+            for games_won, num_hands, timers, bid_cache_stats in pool.imap_unordered(play_games_in_worker, shards):
+                self.merge_results(games_won, num_hands, timers, bid_cache_stats)
+                sys.stdout.write(".")
+                sys.stdout.flush()
+        finally:
+            pool.close()
+            pool.join()
+
     def stats(self):
         stats = ""
         for winner, games_won in self.games_won.items():
             stats += "{} won {} games ({}%)\n".format(winner, games_won, (100.0*games_won/self.num_games))
+        if self.timers and self.timers.counts:
+            stats += "Time per phase:\n" + self.timers.report()
+        if self.bid_cache is not None:
+            stats += self.bid_cache.stats()
         return stats
 
 
@@ -2,6 +2,7 @@
 
 import pydealer
 from pydealer.const import POKER_RANKS
+from card_encoding import SmearCard, SmearStack, SUIT_INDEX, CARD_SUIT, CARD_POKER_RANK, CARD_GAME_POINTS, CARD_BIT, TRUMP_STRENGTH, IS_TRUMP, TRUMP_MASK, SUIT_MINUS_JICK_MASK, LEGAL_PLAY_ORDER, LEAD_INDEX, LEAD_TRUMP, TRICK_STRENGTH
 
 jack_hearts = pydealer.Card(value="Jack", suit="Hearts")
 jack_spades = pydealer.Card(value="Jack", suit="Spades")
@@ -24,6 +25,14 @@ class SmearUtils():
             less_than = True
         elif card_rhs == None:
             less_than = False
+        elif card_lhs.__class__ is SmearCard and card_rhs.__class__ is SmearCard:
+            # Integer cards, compare using the trump strength tables
+            strength = TRUMP_STRENGTH[SUIT_INDEX[trump]]
+            if strength[card_lhs] or strength[card_rhs]:
+                less_than = strength[card_lhs] < strength[card_rhs]
+            else:
+                print "Warning, comparing cards with different suits"
+                less_than = CARD_POKER_RANK[card_lhs] < CARD_POKER_RANK[card_rhs]
         elif SmearUtils.is_trump(card_lhs, trump) and not SmearUtils.is_trump(card_rhs, trump):
             # lhs is trump and rhs isn't, return false
             less_than = False
@@ -52,6 +61,8 @@ class SmearUtils():
 
     @staticmethod
     def is_trump(card, trump):
+        if card.__class__ is SmearCard:
+            return IS_TRUMP[SUIT_INDEX[trump]][card]
         card_is_trump = False
         if card.suit == trump:
             return True
@@ -69,7 +80,13 @@ class SmearUtils():
     @staticmethod
     def is_new_card_higher(current_winning_card, new_card, trump, debug=False):
         is_higher = False
-        if SmearUtils.is_trump(current_winning_card, trump) or SmearUtils.is_trump(new_card, trump):
+        if current_winning_card.__class__ is SmearCard and new_card.__class__ is SmearCard and not debug:
+            # Integer cards. The current winning card is either trump or of the lead suit
+            trump_index = SUIT_INDEX[trump]
+            lead = LEAD_TRUMP if IS_TRUMP[trump_index][current_winning_card] else CARD_SUIT[current_winning_card]
+            strength = TRICK_STRENGTH[trump_index][lead]
+            is_higher = strength[new_card] > strength[current_winning_card]
+        elif SmearUtils.is_trump(current_winning_card, trump) or SmearUtils.is_trump(new_card, trump):
             # At least one of the cards is trump, compare to new card
             is_higher = not SmearUtils.is_less_than(new_card, current_winning_card, trump)
             if debug:
@@ -88,6 +105,27 @@ class SmearUtils():
         return is_higher
 
 
+    # Returns a table of how strong each integer card is in a trick with
+    # lead_suit ("Trump" or a suit) and trump. The highest strength wins the trick
+    @staticmethod
+    def trick_strength_table(lead_suit, trump):
+        return TRICK_STRENGTH[SUIT_INDEX[trump]][LEAD_INDEX[lead_suit]]
+
+
+    @staticmethod
+    def trick_strength(card, lead_suit, trump):
+        return TRICK_STRENGTH[SUIT_INDEX[trump]][LEAD_INDEX[lead_suit]][card]
+
+
+    # Returns the index of the integer card in cards (in order played) that wins the trick
+    @staticmethod
+    def get_trick_winner_index(cards, trump):
+        trump_index = SUIT_INDEX[trump]
+        lead = LEAD_TRUMP if IS_TRUMP[trump_index][cards[0]] else CARD_SUIT[cards[0]]
+        strength = TRICK_STRENGTH[trump_index][lead]
+        return max(range(0, len(cards)), key=lambda x: strength[cards[x]])
+
+
     @staticmethod
     def insert_card_into_sorted_index_list(indices, stack, card_index):
         # Assumes sorted from smallest to largest
@@ -116,6 +154,8 @@ class SmearUtils():
     # Sorted from smallest to largest
     @staticmethod
     def get_legal_play_indices(lead_suit, trump, stack):
+        if stack.__class__ is SmearStack:
+            return SmearUtils.get_legal_play_indices_int(lead_suit, trump, stack)
         # Find trump indices
         trump_indices = SmearUtils.get_trump_indices(trump, stack)
         if lead_suit == "Trump":
@@ -143,6 +183,8 @@ class SmearUtils():
     # Sorted from smallest to largest
     @staticmethod
     def get_trump_indices(trump, stack):
+        if stack.__class__ is SmearStack:
+            return SmearUtils.get_trump_indices_int(trump, stack)
         trump_indices = stack.find(trump, sort=True, ranks=POKER_RANKS)
         jick = jick_of[trump]
         if jick in stack.cards:
@@ -150,8 +192,74 @@ class SmearUtils():
         return trump_indices
 
 
+    # Returns a bitmask of the cards in hand_mask that can legally be played
+    @staticmethod
+    def legal_play_mask(lead_suit, trump, hand_mask):
+        trump_index = SUIT_INDEX[trump]
+        trump_cards = hand_mask & TRUMP_MASK[trump_index]
+        if lead_suit == "Trump":
+            # If out of trump, can play anything
+            return trump_cards or hand_mask
+        lead_suit_index = SUIT_INDEX.get(lead_suit)
+        if lead_suit_index is None:
+            # Nothing has been lead yet
+            return hand_mask
+        lead_suit_cards = hand_mask & SUIT_MINUS_JICK_MASK[trump_index][lead_suit_index]
+        if lead_suit_cards == 0:
+            # Out of the lead suit, can play anything
+            return hand_mask
+        return lead_suit_cards | trump_cards
+
+
+    # Returns true if hand_mask has no cards of suit, which may be "Trump"
+    @staticmethod
+    def is_void(suit, trump, hand_mask):
+        trump_index = SUIT_INDEX[trump]
+        if suit == "Trump":
+            return hand_mask & TRUMP_MASK[trump_index] == 0
+        return hand_mask & SUIT_MINUS_JICK_MASK[trump_index][SUIT_INDEX[suit]] == 0
+
+
+    # Sorted from smallest to largest, for a SmearStack of integer cards.
+    # Adapts legal_play_mask to the index list API
+    @staticmethod
+    def get_legal_play_indices_int(lead_suit, trump, stack):
+        trump_index = SUIT_INDEX[trump]
+        lead_suit_index = SUIT_INDEX.get(lead_suit)
+        cards = stack.cards
+        if lead_suit == "Trump":
+            if SmearUtils.is_void("Trump", trump, stack.mask):
+                # No trump and trump was lead, can play anything
+                return range(0, len(cards))
+            return SmearUtils.get_trump_indices_int(trump, stack)
+        if lead_suit_index is None or SmearUtils.is_void(lead_suit, trump, stack.mask):
+            # No lead suit, can play anything
+            return range(0, len(cards))
+
+        legal = SmearUtils.legal_play_mask(lead_suit, trump, stack.mask)
+        order = LEGAL_PLAY_ORDER[trump_index]
+        legal_indices = [ i for i in range(0, len(cards)) if legal & CARD_BIT[cards[i]] ]
+        legal_indices.sort(key=lambda x: order[cards[x]])
+        return legal_indices
+
+
+    # Sorted from smallest to largest, for a SmearStack of integer cards
+    @staticmethod
+    def get_trump_indices_int(trump, stack):
+        trump_index = SUIT_INDEX[trump]
+        if stack.mask & TRUMP_MASK[trump_index] == 0:
+            return []
+        cards = stack.cards
+        strength = TRUMP_STRENGTH[trump_index]
+        trump_indices = [ i for i in range(0, len(cards)) if strength[cards[i]] ]
+        trump_indices.sort(key=lambda x: strength[cards[x]])
+        return trump_indices
+
+
     @staticmethod
     def calculate_game_score(cards):
+        if cards.__class__ is SmearStack:
+            return sum(CARD_GAME_POINTS[card] for card in cards.cards)
         game_score = 0
         for card in cards:
             if card.value == "10":
@@ -3,21 +3,26 @@
 import pydealer
 from pydealer.const import POKER_RANKS
 from smear_utils import SmearUtils as utils
+from card_encoding import SmearCard, SmearStack
 #from stats import SmearStats
 
 
-class Trick:
+class Trick(object):
+    __slots__ = ("cards", "player_ids", "trump", "lead_suit", "current_winner_id", "current_winning_card", "debug", "strength")
+
     def __init__(self, trump, debug=False):
         # This list is in order of cards played
         self.cards = []
-        # This is a list of cards played with the player who played them
-        self.cards_played = []
+        # The player who played each card in self.cards
+        self.player_ids = []
         self.trump = trump 
         # This will either be "Trump" or "Spades", "Diamonds", "Hearts", or "Clubs"
         self.lead_suit = ""
         self.current_winner_id = 0
         self.current_winning_card = None
         self.debug = debug
+        # Trick strength table for integer cards, set when the first card is played
+        self.strength = None
 
     def is_new_card_higher(self, card):
         return utils.is_new_card_higher(self.current_winning_card, card, self.trump, debug=self.debug)
@@ -31,20 +36,29 @@ class Trick:
                 self.lead_suit = card.suit
             self.current_winning_card = card
             self.current_winner_id = player_id
+            if card.__class__ is SmearCard:
+                self.strength = utils.trick_strength_table(self.lead_suit, self.trump)
+        elif self.strength is not None and not self.debug:
+            if self.strength[card] > self.strength[self.current_winning_card]:
+                self.current_winning_card = card
+                self.current_winner_id = player_id
         elif self.is_new_card_higher(card):
             self.current_winning_card = card
             self.current_winner_id = player_id
         self.cards.append(card)
-        self.cards_played.append({ "username": player_id, "card": { "suit": card.suit, "value": card.value }})
+        self.player_ids.append(player_id)
 
     def get_winner_id(self):
         return self.current_winner_id
 
     def get_all_cards_as_stack(self):
+        if len(self.cards) > 0 and self.cards[0].__class__ is SmearCard:
+            return SmearStack(self.cards)
         stack = pydealer.Stack()
         for x in self.cards:
             stack += [x]
         return stack
 
+    # Returns a list of cards played with the player who played them
     def get_cards_played(self):
-        return self.cards_played
+        return [ { "username": self.player_ids[i], "card": { "suit": self.cards[i].suit, "value": self.cards[i].value }} for i in range(0, len(self.cards)) ]
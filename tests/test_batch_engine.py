@@ -0,0 +1,77 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from pysmear.batch_engine import *
+from pysmear.dealing import BatchDealer
+from pysmear.game_manager import SmearGameManager
+from pysmear.player import Player
+from pysmear.playing_logic import JustGreedyEnough
+from pysmear.bidding_logic import BetterBidding
+from pysmear.hand import SmearHand
+from pysmear.card_encoding import SUITS, CARDS, SmearStack
+
+
+class TestSmearBatchEngine(unittest.TestCase):
+    def play_object_game(self, num_players, num_teams, seed, game_index):
+        smear = SmearGameManager(cards_to_deal=6, num_teams=num_teams, score_to_play_to=11, int_cards=True, batch_dealer=BatchDealer(seed))
+        for i in range(0, num_players):
+            smear.add_player(Player("player{}".format(i), playing_logic=JustGreedyEnough(), bidding_logic=BetterBidding()))
+        smear.reset_game()
+        smear.game_index = game_index
+        smear.start_game()
+        while not smear.is_game_over():
+            smear.play_game_async()
+        return smear
+
+    def assert_hands_match(self, num_players, num_teams, seed=3, num_games=4):
+        engine = SmearBatchEngine(num_players=num_players, num_teams=num_teams, seed=seed)
+        for game_index in range(0, num_games):
+            smear = self.play_object_game(num_players, num_teams, seed, game_index)
+            for hand_id in sorted(smear.all_hand_results.keys()):
+                expected = smear.all_hand_results[hand_id]
+                bid_info = smear.all_high_bid_infos[hand_id]
+                results = engine.play_hands([ game_index ], hand_id - 1)
+                self.assertEqual(results.bid[0], bid_info["current_bid"])
+                if results.forced_two_set[0]:
+                    self.assertFalse("high_winner" in expected)
+                    continue
+                self.assertEqual(results.bidder[0], bid_info["bidder"])
+                self.assertEqual(results.high_winner[0], expected["high_winner"])
+                self.assertEqual(results.low_winner[0], expected["low_winner"])
+                self.assertEqual(results.jack_winner[0], expected.get("jack_winner", NO_PLAYER))
+                self.assertEqual(results.jick_winner[0], expected.get("jick_winner", NO_PLAYER))
+                self.assertEqual(results.game_winner[0], expected["game_winner"] if expected["game_winner"] != "" else NO_PLAYER)
+                self.assertEqual(results.bidder_set[0], expected["bidder_set"])
+            winners = engine.play_games(1, first_game_index=game_index)
+            self.assertEqual([ smear.players[i].name for i in range(0, num_players) if winners[i] ], smear.get_winners())
+
+    def test_hands_match_object_engine(self):
+        self.assert_hands_match(4, 0)
+
+    def test_hands_match_object_engine_with_teams(self):
+        self.assert_hands_match(6, 2)
+
+    def test_hands_match_object_engine_with_two_players(self):
+        self.assert_hands_match(2, 0)
+
+    def test_play_games_counts_every_game(self):
+        engine = SmearBatchEngine(num_players=3, seed=9, games_per_batch=7)
+        games_won = engine.play_games(20)
+        self.assertTrue(games_won.sum() >= 20)
+        self.assertEqual(games_won.tolist(), SmearBatchEngine(num_players=3, seed=9).play_games(20).tolist())
+
+
+class TestBatchBetterBidding(unittest.TestCase):
+    def test_bids_match_better_bidding(self):
+        engine = SmearBatchEngine(num_players=4, seed=21)
+        hands = engine.deal(range(0, 50), 0)
+        best_bid, best_trump = engine.bidding_logic.calculate_bids(hands)
+        bidding = BetterBidding()
+        for hand_num in range(0, len(hands)):
+            for player_id in range(0, 4):
+                current_hand = SmearHand(4)
+                bidding.calculate_bid(current_hand, SmearStack(CARDS[c] for c in hands[hand_num, player_id]), force_two=False)
+                declared = engine.bidding_logic.declare_bids(best_bid[hand_num:hand_num+1, player_id], np.zeros(1, dtype=int), np.zeros(1, dtype=bool))
+                self.assertEqual(declared[0], bidding.declare_bid())
+                self.assertEqual(SUITS[best_trump[hand_num, player_id]] if best_trump[hand_num, player_id] != NO_PLAYER else None, bidding.declare_trump())
@@ -0,0 +1,32 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from pysmear.benchmark import *
+from pysmear.playing_logic import JustGreedyEnough
+from pysmear.bidding_logic import BetterBidding
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_config_matrix(self):
+        configs = benchmark_configs()
+        names = [ config_name(x) for x in configs ]
+        self.assertEqual(len(set(names)), len(names))
+        self.assertEqual(set(x["num_players"] for x in configs), set(range(2, 9)))
+        self.assertEqual(set(x["score_to_play_to"] for x in configs), set([ 11, 15, 21 ]))
+        for config in configs:
+            if config["num_teams"]:
+                self.assertEqual(config["num_players"] % config["num_teams"], 0)
+
+    def test_benchmark_config(self):
+        config = { "num_players": 3, "num_teams": 0, "score_to_play_to": 11, "playing_logic": JustGreedyEnough,
+                "bidding_logic": BetterBidding, "int_cards": True }
+        result = benchmark_config(config, num_games=2, warmup_games=1, repeats=1)
+        self.assertTrue(result["games_per_sec"] > 0)
+        self.assertTrue(result["hands"] >= 2)
+
+    def test_find_regressions(self):
+        baseline = { "results": { "a": { "games_per_sec": 100.0 }, "b": { "games_per_sec": 100.0 }, "c": { "games_per_sec": 100.0 } } }
+        current = { "results": { "a": { "games_per_sec": 90.0 }, "b": { "games_per_sec": 80.0 }, "d": { "games_per_sec": 1.0 } } }
+        regressions = find_regressions(baseline, current, threshold=0.15)
+        self.assertEqual([ x[0] for x in regressions ], [ "b" ])
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import tempfile
+from mock import MagicMock
+
+sys.path.insert(0, "..")
+from pysmear.bid_cache import BidCache, trump_relative_hand, hand_mask
+from pysmear.bidding_logic import BasicBidding, BetterBidding
+from pysmear.card_encoding import stack_to_ints
+from pysmear.smear_simulator import SmearSimulator
+import pydealer
+
+
+class TestBidCache(unittest.TestCase):
+    def setUp(self):
+        self.current_hand = MagicMock()
+        self.current_hand.num_players = 4
+        self.current_hand.bid = 0
+        self.hand = pydealer.Stack(cards=[ pydealer.Card("Ace", "Spades"), pydealer.Card("Jack", "Clubs"), pydealer.Card("2", "Spades"),
+            pydealer.Card("10", "Spades"), pydealer.Card("King", "Hearts"), pydealer.Card("3", "Diamonds") ])
+        # The same hand with Hearts as trump instead of Spades
+        self.other_hand = pydealer.Stack(cards=[ pydealer.Card("Ace", "Hearts"), pydealer.Card("Jack", "Diamonds"), pydealer.Card("2", "Hearts"),
+            pydealer.Card("10", "Hearts"), pydealer.Card("King", "Clubs"), pydealer.Card("3", "Spades") ])
+
+    def bid(self, bidding_logic, hand, force_two=False):
+        bidding_logic.calculate_bid(self.current_hand, hand, force_two)
+        return bidding_logic.declare_bid(), bidding_logic.declare_trump()
+
+    def test_trump_relative_hands_match_across_suits(self):
+        self.assertEqual(trump_relative_hand(hand_mask(self.hand), 0), trump_relative_hand(hand_mask(self.other_hand), 3))
+        self.assertNotEqual(trump_relative_hand(hand_mask(self.hand), 0), trump_relative_hand(hand_mask(self.other_hand), 0))
+
+    def test_cached_bids_are_the_same(self):
+        for logic_class in [ BasicBidding, BetterBidding ]:
+            expected = [ self.bid(logic_class(), hand) for hand in [ self.hand, self.other_hand, stack_to_ints(self.hand) ] ]
+            bidding_logic = logic_class()
+            bidding_logic.bid_cache = BidCache()
+            self.assertEqual([ self.bid(bidding_logic, hand) for hand in [ self.hand, self.other_hand, stack_to_ints(self.hand) ] ], expected)
+            self.assertEqual(expected[1][1], "Hearts")
+            self.assertEqual(bidding_logic.bid_cache.misses, 4)
+            self.assertEqual(bidding_logic.bid_cache.hits, 8)
+
+    def test_least_recently_used_entries_are_dropped(self):
+        cache = BidCache(max_size=4)
+        bidding_logic = BetterBidding()
+        bidding_logic.bid_cache = cache
+        self.bid(bidding_logic, self.hand)
+        self.bid(bidding_logic, pydealer.Stack(cards=[ pydealer.Card("4", "Spades") ]))
+        self.assertEqual(len(cache), 4)
+        self.bid(bidding_logic, self.hand)
+        self.assertEqual(cache.hits, 2)
+
+    def test_save_and_load(self):
+        cache = BidCache()
+        bidding_logic = BetterBidding()
+        bidding_logic.bid_cache = cache
+        self.bid(bidding_logic, self.hand)
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            cache.save(path)
+            loaded = BidCache(path=path)
+            self.assertEqual(loaded.entries, cache.entries)
+            bidding_logic.bid_cache = loaded
+            self.bid(bidding_logic, self.other_hand)
+            self.assertEqual(loaded.hits, 4)
+        finally:
+            os.remove(path)
+
+    def test_simulator_results_do_not_change(self):
+        sim = SmearSimulator(num_teams=0, num_players=3, int_cards=True, seed=3)
+        sim.play_games(0, 3, show_progress=False)
+        cached_sim = SmearSimulator(num_teams=0, num_players=3, int_cards=True, seed=3, bid_cache_size=1000)
+        cached_sim.play_games(0, 3, show_progress=False)
+        self.assertEqual(cached_sim.games_won, sim.games_won)
+        self.assertTrue(cached_sim.bid_cache.hits > 0)
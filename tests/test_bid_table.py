@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+import numpy as np
+
+sys.path.insert(0, "..")
+from pysmear import bid_table
+from pysmear.bidding_logic import BasicBidding, BetterBidding
+from pysmear.card_encoding import CARDS, SmearStack, ints_to_stack
+from pysmear.bid_cache import popcount
+
+
+class TestBidTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.path = tempfile.mkstemp(suffix=".npy")
+        os.close(handle)
+        np.save(cls.path, bid_table.build_table(player_counts=[ 3 ]))
+
+    @classmethod
+    def tearDownClass(cls):
+        bid_table.use_bid_table(None)
+        os.remove(cls.path)
+
+    def test_entry_indices_are_all_different(self):
+        indices = set()
+        for trump_ranks in range(0, 1 << bid_table.NUM_TRUMP_RANKS):
+            remaining = bid_table.HAND_SIZE - popcount(trump_ranks)
+            for aces_and_kings in range(0, remaining + 1):
+                for queens_and_jacks in range(0, remaining - aces_and_kings + 1):
+                    indices.add(bid_table.entry_index(trump_ranks, aces_and_kings, queens_and_jacks))
+        self.assertEqual(indices, set(range(0, bid_table.NUM_ENTRIES)))
+
+    def test_lookups_match_calculated_points(self):
+        table = bid_table.BidTable(self.path)
+        rng = random.Random(7)
+        for i in range(0, 200):
+            cards = rng.sample(range(0, 52), 6)
+            for hand in [ SmearStack(CARDS[c] for c in cards), ints_to_stack(cards) ]:
+                for logic in [ BasicBidding(), BetterBidding() ]:
+                    self.assertEqual(table.expected_points_by_suit(logic, 3, hand), logic.calculate_expected_points_by_suit(3, hand))
+
+    def test_hands_it_does_not_cover(self):
+        table = bid_table.BidTable(self.path)
+        hand = SmearStack(CARDS[c] for c in range(0, 5))
+        self.assertEqual(table.expected_points_by_suit(BetterBidding(), 3, hand), None)
+
+    def test_bidding_uses_the_shared_table(self):
+        bid_table.use_bid_table(self.path)
+        try:
+            self.assertEqual(BetterBidding().bid_table.path, self.path)
+            self.assertEqual(BetterBidding().bid_table.table, None)
+            logic = BetterBidding()
+            hand = SmearStack(CARDS[c] for c in [ 12, 11, 0, 9, 22, 51 ])
+            self.assertEqual(logic.expected_points_by_suit(3, hand), logic.calculate_expected_points_by_suit(3, hand))
+            self.assertTrue(BetterBidding().bid_table.table is not None)
+        finally:
+            bid_table.use_bid_table(None)
+        self.assertEqual(BetterBidding().bid_table, None)
@@ -23,3 +23,23 @@ class TestBiddingLogic(unittest.TestCase):
     def test_expected_points_from_jack_and_jick(self):
         jj = self.bl.expected_points_from_jack_and_jick(self.num_players, self.my_hand, self.suit)
         self.assertEqual(jj, 0.75)
+
+    def test_expected_points_from_high_and_low(self):
+        # Holding both the ace and the two of trump, no one else can have high or low
+        self.assertEqual(self.bl.expected_points_from_high(self.num_players, self.my_hand, self.suit), 1.0)
+        self.assertEqual(self.bl.expected_points_from_low(self.num_players, self.my_hand, self.suit), 1.0)
+        # The jack of clubs can only be beaten by the queen, king and ace
+        high = self.bl.expected_points_from_high(self.num_players, self.my_hand, "Clubs")
+        self.assertEqual(high, pysmear.bidding_logic.chance_no_one_else_has(self.num_players, 6, 14 - 11))
+
+
+class TestChanceTables(unittest.TestCase):
+    def test_chance_no_one_else_has(self):
+        choose = pysmear.bidding_logic.binomial
+        self.assertEqual(pysmear.bidding_logic.chance_no_one_else_has(4, 6, 0), 1.0)
+        # One other player with 6 of the 46 cards I can't see, and 3 cards to avoid
+        self.assertEqual(pysmear.bidding_logic.chance_no_one_else_has(2, 6, 3), choose(43, 6)/float(choose(46, 6)))
+        self.assertTrue(pysmear.bidding_logic.chance_no_one_else_has(4, 6, 3) < pysmear.bidding_logic.chance_no_one_else_has(3, 6, 3))
+
+    def test_no_chance_when_there_are_not_enough_other_cards(self):
+        self.assertEqual(pysmear.bidding_logic.chance_no_one_else_has(8, 6, 13), 0)
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import random
+import numpy as np
+
+sys.path.insert(0, "..")
+from pysmear.card_beliefs import CardBeliefs
+from pysmear.card_counting import CardCounting
+from pysmear.player import Player
+from pysmear.hand import SmearHandManager
+from pysmear.trick import Trick
+from pysmear.card_encoding import CARDS, SUIT_INDEX, TRUMP_MASK, CARD_BIT, SmearStack, int_to_card
+
+
+class TestCardBeliefs(unittest.TestCase):
+    def setUp(self):
+        self.beliefs = CardBeliefs(4)
+        self.beliefs.reset([ 6, 6, 6, 6 ])
+
+    def assert_consistent(self, beliefs):
+        # Each player's row adds up to their cards, and each card is somewhere
+        matrix = beliefs.matrix
+        np.testing.assert_allclose(matrix.sum(axis=1), beliefs.hand_sizes, atol=1e-6)
+        columns = matrix.sum(axis=0)
+        for column in columns:
+            self.assertTrue(abs(column) < 1e-9 or abs(column - 1) < 1e-6)
+
+    def test_reset(self):
+        np.testing.assert_allclose(self.beliefs.holdings(), np.full((4, 52), 6.0 / 52))
+        self.assert_consistent(self.beliefs)
+
+    def test_card_was_played(self):
+        trump = SUIT_INDEX["Spades"]
+        self.beliefs.card_was_played(0, 12, trump)
+        self.assertEqual(self.beliefs.matrix[:, 12].sum(), 0)
+        self.assertEqual(self.beliefs.hand_sizes[0], 5)
+        # Player 1 is out of trump: they hold none, and the others hold more
+        self.beliefs.card_was_played(1, 40, trump, "Trump")
+        self.assert_consistent(self.beliefs)
+        for card in range(0, 52):
+            if TRUMP_MASK[trump] & CARD_BIT[card] and card != 12:
+                self.assertAlmostEqual(self.beliefs.matrix[1, card], 0)
+                self.assertTrue(self.beliefs.matrix[2, card] > 6.0 / 52)
+        # Jick is trump, so player 1 can't hold it either
+        self.assertAlmostEqual(self.beliefs.matrix[1, 13 + 9], 0)
+
+    def test_for_player(self):
+        my_cards = [ 0, 1, 2, 3, 4, 5 ]
+        beliefs = self.beliefs.for_player(0, my_cards)
+        self.assert_consistent(beliefs)
+        np.testing.assert_allclose(beliefs.matrix[0, my_cards], 1)
+        np.testing.assert_allclose(beliefs.matrix[1:, my_cards], 0)
+        np.testing.assert_allclose(beliefs.matrix[1, 6:], 6.0 / 46)
+        # The shared beliefs aren't changed
+        np.testing.assert_allclose(self.beliefs.holdings(), np.full((4, 52), 6.0 / 52))
+
+    def test_probability_beaten(self):
+        trump = SUIT_INDEX["Spades"]
+        beliefs = self.beliefs.for_player(0, [ 12, 11, 9, 22, 8, 40 ])
+        # The ace of trump can't be beaten
+        self.assertEqual(beliefs.probability_beaten(12, None, trump, [ 1, 2, 3 ]), 0)
+        self.assertEqual(beliefs.probability_beaten(8, None, trump, []), 0)
+        # Only the queen of trump that is out beats the ten, but a lot beat the two
+        low = beliefs.probability_beaten(0, None, trump, [ 1, 2, 3 ])
+        high = beliefs.probability_beaten(8, None, trump, [ 1, 2, 3 ])
+        self.assertTrue(0 < high < low < 1)
+        self.assertTrue(beliefs.probability_beaten(8, None, trump, [ 1 ]) < high)
+        # A card that doesn't follow the suit led and isn't trump never wins,
+        # so anyone with a diamond (the suit led) or trump beats it
+        diamonds_or_trump = [ c for c in range(26, 39) ] + [ c for c in range(0, 8) ] + [ 10 ]
+        self.assertAlmostEqual(beliefs.probability_beaten(44, 26, trump, [ 1 ]),
+                1 - np.prod(1 - beliefs.matrix[1, diamonds_or_trump]))
+
+    def test_someone_behind(self):
+        trump = "Spades"
+        trick = Trick(trump)
+        trick.add_card(0, CARDS[47])
+        beliefs = CardBeliefs(3)
+        beliefs.reset([ 6, 6, 6 ])
+        # Player 1 has the ace of hearts, which only trump can beat
+        p = beliefs.probability_someone_behind_can_beat(1, CARDS[51], trick, [ CARDS[51] ])
+        self.assertAlmostEqual(p, 1 - np.prod(1 - beliefs.for_player(1, [ 51 ]).matrix[2, [ c for c in range(0, 13) ] + [ 13 + 9 ]]))
+        # Player 2 is last, and player 1 being a teammate leaves no one
+        self.assertEqual(beliefs.probability_someone_behind_can_beat(1, CARDS[51], trick, [ CARDS[51] ], [ [ 1, 2 ], [ 0 ] ]), 0)
+
+    def test_card_counting_keeps_beliefs(self):
+        for int_cards in [ True, False ]:
+            players = {}
+            for i in range(0, 4):
+                players[i] = Player("player{}".format(i))
+                players[i].set_player_id(i)
+            hand_manager = SmearHandManager(players, 0, int_cards=int_cards, keep_piles=False, track_beliefs=True)
+            deck = range(0, 52)
+            random.Random(2).shuffle(deck)
+            if int_cards:
+                hands = [ SmearStack(CARDS[c] for c in deck[p * 6:(p + 1) * 6]) for p in range(0, 4) ]
+            else:
+                hands = [ [ int_to_card(c) for c in deck[p * 6:(p + 1) * 6] ] for p in range(0, 4) ]
+            hand_manager.start_hand_with(hands, "Hearts", 0, 2)
+            beliefs = hand_manager.card_counting_info.beliefs
+            np.testing.assert_allclose(beliefs.hand_sizes, [ 6, 6, 6, 6, 28 ])
+            hand_manager.play_trick()
+            hand_manager.play_trick()
+            self.assert_consistent(beliefs)
+            np.testing.assert_allclose(beliefs.hand_sizes, [ 4, 4, 4, 4, 28 ])
+            played = hand_manager.card_counting_info.trump_played | hand_manager.card_counting_info.off_suit_played
+            for card in range(0, 52):
+                if played & CARD_BIT[card]:
+                    self.assertEqual(beliefs.matrix[:, card].sum(), 0)
+            for p in range(0, 4):
+                if hand_manager.card_counting_info.is_out_of(p, "Trump"):
+                    self.assertAlmostEqual(beliefs.matrix[p, [ c for c in range(0, 52) if TRUMP_MASK[3] & CARD_BIT[c] ]].sum(), 0)
+
+    def test_off_by_default(self):
+        self.assertEqual(CardCounting(4).beliefs, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -37,10 +37,10 @@ class TestSafeToPlay(unittest.TestCase):
 
 
     def test_jick_is_safe_after_a_k_q_j(self):
-        self.cc.cards_played["Trump"].append(self.ace_spades)
-        self.cc.cards_played["Trump"].append(self.king_spades)
-        self.cc.cards_played["Trump"].append(self.queen_spades)
-        self.cc.cards_played["Trump"].append(self.jack_spades)
+        self.cc.card_was_played(0, self.ace_spades, self.current_trick)
+        self.cc.card_was_played(0, self.king_spades, self.current_trick)
+        self.cc.card_was_played(0, self.queen_spades, self.current_trick)
+        self.cc.card_was_played(0, self.jack_spades, self.current_trick)
 
         self.current_trick.cards = [ self.two_diamonds ]
         safe = self.cc.safe_to_play(0, self.jack_clubs, self.current_trick, [])
@@ -58,7 +58,7 @@ class TestSafeToPlay(unittest.TestCase):
         self.assertEqual(safe, True)
 
     def test_jick_is_safe_if_only_player_behind_me_is_out(self):
-        self.cc.player_out_of_cards[1]["Trump"] = True
+        self.cc.set_out_of(1, "Trump")
         self.current_trick.cards = [ self.two_diamonds, self.seven_clubs ]
         safe = self.cc.safe_to_play(0, self.jack_clubs, self.current_trick, [])
         self.assertEqual(safe, True)
@@ -93,20 +93,20 @@ class TestHighestCardStillOut(unittest.TestCase):
 
 
     def test_jick_is_highest_after_a_k_q_j(self):
-        self.cc.cards_played["Trump"].append(self.ace_spades)
-        self.cc.cards_played["Trump"].append(self.king_spades)
-        self.cc.cards_played["Trump"].append(self.queen_spades)
-        self.cc.cards_played["Trump"].append(self.jack_spades)
+        self.cc.card_was_played(0, self.ace_spades, self.current_trick)
+        self.cc.card_was_played(0, self.king_spades, self.current_trick)
+        self.cc.card_was_played(0, self.queen_spades, self.current_trick)
+        self.cc.card_was_played(0, self.jack_spades, self.current_trick)
 
         card = self.cc.highest_card_still_out("Spades", True)
         self.assertEqual(card, self.jack_clubs)
 
     def test_10_is_highest_after_a_k_q_j_j(self):
-        self.cc.cards_played["Trump"].append(self.ace_spades)
-        self.cc.cards_played["Trump"].append(self.king_spades)
-        self.cc.cards_played["Trump"].append(self.queen_spades)
-        self.cc.cards_played["Trump"].append(self.jack_spades)
-        self.cc.cards_played["Trump"].append(self.jack_clubs)
+        self.cc.card_was_played(0, self.ace_spades, self.current_trick)
+        self.cc.card_was_played(0, self.king_spades, self.current_trick)
+        self.cc.card_was_played(0, self.queen_spades, self.current_trick)
+        self.cc.card_was_played(0, self.jack_spades, self.current_trick)
+        self.cc.card_was_played(0, self.jack_clubs, self.current_trick)
 
         card = self.cc.highest_card_still_out("Spades", True)
         self.assertEqual(card, self.ten_spades)
@@ -119,3 +119,42 @@ class TestHighestCardStillOut(unittest.TestCase):
         card = self.cc.highest_card_still_out("Spades", True, self.ace_spades)
         self.assertEqual(card, self.ace_spades)
 
+
+
+class TestPlayedCardBitsets(unittest.TestCase):
+    def setUp(self):
+        self.cc = CardCounting(num_players = 4)
+        self.current_trick = MagicMock()
+        self.current_trick.trump = "Hearts"
+        self.current_trick.lead_suit = "Clubs"
+
+    def test_jack_and_jick_still_out_until_both_are_played(self):
+        self.cc.card_was_played(0, pydealer.Card("Jack", "Clubs"), self.current_trick)
+        self.assertEqual(self.cc.jack_or_jick_still_out(), True)
+        self.cc.card_was_played(1, pydealer.Card("Jack", "Hearts"), self.current_trick)
+        self.assertEqual(self.cc.jack_or_jick_still_out(), True)
+        self.cc.card_was_played(2, pydealer.Card("Jack", "Diamonds"), self.current_trick)
+        self.assertEqual(self.cc.jack_or_jick_still_out(), False)
+
+    def test_not_following_suit_means_out_of_the_lead_suit(self):
+        self.cc.card_was_played(0, pydealer.Card("King", "Clubs"), self.current_trick)
+        self.cc.card_was_played(1, pydealer.Card("2", "Spades"), self.current_trick)
+        self.cc.card_was_played(2, pydealer.Card("3", "Hearts"), self.current_trick)
+        self.assertEqual(self.cc.is_out_of(1, "Clubs"), True)
+        self.assertEqual(self.cc.is_out_of(1, "Spades"), False)
+        self.assertEqual(self.cc.is_out_of(0, "Clubs"), False)
+        # Trumping in doesn't say anything
+        self.assertEqual(self.cc.is_out_of(2, "Clubs"), False)
+
+    def test_highest_off_suit_card_skips_played_cards(self):
+        self.cc.card_was_played(0, pydealer.Card("Ace", "Clubs"), self.current_trick)
+        self.cc.card_was_played(1, pydealer.Card("King", "Clubs"), self.current_trick)
+        card = self.cc.highest_card_still_out("Clubs", False)
+        self.assertEqual(card, pydealer.Card("Queen", "Clubs"))
+
+    def test_reset_forgets_played_cards(self):
+        self.cc.card_was_played(3, pydealer.Card("Ace", "Clubs"), self.current_trick)
+        self.cc.card_was_played(0, pydealer.Card("Jack", "Hearts"), self.current_trick)
+        self.cc.reset_for_next_hand()
+        self.assertEqual(self.cc.highest_card_still_out("Clubs", False), pydealer.Card("Ace", "Clubs"))
+        self.assertEqual(self.cc.card_has_been_played(pydealer.Card("Jack", "Hearts"), "Trump", None), False)
@@ -0,0 +1,122 @@
+import unittest
+import random
+import sys
+
+sys.path.insert(0, "..")
+from pysmear.smear_utils import SmearUtils as utils
+from pysmear.card_encoding import *
+from pysmear.trick import Trick
+import pydealer
+
+
+class TestCardEncoding(unittest.TestCase):
+    def setUp(self):
+        self.suits = [ "Spades", "Clubs", "Diamonds", "Hearts" ]
+
+    def test_round_trip(self):
+        for card in CARDS:
+            pydealer_card = card.to_card()
+            self.assertEqual(card_to_int(pydealer_card), card)
+            self.assertEqual(pydealer_card.abbrev, card.abbrev)
+            self.assertEqual(pydealer_card.name, card.name)
+
+    def test_jick_tables(self):
+        jick = card_to_int(pydealer.Card("Jack", "Clubs"))
+        self.assertEqual(JICK_OF[SUIT_INDEX["Spades"]], jick)
+        self.assertEqual(TRUMP_STRENGTH[SUIT_INDEX["Spades"]][jick], 10)
+        self.assertEqual(CARD_GAME_POINTS[card_to_int(pydealer.Card("10", "Hearts"))], 10)
+
+    def test_is_trump_matches_pydealer(self):
+        for trump in self.suits:
+            for card in CARDS:
+                self.assertEqual(utils.is_trump(card, trump), utils.is_trump(card.to_card(), trump))
+
+    def test_is_new_card_higher_matches_pydealer(self):
+        for trump in self.suits:
+            for current in CARDS:
+                for new in CARDS:
+                    if current == new:
+                        continue
+                    self.assertEqual(utils.is_new_card_higher(current, new, trump),
+                            utils.is_new_card_higher(current.to_card(), new.to_card(), trump))
+
+    def test_is_less_than_matches_pydealer_for_trump(self):
+        for trump in self.suits:
+            trump_cards = TRUMP_ORDER[SUIT_INDEX[trump]]
+            for lhs in trump_cards:
+                for rhs in CARDS:
+                    self.assertEqual(utils.is_less_than(CARDS[lhs], rhs, trump),
+                            utils.is_less_than(int_to_card(lhs), rhs.to_card(), trump))
+
+    def test_legal_play_indices_match_pydealer(self):
+        rng = random.Random(1234)
+        for _ in range(0, 300):
+            cards = rng.sample(CARDS, rng.randint(1, 6))
+            trump = rng.choice(self.suits)
+            # A trick lead with trump has a lead suit of "Trump", never the trump suit
+            lead_suit = rng.choice([ x for x in self.suits if x != trump ] + [ "Trump" ])
+            int_hand = SmearStack(cards)
+            pydealer_hand = ints_to_stack(cards)
+            self.assertEqual(utils.get_trump_indices(trump, int_hand), utils.get_trump_indices(trump, pydealer_hand))
+            self.assertEqual(utils.get_legal_play_indices(lead_suit, trump, int_hand),
+                    utils.get_legal_play_indices(lead_suit, trump, pydealer_hand))
+            self.assertEqual(utils.calculate_game_score(int_hand), utils.calculate_game_score(pydealer_hand))
+
+    def test_find_matches_pydealer(self):
+        cards = [ CARDS[0], CARDS[13], CARDS[9], CARDS[12], CARDS[22] ]
+        int_hand = SmearStack(cards)
+        pydealer_hand = ints_to_stack(cards)
+        for term in [ "Spades", "Clubs", "JS", "Ace", "10D" ]:
+            self.assertEqual(int_hand.find(term, sort=True), pydealer_hand.find(term, sort=True, ranks=POKER_RANKS))
+
+
+class TestBitmaskHands(unittest.TestCase):
+    def setUp(self):
+        self.trump = "Spades"
+        self.jack_clubs = card_to_int(pydealer.Card("Jack", "Clubs"))
+        self.two_clubs = card_to_int(pydealer.Card("2", "Clubs"))
+        self.ace_spades = card_to_int(pydealer.Card("Ace", "Spades"))
+        self.queen_hearts = card_to_int(pydealer.Card("Queen", "Hearts"))
+        self.hand = SmearStack([ self.jack_clubs, self.two_clubs, self.ace_spades, self.queen_hearts ])
+
+    def test_mask_follows_cards(self):
+        self.assertEqual(self.hand.mask, cards_to_mask(self.hand.cards))
+        del self.hand[1]
+        self.assertEqual(self.hand.mask, cards_to_mask(self.hand.cards))
+        self.hand += self.two_clubs
+        self.assertEqual(mask_to_cards(self.hand.mask), sorted(self.hand.cards))
+
+    def test_jick_does_not_follow_its_suit(self):
+        legal = utils.legal_play_mask("Clubs", self.trump, self.hand.mask)
+        self.assertEqual(legal, cards_to_mask([ self.two_clubs, self.jack_clubs, self.ace_spades ]))
+
+    def test_void_in_lead_suit_can_play_anything(self):
+        legal = utils.legal_play_mask("Diamonds", self.trump, self.hand.mask)
+        self.assertEqual(legal, self.hand.mask)
+
+    def test_is_void(self):
+        del self.hand[1]
+        self.assertEqual(utils.is_void("Clubs", self.trump, self.hand.mask), True)
+        self.assertEqual(utils.is_void("Trump", self.trump, self.hand.mask), False)
+        self.assertEqual(utils.is_void("Hearts", self.trump, self.hand.mask), False)
+
+
+class TestTrickStrength(unittest.TestCase):
+    def test_trick_winner_matches_pydealer_trick(self):
+        rng = random.Random(4321)
+        for _ in range(0, 500):
+            trump = rng.choice(SUITS)
+            cards = rng.sample(CARDS, rng.randint(2, 8))
+            trick = Trick(trump)
+            for i in range(0, len(cards)):
+                trick.add_card(i, cards[i].to_card())
+            self.assertEqual(utils.get_trick_winner_index(cards, trump), trick.get_winner_id())
+
+    def test_trump_beats_lead_suit(self):
+        strength = utils.trick_strength_table("Hearts", "Spades")
+        two_spades = card_to_int(pydealer.Card("2", "Spades"))
+        ace_hearts = card_to_int(pydealer.Card("Ace", "Hearts"))
+        ace_clubs = card_to_int(pydealer.Card("Ace", "Clubs"))
+        self.assertTrue(strength[two_spades] > strength[ace_hearts])
+        self.assertTrue(strength[ace_hearts] > strength[ace_clubs])
+        self.assertEqual(utils.trick_strength(ace_clubs, "Hearts", "Spades"), 0)
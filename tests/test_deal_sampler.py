@@ -0,0 +1,95 @@
+import unittest
+import sys
+import itertools
+import collections
+import numpy as np
+
+sys.path.insert(0, "..")
+from pysmear.deal_sampler import DealSampler, void_masks, sampler_for
+from pysmear.card_counting import CardCounting
+from pysmear.card_encoding import CARD_BIT, SUIT_INDEX, TRUMP_MASK, SUIT_MINUS_JICK_MASK, ALL_CARDS_MASK
+
+
+class TestDealSampler(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(1)
+
+    def test_samples_respect_voids(self):
+        cc = CardCounting(4)
+        cc.set_out_of(2, "Trump")
+        voids = void_masks(cc, 4, SUIT_INDEX["Spades"])
+        unseen = ALL_CARDS_MASK & ~(CARD_BIT[0] | CARD_BIT[1])
+        sampler = DealSampler(unseen, [ 0, 6, 6, 6 ], voids, self.rng)
+        for i in range(0, 20):
+            hands = sampler.sample()
+            self.assertEqual([ bin(h).count("1") for h in hands ], [ 0, 6, 6, 6 ])
+            self.assertEqual(hands[2] & TRUMP_MASK[SUIT_INDEX["Spades"]], 0)
+            self.assertEqual(hands[1] & hands[2], 0)
+            self.assertEqual(hands[1] & hands[3], 0)
+            self.assertEqual(hands[2] & hands[3], 0)
+            self.assertEqual((hands[1] | hands[2] | hands[3]) & ~unseen, 0)
+
+    def test_every_deal_is_equally_likely(self):
+        # Spades are trump, player 1 is out of trump and player 2 of clubs
+        unseen_cards = [ 0, 1, 2, 13, 14, 26, 39 ]
+        unseen = sum(CARD_BIT[c] for c in unseen_cards)
+        voids = [ 0, TRUMP_MASK[0], SUIT_MINUS_JICK_MASK[0][1] ]
+        deals = set()
+        for first in itertools.combinations(unseen_cards, 2):
+            if any(voids[1] & CARD_BIT[c] for c in first):
+                continue
+            for second in itertools.combinations([ c for c in unseen_cards if c not in first ], 2):
+                if not any(voids[2] & CARD_BIT[c] for c in second):
+                    deals.add((sum(CARD_BIT[c] for c in first), sum(CARD_BIT[c] for c in second)))
+        sampler = DealSampler(unseen, [ 0, 2, 2 ], voids, self.rng)
+        self.assertEqual(sampler.count_ways(0, sampler.capacity), len(deals))
+        num_samples = 200 * len(deals)
+        counts = collections.Counter(tuple(sampler.sample()[1:]) for i in range(0, num_samples))
+        self.assertEqual(set(counts), deals)
+        for count in counts.values():
+            self.assertTrue(120 < count < 280)
+        many = sampler.sample_many(num_samples)
+        counts = collections.Counter((int(hands[1]), int(hands[2])) for hands in many)
+        self.assertEqual(set(counts), deals)
+        for count in counts.values():
+            self.assertTrue(120 < count < 280)
+
+    def test_late_in_a_hand(self):
+        # Two cards each left, only diamonds (trump) and hearts are unseen,
+        # player 1 is out of trump and players 2 and 3 are out of hearts
+        unseen = ALL_CARDS_MASK & ~sum(CARD_BIT[c] for c in range(0, 30))
+        voids = [ 0, TRUMP_MASK[2], SUIT_MINUS_JICK_MASK[2][3], SUIT_MINUS_JICK_MASK[2][3] | SUIT_MINUS_JICK_MASK[2][0] ]
+        sampler = DealSampler(unseen, [ 0, 2, 2, 2 ], voids, self.rng)
+        many = sampler.sample_many(1000)
+        self.assertEqual(many.shape, (1000, 4))
+        for hands in [ sampler.sample() ] + [ [ int(h) for h in hands ] for hands in many ]:
+            self.assertEqual([ bin(h).count("1") for h in hands ], [ 0, 2, 2, 2 ])
+            for p in range(1, 4):
+                self.assertEqual(hands[p] & (voids[p] | ~unseen), 0)
+            self.assertEqual(hands[1] & hands[2] | hands[1] & hands[3] | hands[2] & hands[3], 0)
+
+    def test_no_deal_fits(self):
+        # Player 1 needs two cards, but is out of the only suit left
+        unseen = CARD_BIT[40] | CARD_BIT[41]
+        sampler = DealSampler(unseen, [ 0, 2 ], [ 0, SUIT_MINUS_JICK_MASK[0][3] ], self.rng)
+        self.assertFalse(sampler.possible)
+        self.assertEqual(sampler.sample(), None)
+        self.assertEqual(sampler.sample_many(10), None)
+        # More cards to deal than there are unseen
+        self.assertFalse(DealSampler(unseen, [ 0, 3 ], [ 0, 0 ], self.rng).possible)
+
+    def test_sampler_for_card_counting(self):
+        cc = CardCounting(3)
+        cc.trump_played = CARD_BIT[5]
+        cc.off_suit_played = CARD_BIT[20]
+        cc.set_out_of(1, "Hearts")
+        sampler = sampler_for(cc, SUIT_INDEX["Spades"], [ 0, 1 ], [ 2, 2, 1 ], 0, self.rng)
+        for i in range(0, 20):
+            hands = sampler.sample()
+            self.assertEqual([ bin(h).count("1") for h in hands ], [ 0, 2, 1 ])
+            self.assertEqual((hands[1] | hands[2]) & (CARD_BIT[0] | CARD_BIT[1] | CARD_BIT[5] | CARD_BIT[20]), 0)
+            self.assertEqual(hands[1] & SUIT_MINUS_JICK_MASK[0][SUIT_INDEX["Hearts"]], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
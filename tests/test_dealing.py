@@ -0,0 +1,93 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from pysmear.dealing import BatchDealer, shuffled_decks, game_random_state, shuffle_deck
+from pysmear.game_manager import SmearGameManager
+from pysmear.player import Player
+from pysmear.card_encoding import NUM_CARDS, SmearCard
+from pysmear.smear_simulator import SmearSimulator
+import pydealer
+
+
+class TestShuffledDecks(unittest.TestCase):
+    def test_every_deck_is_a_permutation(self):
+        decks = shuffled_decks(1, 0, range(0, 200))
+        self.assertEqual(decks.shape, (200, NUM_CARDS))
+        for deck in decks:
+            self.assertEqual(sorted(deck.tolist()), range(0, NUM_CARDS))
+
+    def test_decks_are_reproducible_per_game_and_hand(self):
+        decks = shuffled_decks(7, 3, range(0, 10))
+        self.assertEqual(shuffled_decks(7, 3, [ 4 ])[0].tolist(), decks[4].tolist())
+        self.assertNotEqual(shuffled_decks(7, 4, [ 4 ])[0].tolist(), decks[4].tolist())
+        self.assertNotEqual(shuffled_decks(8, 3, [ 4 ])[0].tolist(), decks[4].tolist())
+
+
+class TestBatchDealer(unittest.TestCase):
+    def test_deal_does_not_depend_on_batch_size(self):
+        small = BatchDealer(seed=5, batch_size=2)
+        large = BatchDealer(seed=5, batch_size=100)
+        for game_index in range(0, 3):
+            for hand_index in range(0, 5):
+                self.assertEqual(small.deal(game_index, hand_index, 4, 6), large.deal(game_index, hand_index, 4, 6))
+
+    def test_hands_do_not_overlap(self):
+        hands = BatchDealer(seed=5).deal(0, 0, 8, 6)
+        self.assertEqual(len(hands), 8)
+        cards = [ card for hand in hands for card in hand ]
+        self.assertEqual(len(cards), 48)
+        self.assertEqual(len(set(cards)), 48)
+
+    def test_card_types(self):
+        dealer = BatchDealer(seed=5)
+        int_hands = dealer.deal_int_cards(0, 0, 4, 6)
+        pydealer_hands = dealer.deal_pydealer_cards(0, 0, 4, 6)
+        self.assertTrue(isinstance(int_hands[0][0], SmearCard))
+        self.assertTrue(isinstance(pydealer_hands[0][0], pydealer.Card))
+        self.assertEqual([ c.abbrev for c in int_hands[2] ], [ c.abbrev for c in pydealer_hands[2] ])
+
+
+class TestRandomStreams(unittest.TestCase):
+    def test_streams_are_reproducible(self):
+        self.assertEqual(game_random_state(3, 10).randint(0, 1000, 20).tolist(), game_random_state(3, 10).randint(0, 1000, 20).tolist())
+        self.assertNotEqual(game_random_state(3, 10).randint(0, 1000, 20).tolist(), game_random_state(3, 11).randint(0, 1000, 20).tolist())
+        self.assertNotEqual(game_random_state(3, 10).randint(0, 1000, 20).tolist(), game_random_state(3, 10, stream=1).randint(0, 1000, 20).tolist())
+
+    def test_shuffle_deck_matches_across_card_types(self):
+        int_deck = shuffle_deck(game_random_state(3, 0), int_cards=True)
+        pydealer_deck = shuffle_deck(game_random_state(3, 0), int_cards=False)
+        self.assertEqual([ c.abbrev for c in int_deck ], [ c.abbrev for c in pydealer_deck ])
+
+    def play_game(self, smear, game_index):
+        smear.reset_game()
+        smear.game_index = game_index
+        smear.start_game()
+        while not smear.is_game_over():
+            smear.play_game_async()
+        return smear.scores
+
+    def new_game_manager(self):
+        smear = SmearGameManager(cards_to_deal=6, int_cards=True, seed=23)
+        for i in range(0, 3):
+            smear.add_player(Player("player{}".format(i)))
+        return smear
+
+    def test_game_can_be_regenerated_on_its_own(self):
+        smear = self.new_game_manager()
+        for game_index in range(0, 4):
+            scores = self.play_game(smear, game_index)
+        self.assertEqual(self.play_game(self.new_game_manager(), 3), scores)
+
+
+class TestSeededSimulator(unittest.TestCase):
+    def run_simulation(self, int_cards):
+        sim = SmearSimulator(num_teams=0, num_players=3, int_cards=int_cards, seed=11)
+        sim.run(5)
+        return sim.games_won
+
+    def test_seeded_runs_are_reproducible(self):
+        self.assertEqual(self.run_simulation(True), self.run_simulation(True))
+
+    def test_seeded_runs_match_across_card_types(self):
+        self.assertEqual(self.run_simulation(False), self.run_simulation(True))
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+import numpy as np
+
+sys.path.insert(0, "..")
+from pysmear import endgame_tablebase
+from pysmear.double_dummy import DoubleDummySolver, mask_cards
+from pysmear.card_encoding import CARD_BIT
+
+
+class TestEndgameTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.path = tempfile.mkstemp(suffix=".npy")
+        os.close(handle)
+        np.save(cls.path, endgame_tablebase.build_table(player_counts=[ 2, 3 ]))
+
+    @classmethod
+    def tearDownClass(cls):
+        endgame_tablebase.use_endgame_tablebase(None)
+        os.remove(cls.path)
+
+    def test_every_state_is_built_once(self):
+        for num_players, expected in [ (2, 210), (3, 7560) ]:
+            keys = [ endgame_tablebase.state_key(pairs) for pairs in endgame_tablebase.all_states(num_players) ]
+            self.assertEqual(len(keys), expected)
+            self.assertEqual(len(set(keys)), expected)
+        self.assertEqual(endgame_tablebase.EndgameTablebase(self.path).states_by_players(), { 2: 210, 3: 7560, 4: 0 })
+
+    def test_line_winners_match_playing_the_tricks(self):
+        tablebase = endgame_tablebase.EndgameTablebase(self.path)
+        rng = random.Random(2)
+        for i in range(0, 100):
+            solver = endgame_tablebase.random_solver(rng, 3, 2)
+            order = [ (solver.leader + p) % 3 for p in range(0, 3) ]
+            winners, cards = tablebase.lookup(solver.trump, [ mask_cards(solver.hands[p]) for p in order ])
+            for line in range(0, 8):
+                first_trick = [ cards[p][line >> p & 1] for p in range(0, 3) ]
+                for card in first_trick:
+                    solver.play(card)
+                first_winner = solver.leader
+                second_trick = []
+                for p in range(0, 3):
+                    second_trick.append(solver.hands[solver.to_play()].bit_length() - 1)
+                    solver.play(second_trick[-1])
+                line_winners = winners >> (4 * line) & 15
+                self.assertEqual(order[line_winners & 3], first_winner)
+                self.assertEqual(order[line_winners >> 2], solver.leader)
+                for card in reversed(first_trick + second_trick):
+                    solver.undo(card)
+
+    def test_solver_values_are_unchanged(self):
+        tablebase = endgame_tablebase.EndgameTablebase(self.path)
+        rng = random.Random(3)
+        for i in range(0, 20):
+            solver = endgame_tablebase.random_solver(rng, rng.choice([ 2, 3 ]), 4)
+            cards = mask_cards(solver.legal_moves(solver.to_play()))
+            expected = solver.card_values(cards)
+            solver.table = {}
+            solver.tablebase = tablebase
+            self.assertEqual(solver.card_values(cards), expected)
+        self.assertTrue(tablebase.hits > 0)
+        self.assertEqual(tablebase.coverage(), 1.0)
+
+    def test_uncovered_endgames_are_searched(self):
+        tablebase = endgame_tablebase.EndgameTablebase(self.path)
+        solver = endgame_tablebase.random_solver(random.Random(4), 4, 2)
+        expected = solver.solve_value()
+        solver.table = {}
+        solver.tablebase = tablebase
+        self.assertEqual(solver.solve_value(), expected)
+        self.assertTrue(tablebase.lookups > 0)
+        self.assertEqual(tablebase.hits, 0)
+
+    def test_use_endgame_tablebase(self):
+        endgame_tablebase.use_endgame_tablebase(self.path)
+        tablebase = DoubleDummySolver.tablebase
+        self.assertEqual(tablebase.path, self.path)
+        endgame_tablebase.use_endgame_tablebase(self.path)
+        self.assertTrue(DoubleDummySolver.tablebase is tablebase)
+        solver = DoubleDummySolver("Hearts", [ 0, 1 ], 0, 2, 0)
+        solver.set_deal([ CARD_BIT[0] | CARD_BIT[14], CARD_BIT[40] | CARD_BIT[51] ], [], [], [], 0)
+        solver.solve_value()
+        self.assertEqual(tablebase.hits, 1)
+        endgame_tablebase.use_endgame_tablebase(None)
+        self.assertEqual(DoubleDummySolver.tablebase, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,10 @@ sys.path.insert(0, "..")
 from pysmear import game_manager
 from pysmear import playing_logic
 from pysmear import player
+from pysmear import hand
+from pysmear.card_encoding import CARDS, SmearStack, card_to_int, int_to_card
+import random
+import pydealer
 
 class TestSmearEngineApi(unittest.TestCase):
     ####################
@@ -39,3 +43,95 @@ class TestSmearEngineApi(unittest.TestCase):
         with self.assertRaises(Exception):
             self.smear.add_player(player2)
 
+
+
+class TestIncrementalScoring(unittest.TestCase):
+    def setUp(self):
+        players = {}
+        for i in range(0, 3):
+            players[i] = player.Player("player{}".format(i))
+        self.hand_manager = hand.SmearHandManager(players, 0)
+        self.hand_manager.current_hand.set_trump("Spades")
+
+    def test_points_are_tracked_as_tricks_are_won(self):
+        self.hand_manager.update_points_won(1, [ pydealer.Card("Jack", "Clubs"), pydealer.Card("10", "Hearts"), pydealer.Card("King", "Spades") ])
+        self.hand_manager.update_points_won(2, [ pydealer.Card("Ace", "Spades"), pydealer.Card("2", "Spades"), pydealer.Card("Jack", "Spades") ])
+        self.assertEqual(self.hand_manager.game_points, [ 0, 14, 5 ])
+        self.assertEqual(self.hand_manager.current_high_id, 2)
+        self.assertEqual(self.hand_manager.current_high, pydealer.Card("Ace", "Spades"))
+        self.assertEqual(self.hand_manager.jick_id, 1)
+        self.assertEqual(self.hand_manager.jack_id, 2)
+        self.assertEqual(self.hand_manager.calculate_game_winner(), 1)
+
+    def test_int_cards_score_the_same(self):
+        self.hand_manager.update_points_won(0, [ card_to_int(pydealer.Card("Queen", "Spades")), card_to_int(pydealer.Card("10", "Clubs")) ])
+        self.assertEqual(self.hand_manager.game_points, [ 12, 0, 0 ])
+        self.assertEqual(self.hand_manager.current_high_id, 0)
+        self.assertEqual(self.hand_manager.jack_id, None)
+
+
+class TestDecidedHands(unittest.TestCase):
+    def new_hand_manager(self, num_players, num_teams, int_cards, end_decided_hands):
+        players = {}
+        for i in range(0, num_players):
+            players[i] = player.Player("player{}".format(i))
+            players[i].set_player_id(i)
+            if num_teams:
+                players[i].set_team_id(i % num_teams)
+        return hand.SmearHandManager(players, num_teams, int_cards=int_cards, keep_piles=False, end_decided_hands=end_decided_hands)
+
+    def play_hand(self, hand_manager, deck, trump, bidder, bid):
+        num_players = hand_manager.num_players
+        if hand_manager.int_cards:
+            hands = [ SmearStack(CARDS[c] for c in deck[p * 6:(p + 1) * 6]) for p in range(0, num_players) ]
+        else:
+            hands = [ [ int_to_card(c) for c in deck[p * 6:(p + 1) * 6] ] for p in range(0, num_players) ]
+        hand_manager.start_hand_with(hands, trump, bidder, bid)
+        tricks = 0
+        while not hand_manager.is_hand_over():
+            hand_manager.play_trick()
+            tricks += 1
+        return hand_manager.get_scores(0), tricks
+
+    def test_scores_are_the_same_as_playing_the_hand_out(self):
+        rng = random.Random(3)
+        ended_early = 0
+        for num_players, num_teams, int_cards in [ (3, 0, True), (4, 2, True), (4, 0, False) ]:
+            full = self.new_hand_manager(num_players, num_teams, int_cards, False)
+            decided = self.new_hand_manager(num_players, num_teams, int_cards, True)
+            for i in range(0, 60):
+                deck = range(0, 52)
+                rng.shuffle(deck)
+                trump = rng.choice([ "Spades", "Clubs", "Diamonds", "Hearts" ])
+                bidder = rng.randrange(num_players)
+                bid = rng.choice([ 2, 3, 4, 5 ])
+                scores, tricks = self.play_hand(full, deck, trump, bidder, bid)
+                decided_scores, decided_tricks = self.play_hand(decided, deck, trump, bidder, bid)
+                self.assertEqual(decided_scores, scores)
+                self.assertTrue(decided_tricks <= tricks)
+                if decided_tricks < tricks:
+                    ended_early += 1
+        self.assertTrue(ended_early > 0)
+
+    def test_game_is_decided_by_a_big_enough_lead(self):
+        hand_manager = self.new_hand_manager(3, 0, True, True)
+        hand_manager.game_points = [ 14, 3, 0 ]
+        self.assertTrue(hand_manager.is_game_decided(10))
+        self.assertFalse(hand_manager.is_game_decided(11))
+        hand_manager.game_points = [ 0, 0, 0 ]
+        self.assertTrue(hand_manager.is_game_decided(0))
+        self.assertFalse(hand_manager.is_game_decided(1))
+
+    def test_forced_card(self):
+        for int_cards in [ True, False ]:
+            hand_manager = self.new_hand_manager(3, 0, int_cards, True)
+            hand_manager.current_hand.set_trump("Spades")
+            make_hand = (lambda cards: SmearStack(CARDS[c] for c in cards)) if int_cards else (lambda cards: pydealer.Stack(cards=[ int_to_card(c) for c in cards ]))
+            # Nothing has been led yet, so anything can be played
+            self.assertEqual(hand_manager.forced_card_index(make_hand([ 40, 41 ])), None)
+            self.assertEqual(hand_manager.forced_card_index(make_hand([ 41 ])), 0)
+            hand_manager.current_hand.add_card(0, CARDS[44] if int_cards else int_to_card(44))
+            # Hearts were led: the only heart, or hearts and trump
+            hand = make_hand([ 30, 45, 20 ])
+            self.assertEqual(hand[hand_manager.forced_card_index(hand)], hand[1])
+            self.assertEqual(hand_manager.forced_card_index(make_hand([ 30, 45, 2 ])), None)
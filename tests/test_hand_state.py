@@ -0,0 +1,134 @@
+import unittest
+import sys
+import random
+
+sys.path.insert(0, "..")
+from pysmear.hand_state import HandState
+from pysmear.player import Player
+from pysmear.hand import SmearHandManager
+from pysmear.playing_logic import JustGreedyEnough, CautiousTaker
+from pysmear.card_encoding import CARDS, CARD_BIT, SUITS, SmearStack, int_to_card, card_index
+
+
+def random_line(state, rng):
+    line = []
+    while not state.is_hand_over():
+        legal = state.legal_moves()
+        card = rng.choice([ c for c in range(0, 52) if legal & CARD_BIT[c] ])
+        state.play(card)
+        line.append(card)
+    return line
+
+
+def snapshot(state):
+    return tuple(getattr(state, name) if name != "hands" else list(state.hands) for name in HandState.__slots__ if name != "history")
+
+
+class TestHandState(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(1)
+        self.hand_manager = self.create_hand_manager(4, 2, int_cards=True)
+
+    def create_hand_manager(self, num_players, num_teams, int_cards):
+        players = {}
+        for i in range(0, num_players):
+            players[i] = Player("player{}".format(i), playing_logic=CautiousTaker() if i % 2 else JustGreedyEnough())
+            players[i].set_player_id(i)
+            if num_teams:
+                players[i].set_team_id(i % num_teams)
+        return SmearHandManager(players, num_teams, int_cards=int_cards, keep_piles=False)
+
+    def start_random_hand(self, hand_manager, int_cards=True):
+        deck = range(0, 52)
+        self.rng.shuffle(deck)
+        num_players = hand_manager.num_players
+        if int_cards:
+            hands = [ SmearStack(CARDS[c] for c in deck[p * 6:(p + 1) * 6]) for p in range(0, num_players) ]
+        else:
+            hands = [ [ int_to_card(c) for c in deck[p * 6:(p + 1) * 6] ] for p in range(0, num_players) ]
+        hand_manager.start_hand_with(hands, self.rng.choice(SUITS), self.rng.randrange(num_players), self.rng.choice([ 2, 3, 4 ]))
+
+    def assert_state_matches(self, state, hand_manager):
+        expected = hand_manager.get_hand_state()
+        self.assertEqual(snapshot(state), snapshot(expected))
+
+    def test_follows_the_hand_manager(self):
+        for num_players, num_teams in [ (4, 2), (3, 0), (6, 2) ]:
+            for i in range(0, 10):
+                hand_manager = self.create_hand_manager(num_players, num_teams, int_cards=True)
+                self.start_random_hand(hand_manager)
+                state = hand_manager.get_hand_state()
+                while not hand_manager.is_hand_over():
+                    hand_manager.play_trick()
+                    cards, player_ids, winner_id = hand_manager.current_hand.tricks[-1]
+                    for card in cards:
+                        state.play(int(card))
+                    self.assert_state_matches(state, hand_manager)
+                scores = hand_manager.get_scores(0)
+                self.assertEqual(state.scores(), [ scores[p] for p in range(0, num_players) ])
+
+    def test_from_the_middle_of_a_trick(self):
+        self.start_random_hand(self.hand_manager)
+        self.hand_manager.play_trick()
+        current_hand = self.hand_manager.current_hand
+        self.hand_manager.current_player = current_hand.first_player
+        for i in range(0, 2):
+            player = self.hand_manager.players[self.hand_manager.current_player]
+            card = player.play_card(current_hand, self.hand_manager.card_counting_info, self.hand_manager.teams)
+            self.hand_manager.update_low_if_needed(card, self.hand_manager.current_player)
+            current_hand.add_card(self.hand_manager.current_player, card)
+            self.hand_manager.card_counting_info.card_was_played(self.hand_manager.current_player, card, current_hand.current_trick)
+            self.hand_manager.current_player = self.hand_manager.next_player_id(self.hand_manager.current_player)
+            self.hand_manager.remaining_players -= 1
+        state = self.hand_manager.get_hand_state()
+        self.assertEqual(state.trick, tuple(int(c) for c in current_hand.current_trick.cards))
+        self.assertEqual(state.to_play(), self.hand_manager.current_player)
+        self.assertEqual(state.cards_left, 4 * 5 - 2)
+
+    def test_undo_puts_everything_back(self):
+        for i in range(0, 20):
+            self.start_random_hand(self.hand_manager)
+            self.hand_manager.play_trick()
+            state = self.hand_manager.get_hand_state()
+            before = snapshot(state)
+            line = random_line(state, self.rng)
+            self.assertEqual(len(line), 20)
+            for j in range(0, len(line)):
+                state.undo()
+            self.assertEqual(snapshot(state), before)
+            self.assertEqual(state.history, [])
+
+    def test_clone_is_independent(self):
+        self.start_random_hand(self.hand_manager)
+        state = self.hand_manager.get_hand_state()
+        state.play(card_index(self.hand_manager.players[state.to_play()].hand[0]))
+        before = snapshot(state)
+        clone = state.clone()
+        self.assertEqual(snapshot(clone), before)
+        random_line(clone, self.rng)
+        self.assertEqual(snapshot(state), before)
+        clone.undo()
+        state.undo()
+        self.assertEqual(len(state.history), 0)
+
+    def test_card_counting(self):
+        self.start_random_hand(self.hand_manager)
+        self.hand_manager.play_trick()
+        self.hand_manager.play_trick()
+        card_counting_info = self.hand_manager.get_hand_state().card_counting()
+        expected = self.hand_manager.card_counting_info
+        self.assertEqual((card_counting_info.trump_played, card_counting_info.off_suit_played, card_counting_info.voids),
+                (expected.trump_played, expected.off_suit_played, expected.voids))
+
+    def test_pydealer_cards(self):
+        hand_manager = self.create_hand_manager(4, 2, int_cards=False)
+        self.start_random_hand(hand_manager, int_cards=False)
+        hand_manager.play_trick()
+        state = hand_manager.get_hand_state()
+        self.assertEqual(state.cards_left, 20)
+        self.assertEqual(state.hands[0], sum(CARD_BIT[card_index(c)] for c in hand_manager.players[0].hand))
+        self.assertEqual(state.leader, hand_manager.current_hand.first_player)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import random
+import pydealer
+
+sys.path.insert(0, "..")
+from pysmear.hand_views import HandViews, poker_rank
+from pysmear.player import Player
+from pysmear.playing_logic import CautiousTaker
+from pysmear.bidding_logic import BetterBidding
+from pysmear.smear_utils import SmearUtils as utils
+from pysmear.card_encoding import CARDS, SUITS, SmearStack, int_to_card
+
+
+class TestHandViews(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(5)
+
+    def deal(self, player, int_cards, num_cards=6):
+        player.reset(int_cards=int_cards)
+        deck = range(0, 52)
+        self.rng.shuffle(deck)
+        for c in deck[:num_cards]:
+            player.receive_dealt_card(SmearStack([ CARDS[c] ]) if int_cards else [ int_to_card(c) ])
+
+    def assert_views_match(self, player, trump):
+        hand = player.hand
+        views = player.hand_views
+        self.assertTrue(views.hand is hand)
+        self.assertEqual(views.by_rank, sorted(range(0, len(hand)), key=lambda i: poker_rank(hand[i])))
+        self.assertEqual(views.trump_indices(trump), utils.get_trump_indices(trump, hand))
+        self.assertEqual(views.off_suit_by_rank(trump), [ i for i in views.by_rank if not utils.is_trump(hand[i], trump) ])
+
+    def test_kept_up_to_date(self):
+        for int_cards in [ True, False ]:
+            player = Player("player0")
+            for i in range(0, 20):
+                self.deal(player, int_cards)
+                trump = self.rng.choice(SUITS)
+                self.assert_views_match(player, trump)
+                player.playing_logic.choose_card = lambda *args: self.rng.randrange(len(player.hand))
+                while player.has_cards():
+                    player.play_card(None, None, [])
+                    self.assert_views_match(player, trump)
+
+    def test_trump_view_places_the_jick(self):
+        player = Player("player0", initial_cards=[ pydealer.Card("Jack", "Clubs"), pydealer.Card("Ace", "Spades"),
+            pydealer.Card("10", "Spades"), pydealer.Card("Jack", "Spades"), pydealer.Card("2", "Hearts") ])
+        hand = player.hand
+        self.assertEqual([ hand[i].abbrev for i in player.hand_views.trump_indices("Spades") ], [ "10S", "JC", "JS", "AS" ])
+        self.assertEqual([ hand[i].abbrev for i in player.hand_views.off_suit_by_rank("Clubs") ], [ "2H", "10S", "AS" ])
+
+    def test_logics_read_the_views(self):
+        player = Player("player0", playing_logic=CautiousTaker(), bidding_logic=BetterBidding())
+        self.assertTrue(player.playing_logic.hand_views is player.hand_views)
+        self.assertTrue(player.bidding_logic.hand_views is player.hand_views)
+        self.deal(player, int_cards=True)
+        views = player.hand_views
+        self.assertTrue(player.bidding_logic.trump_indices("Hearts", player.hand) is views.trump_indices("Hearts"))
+        # Only one trump's views are kept at a time
+        spades = views.trump_indices("Spades")
+        self.assertEqual(views.trump, "Spades")
+        self.assertEqual(spades, utils.get_trump_indices("Spades", player.hand))
+        # Another hand isn't read from the views
+        other = SmearStack([ CARDS[0], CARDS[40] ])
+        self.assertEqual(player.bidding_logic.trump_indices("Spades", other), [ 0 ])
+
+
+if __name__ == '__main__':
+    unittest.main()
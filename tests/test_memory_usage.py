@@ -0,0 +1,35 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from pysmear import memory_usage
+from pysmear.card_counting import CardCounting
+from pysmear.trick import Trick
+
+
+class TestMemoryUsage(unittest.TestCase):
+    def test_state_objects_have_no_dict(self):
+        self.assertFalse(hasattr(CardCounting(4), "__dict__"))
+        self.assertFalse(hasattr(Trick("Spades"), "__dict__"))
+
+    def test_out_of_suit_is_tracked_by_player_and_suit(self):
+        cc = CardCounting(4)
+        cc.set_out_of(2, "Hearts")
+        self.assertEqual(cc.is_out_of(2, "Hearts"), True)
+        self.assertEqual(cc.is_out_of(3, "Hearts"), False)
+        self.assertEqual(cc.is_out_of(2, "Trump"), False)
+        cc.reset_for_next_hand()
+        self.assertEqual(cc.is_out_of(2, "Hearts"), False)
+
+    def test_deep_sizeof_counts_shared_objects_once(self):
+        shared = [ 0 ] * 100
+        self.assertEqual(memory_usage.deep_sizeof([ shared, shared ]), memory_usage.deep_sizeof([ shared, [] ]) - sys.getsizeof([]))
+
+    def test_int_cards_use_less_memory(self):
+        self.assertTrue(memory_usage.bytes_per_game(4, int_cards=True) < memory_usage.bytes_per_game(4, int_cards=False))
+
+    def test_hand_views_stay_small(self):
+        # Each player's HandViews (and the logics holding on to it) added
+        # about 2.3KB per player before only one trump's views were kept
+        self.assertTrue(memory_usage.bytes_per_game(4, int_cards=True) < 25000)
+        self.assertTrue(memory_usage.bytes_per_game(8, int_cards=True) < 40000)
@@ -0,0 +1,50 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from pysmear.phase_timers import PhaseTimers
+from pysmear.smear_simulator import SmearSimulator
+
+
+class TestPhaseTimers(unittest.TestCase):
+    def test_stop_counts_calls(self):
+        timers = PhaseTimers()
+        for i in range(0, 3):
+            start = timers.start()
+            timers.stop("deal", start)
+        self.assertEqual(timers.counts, { "deal": 3 })
+        self.assertTrue(timers.total_ns["deal"] >= 0)
+
+    def test_merge_adds_counts(self):
+        timers = PhaseTimers()
+        other = PhaseTimers()
+        timers.stop("bids", timers.start())
+        other.stop("bids", other.start())
+        other.stop("play_trick", other.start())
+        timers.merge(other)
+        self.assertEqual(timers.counts, { "bids": 2, "play_trick": 1 })
+        self.assertEqual(len(timers.report().splitlines()), 2)
+
+
+class TestSimulatorPhaseTimers(unittest.TestCase):
+    def test_every_hand_phase_is_timed(self):
+        sim = SmearSimulator(num_teams=0, num_players=3, int_cards=True, seed=5, time_phases=True)
+        sim.play_games(0, 2, show_progress=False)
+        counts = sim.timers.counts
+        self.assertEqual(counts["deal"], sim.num_hands)
+        self.assertEqual(counts["bids"], sim.num_hands)
+        self.assertEqual(counts["get_scores"], sim.num_hands)
+        self.assertEqual(counts["calculate_game_winner"], sim.num_hands)
+        self.assertEqual(counts["card_was_played"], 3 * counts["play_trick"])
+        self.assertNotIn("score_graph", counts)
+
+    def test_timers_are_merged_from_workers(self):
+        sim = SmearSimulator(num_teams=0, num_players=3, int_cards=True, seed=5, time_phases=True)
+        sim.run(4, workers=2)
+        self.assertEqual(sim.timers.counts["deal"], sim.num_hands)
+        self.assertIn("Time per phase", sim.stats())
+
+    def test_disabled_by_default(self):
+        sim = SmearSimulator(num_teams=0, num_players=3, int_cards=True, seed=5)
+        sim.play_games(0, 1, show_progress=False)
+        self.assertEqual(sim.timers, None)
@@ -0,0 +1,83 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from pysmear.pimc_playing import PimcPlaying
+from pysmear.playing_logic import JustGreedyEnough
+from pysmear.player import Player
+from pysmear.hand import SmearHandManager
+from pysmear.card_encoding import CARDS, SUIT_INDEX, VALUE_INDEX, SmearStack, encode
+import pydealer
+
+
+def card(value, suit):
+    return CARDS[encode(SUIT_INDEX[suit], VALUE_INDEX[value])]
+
+
+class TestPimcPlaying(unittest.TestCase):
+    def setUp(self):
+        self.logic = PimcPlaying(num_samples=10, time_budget=None, seed=1)
+        players = {}
+        for i in range(0, 4):
+            players[i] = Player("player{}".format(i), playing_logic=self.logic if i == 1 else JustGreedyEnough())
+            players[i].set_player_id(i)
+        self.hand_manager = SmearHandManager(players, 2, int_cards=True, keep_piles=False)
+        self.hand_manager.teams = [ [ 0, 2 ], [ 1, 3 ] ]
+
+    def start_hand(self, hands, trump="Spades", bidder=0, bid=2):
+        self.hand_manager.start_hand_with([ SmearStack(cards) for cards in hands ], trump, bidder, bid)
+
+    def test_takes_the_jack(self):
+        self.start_hand([ [ card("Jack", "Spades"), card("3", "Diamonds") ], [ card("4", "Spades"), card("Ace", "Spades") ],
+            [ card("4", "Clubs"), card("5", "Clubs") ], [ card("6", "Clubs"), card("7", "Clubs") ] ])
+        self.hand_manager.play_trick()
+        self.assertEqual(self.hand_manager.current_hand.tricks[0][0][1], card("Ace", "Spades"))
+        self.assertEqual(self.logic.samples_searched, 10)
+
+    def test_only_legal_card_is_played_without_searching(self):
+        self.start_hand([ [ card("Jack", "Spades"), card("3", "Diamonds") ], [ card("2", "Hearts"), card("Ace", "Spades") ],
+            [ card("4", "Clubs"), card("5", "Clubs") ], [ card("6", "Clubs"), card("7", "Clubs") ] ])
+        self.hand_manager.play_trick()
+        self.hand_manager.play_trick()
+        self.assertTrue(self.hand_manager.is_hand_over())
+        self.assertEqual(len(self.logic.table), 0)
+
+    def test_table_is_kept_for_the_hand(self):
+        hands = [ [ card("Jack", "Spades"), card("3", "Diamonds"), card("8", "Hearts") ], [ card("4", "Spades"), card("Ace", "Spades"), card("King", "Diamonds") ],
+            [ card("4", "Clubs"), card("5", "Clubs"), card("9", "Hearts") ], [ card("6", "Clubs"), card("7", "Clubs"), card("10", "Diamonds") ] ]
+        self.start_hand(hands)
+        self.hand_manager.play_trick()
+        table = self.logic.table
+        self.assertTrue(len(table) > 0)
+        self.hand_manager.play_trick()
+        self.assertTrue(self.logic.table is table)
+        self.start_hand(hands)
+        self.hand_manager.play_trick()
+        self.assertFalse(self.logic.table is table)
+
+    def test_falls_back_when_out_of_time(self):
+        self.logic.time_budget = 0.0
+        self.logic.num_samples = 1000
+        self.start_hand([ [ card("Jack", "Spades"), card("3", "Diamonds") ], [ card("4", "Spades"), card("Ace", "Spades") ],
+            [ card("4", "Clubs"), card("5", "Clubs") ], [ card("6", "Clubs"), card("7", "Clubs") ] ])
+        self.hand_manager.play_trick()
+        self.assertTrue(self.logic.samples_searched < 1000)
+        self.assertTrue(self.hand_manager.current_hand.tricks[0][0][1] in [ card("4", "Spades"), card("Ace", "Spades") ])
+
+    def test_pydealer_cards(self):
+        players = {}
+        logic = PimcPlaying(num_samples=4, time_budget=None, seed=1)
+        for i in range(0, 4):
+            players[i] = Player("player{}".format(i), playing_logic=logic if i == 1 else JustGreedyEnough())
+            players[i].set_player_id(i)
+        hand_manager = SmearHandManager(players, 2)
+        hand_manager.teams = [ [ 0, 2 ], [ 1, 3 ] ]
+        hands = [ [ pydealer.Card("Jack", "Spades"), pydealer.Card("3", "Diamonds") ], [ pydealer.Card("4", "Spades"), pydealer.Card("Ace", "Spades") ],
+            [ pydealer.Card("4", "Clubs"), pydealer.Card("5", "Clubs") ], [ pydealer.Card("6", "Clubs"), pydealer.Card("7", "Clubs") ] ]
+        hand_manager.start_hand_with(hands, "Spades", 0, 2)
+        hand_manager.play_trick()
+        self.assertEqual(hand_manager.current_hand.tricks[0][0][1], pydealer.Card("Ace", "Spades"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@ from mock import MagicMock
 
 sys.path.insert(0, "..")
 import pysmear.playing_logic
+from pysmear.playing_logic import DecisionContext
+from pysmear.trick import Trick
 import pydealer
 
 class TestJustGreedyEnoughPlayingLogic(unittest.TestCase):
@@ -30,18 +32,24 @@ class TestJustGreedyEnoughPlayingLogic(unittest.TestCase):
         self.cards = [self.six_hearts, self.seven_hearts, self.nine_clubs, self.jack_clubs, self.queen_diamonds]
         self.my_hand = pydealer.Stack(cards=self.cards)
 
+    # A context for following a trick led with the ace of lead_suit
+    def following(self, lead_suit):
+        trick = Trick(self.trump)
+        trick.add_card(0, pydealer.Card("Ace", self.trump if lead_suit == "Trump" else lead_suit))
+        return DecisionContext(self.my_hand, trick)
+
     def test_find_lowest_card_index_when_trump_is_lead(self):
         self.cards = [self.six_hearts, self.seven_hearts, self.nine_clubs, self.jack_clubs, self.queen_diamonds]
         self.lead_suit = "Trump"
         self.my_hand = pydealer.Stack(cards=self.cards)
-        index = self.pl.find_lowest_card_index(self.my_hand, self.lead_suit, self.trump)
+        index = self.pl.find_lowest_card_index(self.following(self.lead_suit))
         self.assertEqual(self.my_hand[index], self.jack_clubs)
 
     def test_find_lowest_card_index_when_trump_is_lead_returns_lowest_trump(self):
         self.cards = [self.six_hearts, self.two_spades, self.nine_clubs, self.jack_clubs, self.queen_diamonds]
         self.lead_suit = "Trump"
         self.my_hand = pydealer.Stack(cards=self.cards)
-        index = self.pl.find_lowest_card_index(self.my_hand, self.lead_suit, self.trump)
+        index = self.pl.find_lowest_card_index(self.following(self.lead_suit))
         self.assertEqual(self.my_hand[index], self.two_spades)
 
     def test_find_lowest_card_index_handles_jick_being_lead(self):
@@ -49,7 +57,7 @@ class TestJustGreedyEnoughPlayingLogic(unittest.TestCase):
         self.cards = [self.two_hearts, self.seven_diamonds, self.ten_clubs, self.queen_spades, self.ace_diamonds]
         self.my_hand = pydealer.Stack(cards=self.cards)
         self.lead_suit = "Trump"
-        index = self.pl.find_lowest_card_index(self.my_hand, self.lead_suit, self.trump)
+        index = self.pl.find_lowest_card_index(self.following(self.lead_suit))
         self.assertEqual(self.my_hand[index], self.ten_clubs)
 
     def test_find_lowest_card_index_returns_lowest_when_unable_to_follow_suit(self):
@@ -57,9 +65,22 @@ class TestJustGreedyEnoughPlayingLogic(unittest.TestCase):
         self.cards = [self.six_hearts, self.two_hearts, self.seven_clubs, self.ten_clubs]
         self.my_hand = pydealer.Stack(cards=self.cards)
         self.lead_suit = "Diamonds"
-        index = self.pl.find_lowest_card_index(self.my_hand, self.lead_suit, self.trump)
+        index = self.pl.find_lowest_card_index(self.following(self.lead_suit))
         self.assertEqual(self.my_hand[index], self.two_hearts)
 
+    def test_choose_card_does_not_reorder_my_hand(self):
+        self.cards = [self.queen_diamonds, self.six_hearts, self.two_hearts, self.nine_clubs]
+        self.my_hand = pydealer.Stack(cards=self.cards)
+        current_hand = MagicMock()
+        current_hand.trump = self.trump
+        current_hand.current_trick = Trick(self.trump)
+        index = self.pl.choose_card(current_hand, None, self.my_hand, [], False)
+        self.assertEqual(self.my_hand[index], self.queen_diamonds)
+        current_hand.current_trick.add_card(0, pydealer.Card("Ace", "Clubs"))
+        index = self.pl.choose_card(current_hand, None, self.my_hand, [], False)
+        self.assertEqual(self.my_hand[index], self.nine_clubs)
+        self.assertEqual(list(self.my_hand.cards), self.cards)
+
 
 class TestCautiousTakerPlayingLogic(unittest.TestCase):
     def setUp(self):
@@ -98,21 +119,21 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.trump = "Spades"
         self.cards = [self.six_hearts, self.ace_spades, self.two_hearts, self.queen_spades, self.seven_clubs] 
         self.my_hand = pydealer.Stack(cards=self.cards)
-        index = self.pl.get_A_K_Q_of_trump(self.my_hand, self.trump)
+        index = self.pl.get_A_K_Q_of_trump(DecisionContext(self.my_hand, Trick(self.trump)))
         self.assertEqual(self.my_hand[index], self.ace_spades)
 
     def test_get_A_K_Q_of_trump_with_small_trump(self):
         self.trump = "Spades"
         self.cards = [self.six_hearts, self.two_hearts, self.seven_spades, self.ten_clubs]
         self.my_hand = pydealer.Stack(cards=self.cards)
-        index = self.pl.get_A_K_Q_of_trump(self.my_hand, self.trump)
+        index = self.pl.get_A_K_Q_of_trump(DecisionContext(self.my_hand, Trick(self.trump)))
         self.assertEqual(None, index)
 
     def test_get_A_K_Q_of_trump_with_no_trump(self):
         self.trump = "Spades"
         self.cards = [self.six_hearts, self.two_hearts, self.seven_clubs, self.ten_clubs]
         self.my_hand = pydealer.Stack(cards=self.cards)
-        index = self.pl.get_A_K_Q_of_trump(self.my_hand, self.trump)
+        index = self.pl.get_A_K_Q_of_trump(DecisionContext(self.my_hand, Trick(self.trump)))
         self.assertEqual(None, index)
 
     def test_take_jick_or_jack_if_possible_with_K(self):
@@ -125,7 +146,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.cards = pydealer.Stack(cards=[ self.jack_clubs ])
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.king_spades)
 
     def test_take_jick_or_jack_if_possible_with_safe_jack(self):
@@ -138,7 +159,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.cards = pydealer.Stack(cards=[ self.jack_clubs ])
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.jack_spades)
 
     def test_take_jick_or_jack_if_possible_with_not_safe_jack(self):
@@ -151,7 +172,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.cards = pydealer.Stack(cards=[ self.jack_clubs ])
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(None, index)
 
     def test_take_ten_if_possible_with_safe_off_suit(self):
@@ -165,7 +186,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.current_winning_card = self.ten_hearts
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_ten_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_ten_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.ace_hearts)
 
     def test_take_ten_if_possible_with_safe_jack(self):
@@ -179,7 +200,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.current_winning_card = self.ten_hearts
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_ten_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_ten_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.jack_spades)
 
     def test_take_ten_if_possible_with_not_safe_jack(self):
@@ -193,7 +214,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.current_winning_card = self.ten_hearts
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_ten_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_ten_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(None, index)
 
     def test_take_ten_if_possible_with_lowest_trump(self):
@@ -207,7 +228,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.current_winning_card = self.ten_hearts
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_ten_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_ten_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.two_spades)
 
     def test_take_ten_if_possible_with_low_trump_over_another_trump(self):
@@ -221,7 +242,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.current_winning_card = self.five_spades
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_ten_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_ten_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.seven_spades)
 
     def test_take_ten_if_possible_with_low_trump_and_king(self):
@@ -235,7 +256,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.current_winning_card = self.five_spades
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_ten_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_ten_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(index, None)
 
     def test_take_ten_if_possible_with_king_and_no_jacks(self):
@@ -250,7 +271,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.current_winning_card = self.five_spades
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_ten_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_ten_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.king_spades)
 
     def test_take_ten_if_possible_with_king_and_jacks_still_out(self):
@@ -265,7 +286,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick.current_winning_card = self.five_spades
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_ten_if_possible(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_ten_if_possible(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(index, None)
 
     def test_take_jack_or_jick_if_high_cards_are_out_with_jack_and_high_cards_out(self):
@@ -278,7 +299,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick = MagicMock()
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_high_cards_are_out(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_high_cards_are_out(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.jack_spades)
 
     def test_take_jack_or_jick_if_high_cards_are_out_with_jack_and_no_high_cards_out(self):
@@ -291,7 +312,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick = MagicMock()
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_high_cards_are_out(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_high_cards_are_out(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(index, None)
 
     def test_take_jack_or_jick_if_high_cards_are_out_with_jick_and_jack_is_out(self):
@@ -304,7 +325,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick = MagicMock()
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_high_cards_are_out(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_high_cards_are_out(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.jack_clubs)
 
     def test_take_jack_or_jick_if_high_cards_are_out_with_jick_and_ace_is_out(self):
@@ -317,7 +338,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick = MagicMock()
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_high_cards_are_out(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_high_cards_are_out(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(self.my_hand[index], self.jack_clubs)
 
     def test_take_jack_or_jick_if_high_cards_are_out_with_jick_and_no_high_cards_out(self):
@@ -330,7 +351,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick = MagicMock()
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_high_cards_are_out(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_high_cards_are_out(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(index, None)
 
     def test_take_jack_or_jick_if_high_cards_are_out_with_jick_and_not_safe(self):
@@ -343,7 +364,7 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick = MagicMock()
         self.current_trick.trump = self.trump
 
-        index = self.pl.take_jack_or_jick_if_high_cards_are_out(self.my_hand, self.current_trick, self.card_counting_info)
+        index = self.pl.take_jack_or_jick_if_high_cards_are_out(DecisionContext(self.my_hand, self.current_trick), self.card_counting_info)
         self.assertEqual(index, None)
 
     def test_get_least_valuable_face_card_with_10_and_low_trump(self):
@@ -353,6 +374,6 @@ class TestCautiousTakerPlayingLogic(unittest.TestCase):
         self.current_trick = MagicMock()
         self.current_trick.trump = self.trump
 
-        index = self.pl.get_least_valuable_face_card(self.my_hand, self.current_trick)
+        index = self.pl.get_least_valuable_face_card(DecisionContext(self.my_hand, self.current_trick))
         self.assertEqual(index, None)
 
@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+from mock import MagicMock, patch
+
+sys.path.insert(0, "..")
+from pysmear.rollout_bidding import RolloutBidding
+from pysmear.card_encoding import CARDS, card_to_int
+from pysmear.smear_simulator import SmearSimulator
+import pydealer
+
+
+class TestRolloutBidding(unittest.TestCase):
+    def setUp(self):
+        self.current_hand = MagicMock()
+        self.current_hand.num_players = 4
+        self.current_hand.bid = 0
+        self.hand = pydealer.Stack(cards=[ pydealer.Card("Ace", "Spades"), pydealer.Card("Jack", "Clubs"), pydealer.Card("Jack", "Spades"),
+            pydealer.Card("10", "Spades"), pydealer.Card("King", "Spades"), pydealer.Card("3", "Diamonds") ])
+        self.weak_hand = pydealer.Stack(cards=[ pydealer.Card("3", "Spades"), pydealer.Card("5", "Clubs"), pydealer.Card("7", "Diamonds"),
+            pydealer.Card("4", "Hearts"), pydealer.Card("6", "Hearts"), pydealer.Card("8", "Diamonds") ])
+
+    def bid(self, bidding_logic, hand, force_two=False):
+        bidding_logic.calculate_bid(self.current_hand, hand, force_two)
+        return bidding_logic.declare_bid(), bidding_logic.declare_trump()
+
+    def test_strong_hand_bids_its_suit(self):
+        bidding_logic = RolloutBidding(seed=1)
+        bid, trump = self.bid(bidding_logic, self.hand)
+        self.assertEqual(trump, "Spades")
+        self.assertTrue(bid >= 2)
+        self.assertEqual(bid, min(int(max(bidding_logic.expected_points)), 5))
+
+    def test_weak_hand_passes_unless_forced(self):
+        bidding_logic = RolloutBidding(seed=1)
+        self.assertEqual(self.bid(bidding_logic, self.weak_hand)[0], 0)
+        # Only forced to two if it expects more than one point
+        bid = self.bid(bidding_logic, self.weak_hand, force_two=True)[0]
+        self.assertEqual(bid, 2 if max(bidding_logic.expected_points) > 1 else 0)
+
+    def test_must_beat_current_bid(self):
+        self.current_hand.bid = 5
+        self.assertEqual(self.bid(RolloutBidding(seed=1), self.hand)[0], 0)
+
+    def test_same_seed_same_bid(self):
+        first = RolloutBidding(seed=7)
+        second = RolloutBidding(seed=7)
+        self.assertEqual(self.bid(first, self.hand), self.bid(second, self.hand))
+        self.assertEqual(first.expected_points, second.expected_points)
+
+    def test_accepts_int_cards(self):
+        int_hand = [ CARDS[card_to_int(card)] for card in self.hand ]
+        self.assertEqual(self.bid(RolloutBidding(seed=1), int_hand), self.bid(RolloutBidding(seed=1), self.hand))
+
+    def test_stops_early_when_one_suit_dominates(self):
+        bidding_logic = RolloutBidding(seed=1, num_rollouts=200)
+        self.bid(bidding_logic, self.hand)
+        self.assertTrue(bidding_logic.min_rollouts <= bidding_logic.rollouts_played < 200)
+
+        bidding_logic = RolloutBidding(seed=1, num_rollouts=20, z_score=100.0)
+        self.bid(bidding_logic, self.hand)
+        self.assertEqual(bidding_logic.rollouts_played, 20)
+
+    def test_time_budget(self):
+        bidding_logic = RolloutBidding(seed=1, num_rollouts=1000, min_rollouts=1000, time_budget=0.0)
+        self.bid(bidding_logic, self.hand)
+        self.assertEqual(bidding_logic.rollouts_played, 1)
+
+    def test_workers(self):
+        bidding_logic = RolloutBidding(seed=1, num_rollouts=8, workers=2)
+        try:
+            bid, trump = self.bid(bidding_logic, self.hand)
+        finally:
+            bidding_logic.close()
+        self.assertEqual(bidding_logic.rollouts_played, 8)
+        self.assertEqual(trump, "Spades")
+
+    def test_workers_split_rollouts_exactly(self):
+        bidding_logic = RolloutBidding(seed=1, num_rollouts=10, z_score=100.0, workers=4)
+        try:
+            self.bid(bidding_logic, self.hand)
+        finally:
+            bidding_logic.close()
+        self.assertEqual(bidding_logic.rollouts_played, 10)
+
+    def test_workers_time_budget(self):
+        bidding_logic = RolloutBidding(seed=1, num_rollouts=1000, min_rollouts=1000, time_budget=0.0, workers=2)
+        try:
+            self.bid(bidding_logic, self.hand)
+        finally:
+            bidding_logic.close()
+        # Each worker plays one rollout before seeing the deadline has passed
+        self.assertEqual(bidding_logic.rollouts_played, 2)
+
+    def test_workers_inside_a_worker_process(self):
+        bidding_logic = RolloutBidding(seed=1, workers=2)
+        with patch("pysmear.rollout_bidding.multiprocessing.current_process", return_value=MagicMock(daemon=True)):
+            with self.assertRaises(ValueError):
+                self.bid(bidding_logic, self.hand)
+        self.assertEqual(bidding_logic.pool, None)
+
+    def test_simulator_closes_pools(self):
+        sim = SmearSimulator(bidding_logic=lambda debug: RolloutBidding(debug=debug, num_rollouts=4, workers=2, seed=1), int_cards=True, seed=3)
+        sim.play_games(0, 1, show_progress=False)
+        for player in sim.smear.get_players():
+            self.assertEqual(player.bidding_logic.pool, None)
+
+    def test_play_out_uses_every_card(self):
+        bidding_logic = RolloutBidding(seed=1)
+        my_cards = [ card_to_int(card) for card in self.hand ]
+        hands = bidding_logic.deal_unseen_cards(4, my_cards)
+        self.assertEqual(len(set(int(c) for cards in hands for c in cards)), 24)
+        points = bidding_logic.play_out(4, hands, "Spades")
+        hand_manager = bidding_logic.get_hand_manager(4)
+        self.assertTrue(hand_manager.is_hand_over())
+        self.assertTrue(0 <= points <= 4)
+
+    def test_simulator(self):
+        sim = SmearSimulator(bidding_logic=RolloutBidding, int_cards=True, seed=3)
+        sim.run(1)
+        self.assertTrue(sum(sim.games_won.values()) > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -49,3 +49,21 @@ class TestSmearEngineApi(unittest.TestCase):
         self.assertEqual(1, len(args))
         self.assertEqual(args[0], "id1")
 
+    def test_get_hint_for_player_with_time_budget(self):
+        player = MagicMock()
+        player.name = "username"
+        player.player_id = 1
+        self.api.smear.get_players.return_value = [ player ]
+        self.api.smear.hand_manager.get_hint_from_computer.return_value = MagicMock(suit="Spades", value="Ace")
+        self.assertEqual(self.api.get_hint_for_player("username"), { "suit": "Spades", "value": "Ace" })
+        args, kwargs = self.api.smear.hand_manager.get_hint_from_computer.call_args
+        self.assertEqual(args, (1, None))
+        self.api.get_hint_for_player("username", time_budget=0.5)
+        args, kwargs = self.api.smear.hand_manager.get_hint_from_computer.call_args
+        self.assertEqual(args[0], 1)
+        self.assertEqual(args[1].__class__.__name__, "PimcPlaying")
+        self.assertEqual(args[1].time_budget, 0.5)
+        # The same logic is used for the player's next hint
+        self.api.get_hint_for_player("username", time_budget=0.25)
+        self.assertTrue(self.api.smear.hand_manager.get_hint_from_computer.call_args[0][1] is args[1])
+
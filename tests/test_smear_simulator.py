@@ -0,0 +1,37 @@
+import unittest
+import sys
+
+sys.path.insert(0, "..")
+from pysmear.smear_simulator import SmearSimulator
+
+
+class TestSmearSimulatorWorkers(unittest.TestCase):
+    def run_simulation(self, workers, num_games=12, **kwargs):
+        sim = SmearSimulator(num_teams=0, num_players=3, int_cards=True, seed=17, **kwargs)
+        sim.run(num_games, workers=workers)
+        return sim.games_won
+
+    def test_results_do_not_depend_on_worker_count(self):
+        games_won = self.run_simulation(1)
+        self.assertEqual(self.run_simulation(2), games_won)
+        self.assertEqual(self.run_simulation(3), games_won)
+
+    def test_batch_results_do_not_depend_on_worker_count(self):
+        games_won = self.run_simulation(1, num_games=200, batch=True)
+        self.assertEqual(self.run_simulation(4, num_games=200, batch=True), games_won)
+
+    def test_stats_count_every_game(self):
+        sim = SmearSimulator(num_teams=0, num_players=3, int_cards=True)
+        sim.run(6, workers=2)
+        self.assertTrue(sum(sim.games_won.values()) >= 6)
+        self.assertEqual(len(sim.stats().splitlines()), 3)
+
+    def test_pooled_bid_cache_stats_are_merged(self):
+        sim = SmearSimulator(num_teams=0, num_players=3, int_cards=True, seed=17, bid_cache_size=1000)
+        sim.run(6, workers=1)
+        pooled = SmearSimulator(num_teams=0, num_players=3, int_cards=True, seed=17, bid_cache_size=1000)
+        pooled.run(6, workers=3)
+        # The workers' caches start empty, so they hit less, but look up as much
+        self.assertTrue(pooled.bid_cache.hits + pooled.bid_cache.misses > 0)
+        self.assertEqual(pooled.bid_cache.hits + pooled.bid_cache.misses, sim.bid_cache.hits + sim.bid_cache.misses)
+        self.assertTrue("Bid cache" in pooled.stats())
@@ -5,10 +5,27 @@ sys.path.insert(0, "../pydealer")
 
 from test_bidding_logic import *
 from test_playing_logic import *
+from test_hand_views import *
 from test_smear_engine_api import *
 from test_smear_utils import *
 from test_card_counting import *
+from test_card_encoding import *
+from test_dealing import *
+from test_batch_engine import *
+from test_smear_simulator import *
+from test_benchmark import *
+from test_phase_timers import *
+from test_bid_cache import *
+from test_bid_table import *
+from test_rollout_bidding import *
+from test_pimc_playing import *
+from test_deal_sampler import *
+from test_card_beliefs import *
+from test_double_dummy import *
+from test_endgame_tablebase import *
+from test_hand_state import *
 from test_game_manager import *
+from test_memory_usage import *
 from test_db_manager import *
 
 if __name__ == '__main__':